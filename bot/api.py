@@ -2,12 +2,14 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Optional
+from typing import Any, Dict, Optional
 
 import inspect
 
 from sc2.ids.unit_typeid import UnitTypeId as U
 
+from .utils import game_loop
+
 
 def _is_awaitable(x: Any) -> bool:
     try:
@@ -40,10 +42,17 @@ class BotAPI:
     - .ready/.idle/.exists/.amount vs listas simples
     - bot.do / distribute_workers sync ou async
     - already_pending pode existir ou não
+    - comandos são acumulados no frame e enviados num único batch (flush)
     """
 
     def __init__(self, bot: Any):
         self.bot = bot
+        self.world = WorldView(self)
+
+        # command buffer: key -> cmd (dict keeps issue order)
+        self._cmds: Dict[tuple, Any] = {}
+        # awaited engine round-trips issued through this adapter (for the profiler)
+        self.rpc_count = 0
 
     # ---------------------------
     # Snapshot
@@ -194,18 +203,182 @@ class BotAPI:
     # ---------------------------
     # Commands (sync/async safe)
     # ---------------------------
-    async def do(self, cmd) -> Any:
+    @staticmethod
+    def _cmd_key(cmd) -> tuple:
+        unit = getattr(cmd, "unit", None)
+        tag = getattr(unit, "tag", None)
+        target = getattr(cmd, "target", None)
+        target = getattr(target, "tag", target)
+        if target is not None and not isinstance(target, int):
+            try:
+                target = (float(target[0]), float(target[1]))
+            except Exception:
+                target = repr(target)
+        if tag is None:
+            return ("obj", id(cmd))
+        return (tag, getattr(cmd, "ability", None), target, bool(getattr(cmd, "queue", False)))
+
+    async def do(self, cmd, *, immediate: bool = False) -> Any:
+        """
+        Default: buffer the command for this frame (identical orders per unit are dropped)
+        and return True. immediate=True sends it now and returns the engine result,
+        for callers that need to read it (e.g. the Builder).
+        """
+        if not immediate:
+            self._cmds.setdefault(self._cmd_key(cmd), cmd)
+            return True
         fn = getattr(self.bot, "do", None)
         if not callable(fn):
             return None
         try:
-            return await _maybe_await(fn(cmd))
+            res = fn(cmd)
+            if _is_awaitable(res):
+                self.rpc_count += 1
+                return await res
+            return res
         except Exception:
             # do not swallow silently here; caller logs failures
             raise
 
+    @property
+    def pending_commands(self) -> int:
+        return len(self._cmds)
+
+    async def flush(self) -> int:
+        """Send every buffered command as one batch. Call once at the end of the step."""
+        if not self._cmds:
+            return 0
+        cmds = list(self._cmds.values())
+        self._cmds.clear()
+
+        # 1) old forks: bot.do_actions(list)
+        fn = getattr(self.bot, "do_actions", None)
+        if callable(fn):
+            try:
+                self.rpc_count += 1
+                await _maybe_await(fn(cmds))
+                return len(cmds)
+            except Exception:
+                pass
+
+        # 2) python-sc2 with sync bot.do: it only queues into bot.actions, the lib sends one batch
+        do = getattr(self.bot, "do", None)
+        if callable(do) and not inspect.iscoroutinefunction(do):
+            for c in cmds:
+                try:
+                    do(c)
+                except Exception:
+                    continue
+            return len(cmds)
+
+        # 3) async bot.do: go straight to the client batch call
+        client = getattr(self.bot, "_client", None) or getattr(self.bot, "client", None)
+        if client is not None and hasattr(client, "actions"):
+            try:
+                self.rpc_count += 1
+                await client.actions(cmds)
+                return len(cmds)
+            except Exception:
+                pass
+
+        # 4) last resort: one by one
+        sent = 0
+        for c in cmds:
+            try:
+                await self.do(c, immediate=True)
+                sent += 1
+            except Exception:
+                continue
+        return sent
+
     async def distribute_workers(self) -> Any:
         fn = getattr(self.bot, "distribute_workers", None)
         if not callable(fn):
             return None
-        return await _maybe_await(fn())
\ No newline at end of file
+        res = fn()
+        if _is_awaitable(res):
+            self.rpc_count += 1
+            return await res
+        return res
+
+
+class WorldView:
+    """
+    Cache por frame (chaveado em bot.state.game_loop) das consultas de unidades.
+    - units/ready/idle/pending são calculados uma vez por tipo e por frame
+    - invalida sozinho quando o game_loop avança
+    - use BotAPI direto quando precisar do valor "ao vivo" (ex.: verificar
+      pending logo depois de emitir uma ordem no mesmo frame)
+    """
+
+    def __init__(self, api: BotAPI):
+        self.api = api
+        self._loop: Optional[int] = None
+        self._units: Dict[U, Any] = {}
+        self._ready: Dict[U, Any] = {}
+        self._idle: Dict[U, Any] = {}
+        self._pending: Dict[U, int] = {}
+        self._tags: Dict[U, Dict[int, Any]] = {}
+
+    def _sync(self) -> None:
+        now = game_loop(self.api.bot)
+        if now != self._loop:
+            self._loop = now
+            self._units.clear()
+            self._ready.clear()
+            self._idle.clear()
+            self._pending.clear()
+            self._tags.clear()
+
+    def invalidate(self) -> None:
+        self._loop = None
+
+    def units(self, unit_type: U):
+        self._sync()
+        us = self._units.get(unit_type)
+        if us is None:
+            us = self.api.units(unit_type)
+            self._units[unit_type] = us
+        return us
+
+    def ready(self, unit_type: U):
+        self._sync()
+        us = self._ready.get(unit_type)
+        if us is None:
+            us = self.units(unit_type)
+            us = us.ready if hasattr(us, "ready") else [u for u in us if getattr(u, "is_ready", False)]
+            self._ready[unit_type] = us
+        return us
+
+    def idle(self, unit_type: U):
+        """Ready AND idle units of a type (production structures, army)."""
+        self._sync()
+        us = self._idle.get(unit_type)
+        if us is None:
+            us = self.api.idle(self.ready(unit_type))
+            self._idle[unit_type] = us
+        return us
+
+    def count(self, unit_type: U) -> int:
+        return self.api.amount(self.units(unit_type))
+
+    def tag_map(self, unit_type: U) -> Dict[int, Any]:
+        """tag -> unit for a type, built once per frame (modules that keep tags look members up in O(1))."""
+        self._sync()
+        m = self._tags.get(unit_type)
+        if m is None:
+            m = {u.tag: u for u in self.units(unit_type)}
+            self._tags[unit_type] = m
+        return m
+
+    def pending(self, unit_type: U) -> int:
+        self._sync()
+        n = self._pending.get(unit_type)
+        if n is None:
+            n = self.api.already_pending(unit_type)
+            self._pending[unit_type] = n
+        return n
+
+    def have(self, unit_type: U) -> int:
+        """existing + pending (o que os planos chamam de 'have')."""
+        return self.count(unit_type) + self.pending(unit_type)
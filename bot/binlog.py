@@ -0,0 +1,281 @@
+#binlog.py
+"""
+Formato binário compacto para os debug runs (debug.bin).
+
+    header  : b"SC2DBG1\n"
+    registro: varint(len) + corpo
+    corpo   : tipo (1 byte) + ...
+        STR    : varint id, utf-8          -> tabela de strings internadas
+        SCHEMA : varint id, varint n, n x varint str_id (nomes das chaves)
+        ROW    : varint schema_id, valores na ordem do schema
+
+Chaves e os valores dos campos categóricos (SYM_FIELDS: event, channel, unit,
+ex.: "UnitTypeId.SUPPLYDEPOT") viram inteiros pequenos; o resto (texto de
+exceção, notas...) vai inline, senão a tabela de strings cresce sem limite num
+run longo. Cada conjunto de chaves (na prática: um por evento) vira um schema
+fixo, então as chaves não se repetem por linha.
+
+    python -m bot.binlog debug_runs/<run>/debug.bin   # dump como JSONL
+"""
+from __future__ import annotations
+
+import json
+import struct
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+
+MAGIC = b"SC2DBG1\n"
+
+REC_STR = 1
+REC_SCHEMA = 2
+REC_ROW = 3
+
+T_NONE = 0
+T_FALSE = 1
+T_TRUE = 2
+T_INT = 3
+T_FLOAT = 4
+T_SYM = 5  # interned string
+T_LIST = 6
+T_DICT = 7
+T_STR = 8  # long string, inline
+
+# values of these fields are interned (few distinct values, repeated on every line);
+# any other string value is written inline
+SYM_FIELDS = frozenset({
+    "event", "channel", "unit", "name", "what", "reason", "source", "why",
+    "via", "from", "to", "map", "opponent", "result",
+})
+# even in those fields, longer strings are written inline
+MAX_SYM_LEN = 64
+
+_F64 = struct.Struct("<d")
+
+
+def _varint(n: int, out: bytearray) -> None:
+    while True:
+        b = n & 0x7F
+        n >>= 7
+        if n:
+            out.append(b | 0x80)
+        else:
+            out.append(b)
+            return
+
+
+def _zigzag(n: int) -> int:
+    return (n << 1) ^ (n >> 63)
+
+
+class BinaryEncoder:
+    """Stateful encoder: string and schema tables grow as new names show up."""
+
+    def __init__(self):
+        self._syms: Dict[str, int] = {}
+        self._schemas: Dict[Tuple[str, ...], int] = {}
+
+    def header(self) -> bytes:
+        return MAGIC
+
+    def checkpoint(self) -> Tuple[int, int]:
+        """Table sizes now; rollback() forgets whatever encode() defined after this."""
+        return len(self._syms), len(self._schemas)
+
+    def rollback(self, cp: Tuple[int, int]) -> None:
+        # ids are handed out in insertion order: everything past the mark is newer
+        n_syms, n_schemas = cp
+        for k in [k for k, i in self._syms.items() if i >= n_syms]:
+            del self._syms[k]
+        for k in [k for k, i in self._schemas.items() if i >= n_schemas]:
+            del self._schemas[k]
+
+    def _record(self, body: bytearray, out: bytearray) -> None:
+        _varint(len(body), out)
+        out += body
+
+    def _sym(self, s: str, out: bytearray) -> int:
+        sid = self._syms.get(s)
+        if sid is None:
+            sid = len(self._syms)
+            self._syms[s] = sid
+            body = bytearray((REC_STR,))
+            _varint(sid, body)
+            body += s.encode("utf-8")
+            self._record(body, out)
+        return sid
+
+    def _value(self, v: Any, body: bytearray, out: bytearray, field: str | None = None) -> None:
+        if v is None:
+            body.append(T_NONE)
+        elif v is True:
+            body.append(T_TRUE)
+        elif v is False:
+            body.append(T_FALSE)
+        elif isinstance(v, int):
+            if not -(1 << 63) <= v < (1 << 63):
+                self._value(str(v), body, out, field)
+                return
+            body.append(T_INT)
+            _varint(_zigzag(int(v)), body)
+        elif isinstance(v, float):
+            body.append(T_FLOAT)
+            body += _F64.pack(v)
+        elif isinstance(v, str):
+            if field in SYM_FIELDS and len(v) <= MAX_SYM_LEN:
+                body.append(T_SYM)
+                _varint(self._sym(v, out), body)
+            else:
+                raw = v.encode("utf-8")
+                body.append(T_STR)
+                _varint(len(raw), body)
+                body += raw
+        elif isinstance(v, (list, tuple)):
+            body.append(T_LIST)
+            _varint(len(v), body)
+            for x in v:
+                self._value(x, body, out, field)
+        elif isinstance(v, dict):
+            body.append(T_DICT)
+            _varint(len(v), body)
+            for k, x in v.items():
+                _varint(self._sym(str(k), out), body)
+                self._value(x, body, out, str(k))
+        else:
+            self._value(str(v), body, out, field)
+
+    def encode(self, payload: Dict[str, Any]) -> bytes:
+        """Bytes for one record, preceded by any new STR/SCHEMA definitions it needs."""
+        out = bytearray()
+        keys = tuple(str(k) for k in payload.keys())
+        schema_id = self._schemas.get(keys)
+        if schema_id is None:
+            ids = [self._sym(k, out) for k in keys]
+            schema_id = len(self._schemas)
+            self._schemas[keys] = schema_id
+            body = bytearray((REC_SCHEMA,))
+            _varint(schema_id, body)
+            _varint(len(ids), body)
+            for i in ids:
+                _varint(i, body)
+            self._record(body, out)
+
+        body = bytearray((REC_ROW,))
+        _varint(schema_id, body)
+        for k, v in zip(keys, payload.values()):
+            self._value(v, body, out, k)
+        self._record(body, out)
+        return bytes(out)
+
+
+# -------------------------
+# Reader
+# -------------------------
+def _read_varint(buf: bytes, i: int) -> Tuple[int, int]:
+    n = 0
+    shift = 0
+    while True:
+        b = buf[i]
+        i += 1
+        n |= (b & 0x7F) << shift
+        if not b & 0x80:
+            return n, i
+        shift += 7
+
+
+def _read_value(buf: bytes, i: int, syms: List[str]) -> Tuple[Any, int]:
+    t = buf[i]
+    i += 1
+    if t == T_NONE:
+        return None, i
+    if t == T_TRUE:
+        return True, i
+    if t == T_FALSE:
+        return False, i
+    if t == T_INT:
+        z, i = _read_varint(buf, i)
+        return (z >> 1) ^ -(z & 1), i
+    if t == T_FLOAT:
+        return _F64.unpack_from(buf, i)[0], i + 8
+    if t == T_SYM:
+        sid, i = _read_varint(buf, i)
+        return syms[sid], i
+    if t == T_STR:
+        n, i = _read_varint(buf, i)
+        return buf[i:i + n].decode("utf-8"), i + n
+    if t == T_LIST:
+        n, i = _read_varint(buf, i)
+        out = []
+        for _ in range(n):
+            v, i = _read_value(buf, i, syms)
+            out.append(v)
+        return out, i
+    if t == T_DICT:
+        n, i = _read_varint(buf, i)
+        d = {}
+        for _ in range(n):
+            kid, i = _read_varint(buf, i)
+            v, i = _read_value(buf, i, syms)
+            d[syms[kid]] = v
+        return d, i
+    raise ValueError(f"bad value tag {t} at {i - 1}")
+
+
+def iter_binlog(path: str | Path, *, chunk_size: int = 1 << 20) -> Iterator[Dict[str, Any]]:
+    """Stream a debug.bin back as dicts (reads in chunks, never the whole file)."""
+    syms: List[str] = []
+    schemas: List[Tuple[str, ...]] = []
+    with Path(path).open("rb") as fp:
+        if fp.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path}: not a debug.bin file")
+        buf = b""
+        pos = 0
+        eof = False
+        while True:
+            # need at least the length prefix + body in buf[pos:]
+            try:
+                n, body_start = _read_varint(buf, pos)
+                complete = body_start + n <= len(buf)
+            except IndexError:
+                complete = False
+            if not complete:
+                if eof:
+                    return  # truncated tail (run killed mid-write): stop cleanly
+                more = fp.read(chunk_size)
+                if not more:
+                    eof = True
+                buf = buf[pos:] + more
+                pos = 0
+                continue
+
+            body = buf[body_start:body_start + n]
+            pos = body_start + n
+            kind = body[0]
+            if kind == REC_STR:
+                sid, j = _read_varint(body, 1)
+                if sid != len(syms):
+                    raise ValueError(f"{path}: string table out of order ({sid} != {len(syms)})")
+                syms.append(body[j:].decode("utf-8"))
+            elif kind == REC_SCHEMA:
+                sid, j = _read_varint(body, 1)
+                k, j = _read_varint(body, j)
+                ids = []
+                for _ in range(k):
+                    x, j = _read_varint(body, j)
+                    ids.append(x)
+                if sid != len(schemas):
+                    raise ValueError(f"{path}: schema table out of order ({sid} != {len(schemas)})")
+                schemas.append(tuple(syms[x] for x in ids))
+            elif kind == REC_ROW:
+                sid, j = _read_varint(body, 1)
+                row: Dict[str, Any] = {}
+                for key in schemas[sid]:
+                    row[key], j = _read_value(body, j, syms)
+                yield row
+            else:
+                raise ValueError(f"{path}: unknown record type {kind}")
+
+
+if __name__ == "__main__":
+    for rec in iter_binlog(sys.argv[1]):
+        sys.stdout.write(json.dumps(rec, ensure_ascii=False, separators=(",", ":")) + "\n")
@@ -1,22 +1,35 @@
 #build.py
 from __future__ import annotations
 
+from typing import Any
+
 from sc2.ids.unit_typeid import UnitTypeId as U
 from sc2.position import Point2
 
 from .api import BotAPI
-from .utils import snap
+from .utils import game_loop, snap
+
+# SCV speed in map units per game second (faster)
+SCV_SPEED = 3.94
 
 
 class Builder:
-    def __init__(self, bot, econ, placement, state, debug: bool = True):
+    def __init__(self, bot, econ, placement, state, debug: bool = True, api: BotAPI | None = None):
         self.bot = bot
-        self.api = BotAPI(bot)
+        self.api = api or BotAPI(bot)
+        self.world = self.api.world
         self.econ = econ
         self.place = placement
         self.state = state
         self.debug = debug
 
+        # SCVs sent ahead to a build site: unit_type -> (worker tag, game_loop sent)
+        self.premoved: dict[U, tuple[int, int]] = {}
+        # tags the worker allocator must leave alone (shared set)
+        self.reserved_workers: set[int] = set()
+        self.premove_slack = 1.5  # seconds of margin on top of the walk
+        self.premove_timeout = 672  # loops (~30s) before a waiting SCV goes back to mining
+
     def _has_dbg(self) -> bool:
         return hasattr(self.bot, "dbg") and self.bot.dbg is not None
 
@@ -40,7 +53,95 @@ class Builder:
         except Exception:
             return
 
-    async def try_build(self, key: str, unit_type: U, desired: Point2, cooldown: int = 16, max_existing: int | None = 0) -> bool:
+    # ---------------------------
+    # Worker choice / pre-move
+    # ---------------------------
+    def _pick_worker(self, desired: Point2):
+        """Prefer idle -> gathering -> closest; never an SCV waiting at another site."""
+        workers = getattr(self.bot, "workers", None)
+        if workers is None or not self.api.exists(workers):
+            return None
+        if self.reserved_workers and hasattr(workers, "tags_not_in"):
+            workers = workers.tags_not_in(self.reserved_workers)
+            if not self.api.exists(workers):
+                return None
+
+        for attr in ("idle", "gathering"):
+            try:
+                sub = getattr(workers, attr, None)
+                if sub is not None and getattr(sub, "exists", False):
+                    return self.api.closest_to(sub, desired)
+            except Exception:
+                continue
+        return self.api.closest_to(workers, desired)
+
+    def _premoved_worker(self, unit_type: U):
+        rec = self.premoved.get(unit_type)
+        if rec is None:
+            return None
+        workers = getattr(self.bot, "workers", None)
+        find = getattr(workers, "find_by_tag", None)
+        w = find(rec[0]) if callable(find) else None
+        if w is None:
+            self._release(unit_type)
+        return w
+
+    def _release(self, unit_type: U) -> None:
+        rec = self.premoved.pop(unit_type, None)
+        if rec is not None:
+            self.reserved_workers.discard(rec[0])
+
+    def release_stale(self) -> None:
+        now = game_loop(self.bot)
+        for ut, (_, sent) in list(self.premoved.items()):
+            if now - sent > self.premove_timeout:
+                self._release(ut)
+
+    def _commit(self, unit_type: U, worker: Any, pos: Point2) -> None:
+        """The order is out: keep the money held until the structure appears (only after it was accepted)."""
+        travel = worker.distance_to(pos) / SCV_SPEED if hasattr(worker, "distance_to") else 0.0
+        self.econ.commit(self.econ.owner_for(unit_type), unit_type, ttl=int(travel * 22.4) + 112)
+
+    async def premove(self, unit_type: U, pos: Point2, eta: float) -> bool:
+        """
+        Send an SCV towards pos when walking there takes about as long as the
+        money takes to arrive, so the build starts the moment it's affordable.
+        """
+        if eta <= 0 or eta == float("inf") or unit_type in self.premoved:
+            return False
+        worker = self._pick_worker(pos)
+        if worker is None:
+            return False
+        travel = worker.distance_to(pos) / SCV_SPEED
+        if eta > travel + self.premove_slack:
+            return False
+        await self.api.do(worker.move(pos))
+        self.premoved[unit_type] = (worker.tag, game_loop(self.bot))
+        self.reserved_workers.add(worker.tag)
+        self._log("building", {
+            "event": "premove",
+            "unit": str(unit_type),
+            "pos": [int(pos.x), int(pos.y)],
+            "eta": round(eta, 2),
+            "travel": round(travel, 2),
+        })
+        return True
+
+    async def try_build(
+        self,
+        key: str,
+        unit_type: U,
+        desired: Point2,
+        cooldown: int = 16,
+        max_existing: int | None = 0,
+        exact: bool = False,
+        worker=None,
+    ) -> bool:
+        """
+        exact=True: desired is a precomputed layout slot -> one verification query,
+        no ring search. The slot is dropped from BotState.place once used or blocked.
+        worker: SCV to use; default is the one premove() sent ahead, else the closest.
+        """
         it = self.api.snapshot().it
 
         # cooldown anti-spam
@@ -50,12 +151,12 @@ class Builder:
 
         # anti-spam: control maximum existing instances allowed
         # Default: max_existing=0 (previous behavior) -> if any exist, skip
-        existing_count = self.api.amount(self.api.units(unit_type))
+        existing_count = self.world.count(unit_type)
         if max_existing is not None:
             if existing_count > max_existing:
                 return False
         # pending still blocks to avoid duplicate orders in-flight
-        if self.api.already_pending(unit_type) > 0:
+        if self.world.pending(unit_type) > 0:
             return False
 
         # economy (considera reservas)
@@ -64,35 +165,7 @@ class Builder:
 
         desired = snap(desired)
 
-        # pick worker (prefer idle -> gathering -> closest)
-        workers = getattr(self.bot, "workers", None)
-        if workers is None:
-            return False
-        
-        # Check if workers collection has any units (use api helper)
-        if not self.api.exists(workers):
-            return False
-
-        try:
-            idle = getattr(workers, "idle", None)
-            if idle is not None and getattr(idle, "exists", False):
-                worker = self.api.closest_to(idle, desired)
-            else:
-                worker = None
-        except Exception:
-            worker = None
-
-        if worker is None:
-            try:
-                gathering = getattr(workers, "gathering", None)
-                if gathering is not None and getattr(gathering, "exists", False):
-                    worker = self.api.closest_to(gathering, desired)
-            except Exception:
-                worker = None
-
-        if worker is None:
-            worker = self.api.closest_to(workers, desired)
-
+        worker = worker or self._premoved_worker(unit_type) or self._pick_worker(desired)
         if worker is None:
             return False
 
@@ -109,6 +182,19 @@ class Builder:
                 })
                 return False
             strict_flag = True
+        elif exact:
+            ok, strict_flag = await self.place.can_place_strict(unit_type, desired)
+            if not ok:
+                self.state.place.discard(desired)
+                self._log("building", {
+                    "event": "build_skip",
+                    "name": key,
+                    "unit": str(unit_type),
+                    "reason": "slot_blocked",
+                    "desired": [int(desired.x), int(desired.y)],
+                })
+                return False
+            pos = desired
         else:
             # For non-refinery buildings: try desired position, then ring search
             snap_desired = snap(desired)
@@ -137,14 +223,11 @@ class Builder:
             "g": snap0.g,
         })
 
-        # reserve after we commit to attempt
-        self.econ.reserve(unit_type)
-
         # execute: prefer worker.build + api.do for a reliable ok result
         try:
             # try worker.build via api.do
             cmd = worker.build(unit_type, pos)
-            ok = await self.api.do(cmd)
+            ok = await self.api.do(cmd, immediate=True)
             self._log("building", {
                 "event": "build_issued",
                 "name": key,
@@ -154,6 +237,10 @@ class Builder:
                 "via": "worker.build",
             })
             if bool(ok):
+                self._commit(unit_type, worker, pos)
+                if exact:
+                    self.state.place.discard(pos)
+                self._release(unit_type)
                 return True
         except Exception:
             # fallthrough to try bot.build if worker.build path fails
@@ -173,6 +260,7 @@ class Builder:
                     pass
 
                 # verify that the engine accepted the build: check pending or existing
+                # (live queries on purpose: WorldView still holds the pre-order counts)
                 post_pending = self.api.already_pending(unit_type)
                 post_existing = self.api.amount(self.api.units(unit_type))
                 accepted = (post_pending > 0) or (post_existing > existing_count)
@@ -185,6 +273,10 @@ class Builder:
                     "via": "bot.build",
                 })
                 if accepted:
+                    self._commit(unit_type, worker, pos)
+                    if exact:
+                        self.state.place.discard(pos)
+                    self._release(unit_type)
                     return True
 
         except Exception as e:
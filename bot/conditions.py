@@ -0,0 +1,228 @@
+#conditions.py
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
+
+from sc2.ids.unit_typeid import UnitTypeId as U
+
+LOOPS_PER_SEC = 22.4
+
+# scalar inputs; per-type inputs are (kind, UnitTypeId) with kind in COUNT_KINDS / "enemy_seen"
+MINERALS = "minerals"
+GAS = "gas"
+SUPPLY_LEFT = "supply_left"
+SUPPLY_USED = "supply_used"
+LOOP = "loop"
+
+COUNT_KINDS = ("have", "ready", "pending")
+ENEMY_SEEN = "enemy_seen"
+
+BAD = ""  # compiled form of an invalid term (reported in errors, then dropped)
+
+SCALARS = {
+    "minerals": MINERALS,
+    "gas": GAS,
+    "supply_left": SUPPLY_LEFT,
+    "supply_used": SUPPLY_USED,
+    "loop": LOOP,
+}
+
+
+def unit_from_name(name: Any) -> Optional[U]:
+    if not isinstance(name, str) or not name.strip():
+        return None
+    return getattr(U, name.strip().upper(), None)
+
+
+class Slots:
+    """Input key -> index into the flat value list the compiled conditions read."""
+
+    def __init__(self):
+        self.keys: List[Any] = []
+        self._index: Dict[Any, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def index(self, key: Any) -> int:
+        i = self._index.get(key)
+        if i is None:
+            i = len(self.keys)
+            self._index[key] = i
+            self.keys.append(key)
+        return i
+
+
+@dataclass
+class Condition:
+    fn: Callable[[List[int]], bool]
+    inputs: FrozenSet[int]  # slot indices
+    source: str  # generated expression (logs / validator)
+    needs: FrozenSet[U] = field(default_factory=frozenset)  # types it waits for (have/ready >= n)
+    min_loop: int = 0  # can't hold before this loop (top-level loop/time_gte)
+
+    def __call__(self, v: List[int]) -> bool:
+        return self.fn(v)
+
+
+ALWAYS = Condition(lambda v: True, frozenset(), "True")
+
+
+class _Compiler:
+    """
+    Linguagem de condições dos planos (campo "when" do JSON).
+    Chaves de um objeto são combinadas com AND:
+      minerals_gte / gas_gte / supply_left_gte|lte / supply_used_gte|lte
+      time_gte|lte (segundos) / loop_gte|lte
+      have_gte|lte, ready_gte|lte, pending_gte|lte: {"BARRACKS": 1, ...}
+      enemy_seen: "BANSHEE" | ["ROACHWARREN", "BANELINGNEST"]   (qualquer um, já visto)
+      all: [when, ...] / any: [when, ...] / not: when
+    Uma lista no lugar de um objeto é um "all".
+    Gera uma única expressão Python sobre a lista de valores v (v[i] por slot),
+    compilada uma vez: avaliar é uma chamada de função, sem dicts.
+    """
+
+    def __init__(self, slots: Slots, where: str, errors: List[str]):
+        self.slots = slots
+        self.where = where
+        self.errors = errors
+        self.inputs: set = set()
+        self.needs: set = set()
+        self.min_loop = 0
+        self._plain = True  # inside plain ANDs only (no any/not above)
+
+    def _err(self, msg: str) -> str:
+        self.errors.append(f"{self.where}: {msg}")
+        # unknown terms don't block the step (same as the old interpreter): the term is
+        # dropped wherever it sits, so `not` / `any` around it can't turn it into False
+        return BAD
+
+    def _slot(self, key: Any) -> int:
+        i = self.slots.index(key)
+        self.inputs.add(i)
+        return i
+
+    @staticmethod
+    def _num(x: Any) -> Optional[float]:
+        if isinstance(x, bool):
+            return None
+        try:
+            n = float(x)
+        except (TypeError, ValueError, OverflowError):
+            return None
+        # inf / nan (or 1e400 from JSON) would blow up in ceil/floor
+        return n if math.isfinite(n) else None
+
+    def _cmp(self, key: Any, op: str, value: Any, name: str) -> str:
+        n = self._num(value)
+        if n is None:
+            return self._err(f"{name} needs a finite number, got {value!r}")
+        i = self._slot(key)
+        if op == "gte":
+            if key == LOOP and self._plain:
+                self.min_loop = max(self.min_loop, math.ceil(n))
+            return f"v[{i}] >= {math.ceil(n)}"
+        return f"v[{i}] <= {math.floor(n)}"
+
+    def _counts(self, kind: str, op: str, value: Any, name: str) -> List[str]:
+        if not isinstance(value, dict):
+            return [self._err(f"{name} needs an object of unit counts, got {value!r}")]
+        out = []
+        for unit, n in value.items():
+            ut = unit_from_name(unit)
+            if ut is None:
+                out.append(self._err(f"unknown unit {unit!r} in {name}"))
+                continue
+            out.append(self._cmp((kind, ut), op, n, f"{name}.{unit}"))
+            # only a plain AND really waits on the unit; under any/not it's one option among others
+            if self._plain and op == "gte" and kind in ("have", "ready"):
+                self.needs.add(ut)
+        return out
+
+    def _enemy_seen(self, value: Any) -> str:
+        names = value if isinstance(value, list) else [value]
+        if not names:
+            return self._err("enemy_seen needs at least one unit, got []")
+        terms = []
+        for unit in names:
+            ut = unit_from_name(unit)
+            if ut is None:
+                terms.append(self._err(f"unknown unit {unit!r} in enemy_seen"))
+                continue
+            terms.append(f"v[{self._slot((ENEMY_SEEN, ut))}] > 0")
+        return self._join(terms, "or", empty="False")
+
+    @staticmethod
+    def _join(terms: List[str], op: str, *, empty: str) -> str:
+        # nothing but bad terms: the whole group is bad (dropped by whoever holds it)
+        bad = bool(terms) and all(t == BAD for t in terms)
+        terms = [t for t in terms if t != BAD and t != ("True" if op == "and" else "False")]
+        if not terms:
+            return BAD if bad else empty
+        if len(terms) == 1:
+            return terms[0]
+        return f" {op} ".join(f"({t})" for t in terms)
+
+    def node(self, when: Any) -> str:
+        if when is None:
+            return "True"
+        if isinstance(when, list):
+            return self._join([self.node(w) for w in when], "and", empty="True")
+        if not isinstance(when, dict):
+            return self._err(f"condition must be an object or a list, got {when!r}")
+
+        terms: List[str] = []
+        for k, v in when.items():
+            if k == "all":
+                terms.append(self.node(v if isinstance(v, list) else [v]))
+            elif k == "any":
+                if not isinstance(v, list):
+                    terms.append(self._err(f"any needs a list, got {v!r}"))
+                    continue
+                plain, self._plain = self._plain, False
+                terms.append(self._join([self.node(w) for w in v], "or", empty="False"))
+                self._plain = plain
+            elif k == "not":
+                plain, self._plain = self._plain, False
+                inner = self.node(v)
+                self._plain = plain
+                terms.append(BAD if inner == BAD else f"not ({inner})")
+            elif k == ENEMY_SEEN:
+                terms.append(self._enemy_seen(v))
+            elif k.endswith(("_gte", "_lte")):
+                base, op = k[:-4], k[-3:]
+                if base in COUNT_KINDS:
+                    terms.extend(self._counts(base, op, v, k))
+                elif base == "time":
+                    n = self._num(v)
+                    if n is None:
+                        terms.append(self._err(f"{k} needs seconds, got {v!r}"))
+                    else:
+                        terms.append(self._cmp(LOOP, op, n * LOOPS_PER_SEC, k))
+                elif base in SCALARS:
+                    terms.append(self._cmp(SCALARS[base], op, v, k))
+                else:
+                    terms.append(self._err(f"unknown condition {k!r}"))
+            else:
+                terms.append(self._err(f"unknown condition {k!r}"))
+        return self._join(terms, "and", empty="True")
+
+
+def compile_when(when: Any, slots: Slots, where: str = "when", errors: Optional[List[str]] = None) -> Condition:
+    errors = errors if errors is not None else []
+    c = _Compiler(slots, where, errors)
+    src = c.node(when)
+    if src == BAD:
+        src = "True"
+    fn = ALWAYS.fn if src == "True" else eval(f"lambda v: {src}", {"__builtins__": {}})  # slot ints and numbers only
+    return Condition(fn, frozenset(c.inputs), src, frozenset(c.needs), c.min_loop)
+
+
+def input_names(slots: Slots) -> Tuple[str, ...]:
+    """Readable slot names, e.g. for the validator / debug output."""
+    out = []
+    for k in slots.keys:
+        out.append(f"{k[0]}:{k[1].name}" if isinstance(k, tuple) else str(k))
+    return tuple(out)
@@ -2,11 +2,15 @@
 from __future__ import annotations
 
 import json
+import threading
 import time
+from collections import deque
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
+
+from .binlog import BinaryEncoder
 
 
 @dataclass
@@ -15,6 +19,40 @@ class _Run:
     log_path: Path
 
 
+@dataclass(frozen=True)
+class LogRule:
+    """
+    Amostragem por canal/evento (opcionalmente por key):
+    - every_n_it: no máximo um registro a cada N iterações
+    - dedupe: descarta registro idêntico ao anterior (ignorando t/it)
+    - rle: idem, mas emite um resumo "repeat" (count, it_from, it_to)
+      quando o payload muda ou no close()
+    - ignore: chaves extras que não contam na comparação (além de t/it)
+    - by: campos do payload que separam sub-fluxos (ex.: ("name",) para
+      build_result de depot/factory/starport intercalados)
+    """
+
+    every_n_it: int = 0
+    dedupe: bool = False
+    rle: bool = False
+    ignore: Tuple[str, ...] = ()
+    by: Tuple[str, ...] = ()
+
+
+@dataclass
+class _RuleState:
+    last_it: Optional[int] = None
+    sig: Optional[str] = None
+    repeats: int = 0
+    it_from: Any = None
+    it_to: Any = None
+    sample: Optional[Dict[str, Any]] = None
+
+
+_NO_RULE = LogRule()
+_VOLATILE_KEYS = ("t", "it")
+
+
 class DebugLogger:
     """
     Single-file JSONL logger, buffered (não dá flush a cada linha).
@@ -22,6 +60,12 @@ class DebugLogger:
     - Compatível com suas chamadas atuais:
         log_action / log_state / log_placement / log_building
     - Nunca quebra o bot: exceções do logger são engolidas.
+    - background=True: o frame só enfileira o dict; uma thread serializa,
+      encolhe e escreve em lotes. Fila cheia -> drop_policy ("drop_new" |
+      "drop_old"), com contadores em self.dropped.
+    - rules: LogRule por "canal:evento[:key]" (rate limit, dedupe, RLE),
+      aplicadas no log() antes de qualquer serialização.
+    - fmt="bin": debug.bin compacto (ver binlog.py) em vez de debug.jsonl.
     """
 
     def __init__(
@@ -32,18 +76,45 @@ class DebugLogger:
         flush_every_lines: int = 200,
         flush_every_seconds: float = 1.0,
         max_payload_bytes: int = 8_000,
+        background: bool = False,
+        queue_size: int = 20_000,
+        drop_policy: str = "drop_new",
+        batch_lines: int = 512,
+        fmt: str = "jsonl",
+        rules: Optional[Dict[str, LogRule]] = None,
     ):
         self.enabled = bool(enabled)
         self.base_dir = Path(base_dir)
         self.flush_every_lines = int(flush_every_lines)
         self.flush_every_seconds = float(flush_every_seconds)
         self.max_payload_bytes = int(max_payload_bytes)
+        self.fmt = "bin" if fmt == "bin" else "jsonl"
+        self._bin: Optional[BinaryEncoder] = None
 
         self._run: Optional[_Run] = None
         self._fp = None  # file handle
         self._lines_since_flush = 0
         self._last_flush_ts = 0.0
 
+        # background writer
+        self.background = bool(background)
+        self.queue_size = int(queue_size)
+        self.drop_policy = drop_policy if drop_policy in ("drop_new", "drop_old") else "drop_new"
+        self.batch_lines = int(batch_lines)
+        # deque append/popleft are atomic in CPython: the game thread never takes a lock
+        self._q: deque = deque()
+        self._wake = threading.Event()
+        self._stop = False
+        self._worker: Optional[threading.Thread] = None
+        self.dropped: Dict[str, int] = {}
+        self.written = 0
+
+        # sampling / dedupe
+        self.rules: Dict[str, LogRule] = dict(rules or {})
+        self._rule_cache: Dict[Tuple[str, str, Optional[str]], LogRule] = {}
+        self._rule_state: Dict[tuple, _RuleState] = {}
+        self.suppressed: Dict[str, int] = {}
+
     # -------------------------
     # Lifecycle
     # -------------------------
@@ -59,14 +130,26 @@ class DebugLogger:
             run_dir = self.base_dir / f"{ts}_{safe_map}_{safe_opp}"
             run_dir.mkdir(parents=True, exist_ok=True)
 
-            log_path = run_dir / "debug.jsonl"
-            # line-buffered off; we'll flush manually
-            self._fp = log_path.open("a", encoding="utf-8")
+            if self.fmt == "bin":
+                # string/schema tables live in the file: always a fresh file per run
+                log_path = run_dir / "debug.bin"
+                self._bin = BinaryEncoder()
+                self._fp = log_path.open("wb")
+                self._fp.write(self._bin.header())
+            else:
+                log_path = run_dir / "debug.jsonl"
+                # line-buffered off; we'll flush manually
+                self._fp = log_path.open("a", encoding="utf-8")
             self._run = _Run(run_dir=run_dir, log_path=log_path)
 
             self._lines_since_flush = 0
             self._last_flush_ts = time.time()
 
+            if self.background:
+                self._stop = False
+                self._worker = threading.Thread(target=self._run_worker, name="DebugLoggerWriter", daemon=True)
+                self._worker.start()
+
             self.log("state", {"event": "run_start", "map": map_name, "opponent": opponent})
         except Exception:
             # never break the bot due to logging
@@ -83,6 +166,15 @@ class DebugLogger:
         try:
             if not self.enabled:
                 return
+            self._flush_repeats()
+            self._stop_worker()
+            if self._fp is not None and (self.dropped or self.background or self.suppressed):
+                self._write_lines([self._encode("state", {
+                    "event": "logger_stats",
+                    "written": self.written,
+                    "dropped": dict(self.dropped),
+                    "suppressed": dict(self.suppressed),
+                })])
             self._flush(force=True)
             if self._fp:
                 self._fp.close()
@@ -91,26 +183,29 @@ class DebugLogger:
         finally:
             self._fp = None
             self._run = None
+            self._bin = None
 
     # -------------------------
     # Public API
     # -------------------------
-    def log(self, channel: str, obj: Dict[str, Any]) -> None:
+    def set_rule(self, channel: str, event: str = "*", rule: LogRule = _NO_RULE, *, key: Optional[str] = None) -> None:
+        """Register a sampling rule for channel/event (event='*' = whole channel; key = finer grain)."""
+        name = f"{channel}:{event}" if key is None else f"{channel}:{event}:{key}"
+        self.rules[name] = rule
+        self._rule_cache.clear()
+
+    def log(self, channel: str, obj: Dict[str, Any], *, key: Optional[str] = None) -> None:
+        """key: optional sub-stream (e.g. intent name) with its own rule state."""
         if not self.enabled or self._fp is None:
             return
 
         try:
             payload = dict(obj) if isinstance(obj, dict) else {"msg": str(obj)}
-            payload.setdefault("channel", str(channel))
 
-            s = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
-            if len(s.encode("utf-8")) > self.max_payload_bytes:
-                payload = self._shrink(payload)
-                s = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+            if self.rules and not self._admit(str(channel), payload, key):
+                return
 
-            self._fp.write(s + "\n")
-            self._lines_since_flush += 1
-            self._flush()
+            self._emit(channel, payload)
         except Exception:
             # swallow any logging failures
             return
@@ -128,9 +223,178 @@ class DebugLogger:
     def log_building(self, obj: Dict[str, Any]) -> None:
         self.log("building", obj)
 
+    def log_perf(self, obj: Dict[str, Any]) -> None:
+        self.log("perf", obj)
+
     # -------------------------
     # Internals
     # -------------------------
+    def _emit(self, channel: str, payload: Dict[str, Any]) -> None:
+        if self.background and self._worker is not None:
+            self._enqueue(channel, payload)
+            return
+        self._write_lines([self._encode(channel, payload)])
+        self._flush()
+
+    def _rule_for(self, channel: str, event: str, key: Optional[str]) -> LogRule:
+        ck = (channel, event, key)
+        rule = self._rule_cache.get(ck)
+        if rule is None:
+            rule = _NO_RULE
+            names = ([f"{channel}:{event}:{key}"] if key is not None else []) + [f"{channel}:{event}", f"{channel}:*"]
+            for name in names:
+                if name in self.rules:
+                    rule = self.rules[name]
+                    break
+            self._rule_cache[ck] = rule
+        return rule
+
+    def _suppress(self, channel: str, event: str) -> None:
+        name = f"{channel}:{event}"
+        self.suppressed[name] = self.suppressed.get(name, 0) + 1
+
+    def _admit(self, channel: str, payload: Dict[str, Any], key: Optional[str]) -> bool:
+        event = str(payload.get("event", "*"))
+        rule = self._rule_for(channel, event, key)
+        if rule is _NO_RULE:
+            return True
+        sk = (channel, event, key, tuple(str(payload.get(f)) for f in rule.by)) if rule.by else (channel, event, key)
+        st = self._rule_state.get(sk)
+        if st is None:
+            st = self._rule_state[sk] = _RuleState()
+        it = payload.get("it")
+
+        if rule.every_n_it > 0 and isinstance(it, int) and st.last_it is not None:
+            if it - st.last_it < rule.every_n_it:
+                self._suppress(channel, event)
+                return False
+
+        if rule.dedupe or rule.rle:
+            skip = _VOLATILE_KEYS + rule.ignore if rule.ignore else _VOLATILE_KEYS
+            sig = repr(sorted((k, v) for k, v in payload.items() if k not in skip))
+            if sig == st.sig:
+                self._suppress(channel, event)
+                if rule.rle:
+                    if st.repeats == 0:
+                        st.it_from = it
+                    st.repeats += 1
+                    st.it_to = it
+                return False
+            self._close_run(channel, event, st)
+            st.sig = sig
+            if rule.rle:
+                st.sample = {k: v for k, v in payload.items() if k not in skip}
+
+        if isinstance(it, int):
+            st.last_it = it
+        return True
+
+    def _close_run(self, channel: str, event: str, st: _RuleState) -> None:
+        if st.repeats <= 0:
+            return
+        self._emit(channel, {
+            "event": "repeat",
+            "of": event,
+            "count": st.repeats,
+            "it_from": st.it_from,
+            "it_to": st.it_to,
+            "payload": st.sample,
+        })
+        st.repeats = 0
+        st.it_from = st.it_to = None
+
+    def _flush_repeats(self) -> None:
+        for sk, st in self._rule_state.items():
+            channel, event = sk[0], sk[1]
+            try:
+                self._close_run(channel, event, st)
+            except Exception:
+                continue
+
+    def _encode(self, channel: str, payload: Dict[str, Any]) -> str | bytes:
+        payload.setdefault("channel", str(channel))
+        if self._bin is not None:
+            cp = self._bin.checkpoint()
+            b = self._bin.encode(payload)
+            if len(b) > self.max_payload_bytes:
+                # the discarded bytes carried new STR/SCHEMA definitions: forget them too
+                self._bin.rollback(cp)
+                b = self._bin.encode(self._shrink(payload))
+            return b
+        s = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+        # utf-8 is at most 4 bytes/char: only pay for encode() when it might be too big
+        if len(s) * 4 > self.max_payload_bytes and len(s.encode("utf-8")) > self.max_payload_bytes:
+            s = json.dumps(self._shrink(payload), ensure_ascii=False, separators=(",", ":"))
+        return s
+
+    def _write_lines(self, lines: list) -> None:
+        if self._fp is None or not lines:
+            return
+        if self._bin is not None:
+            self._fp.write(b"".join(lines))
+        else:
+            self._fp.write("\n".join(lines) + "\n")
+        self._lines_since_flush += len(lines)
+        self.written += len(lines)
+
+    def _enqueue(self, channel: str, payload: Dict[str, Any]) -> None:
+        q = self._q
+        if len(q) >= self.queue_size:
+            if self.drop_policy == "drop_new":
+                key = str(channel)
+                self.dropped[key] = self.dropped.get(key, 0) + 1
+                return
+            # drop_old: the evicted record's channel pays (the writer may have drained it meanwhile)
+            try:
+                old_channel, _ = q.popleft()
+            except IndexError:
+                pass
+            else:
+                key = str(old_channel)
+                self.dropped[key] = self.dropped.get(key, 0) + 1
+        q.append((channel, payload))
+        if len(q) >= self.batch_lines:
+            self._wake.set()
+
+    def _drain(self) -> None:
+        q = self._q
+        while q:
+            lines = []
+            for _ in range(min(len(q), self.batch_lines)):
+                try:
+                    channel, payload = q.popleft()
+                except IndexError:
+                    break
+                try:
+                    lines.append(self._encode(channel, payload))
+                except Exception:
+                    continue
+            self._write_lines(lines)
+        self._flush()
+
+    def _run_worker(self) -> None:
+        while not self._stop:
+            self._wake.wait(self.flush_every_seconds / 4)
+            self._wake.clear()
+            try:
+                self._drain()
+            except Exception:
+                continue
+
+    def _stop_worker(self) -> None:
+        w = self._worker
+        if w is None:
+            return
+        self._stop = True
+        self._wake.set()
+        try:
+            w.join(timeout=5.0)
+        except Exception:
+            pass
+        self._worker = None
+        # whatever is left (worker stopped or timed out) is written here
+        self._drain()
+
     def _flush(self, *, force: bool = False) -> None:
         if self._fp is None:
             return
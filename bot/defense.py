@@ -0,0 +1,275 @@
+#defense.py
+from __future__ import annotations
+
+import math
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sc2.ids.ability_id import AbilityId as A
+from sc2.ids.unit_typeid import UnitTypeId as U
+from sc2.position import Point2
+
+from .api import BotAPI
+from .expansion import TOWNHALLS
+from .memory import EnemyMemory, Sighting
+from .micro import MarineMicro
+from .state import BotState
+from .utils import game_loop, snap
+
+# seen in our bases all the time, never worth a response
+HARMLESS = tuple(
+    t for t in (getattr(U, n, None) for n in ("OVERLORD", "OVERLORDTRANSPORT", "OVERSEER", "OBSERVER", "CHANGELING"))
+    if t is not None
+)
+ENEMY_WORKERS = tuple(t for t in (getattr(U, n, None) for n in ("SCV", "PROBE", "DRONE")) if t is not None)
+PRODUCTION = (U.BARRACKS, U.FACTORY, U.STARPORT)
+
+
+class Defense:
+    """
+    Defesa das bases.
+    - zona = baldes do índice da EnemyMemory a até zone_radius das nossas
+      townhalls; só é reavaliada quando um balde dela foi tocado no frame
+      (tag entrou/saiu/morreu), então frame em paz custa uma interseção de sets
+    - ameaça = unidades (não estruturas) vistas neste frame a até zone_radius
+      de uma townhall (memory.near); o balde é só o gatilho: enquanto houver
+      unidade inimiga nos baldes da zona, a distância é refeita todo frame
+    - ameaça: marines livres (fora de drops/scout) vão pra cima com a
+      MarineMicro; SCVs próximos entram quando a força inimiga passa a nossa
+    - produção com rally num ponto defensivo (rampa com uma base, frente da
+      base mais exposta depois); só reemitido quando o ponto ou os prédios mudam
+    """
+
+    def __init__(
+        self,
+        bot: Any,
+        state: BotState,
+        memory: EnemyMemory,
+        reserved: Optional[set] = None,
+        debug: bool = True,
+        api: Optional[BotAPI] = None,
+    ):
+        self.bot = bot
+        self.api = api or BotAPI(bot)
+        self.world = self.api.world
+        self.state = state
+        self.memory = memory
+        self.reserved: set = reserved if reserved is not None else set()
+        self.debug = debug
+
+        # Tunables
+        self.zone_radius = 18.0
+        self.check_every = 22  # loops between townhall / production checks
+        self.worker_weight = 0.5  # an enemy worker counts as half a unit
+        self.scv_per_unit = 2  # SCVs pulled per unit of strength we're missing
+        self.max_scvs = 12
+        self.scv_leash = 20.0  # pulled SCVs further than this from the base go back to mining
+
+        self.micro = MarineMicro(bot, api=self.api, memory=memory)
+        self.threat: Set[int] = set()  # enemy tags in the zone worth answering
+        self.nearby: Set[int] = set()  # enemy unit tags remembered in the zone buckets (watched every frame)
+        self.evaluations = 0  # zone re-evaluations (perf / debug)
+        self.rally_point: Optional[Point2] = None
+
+        self._zone: Set[Tuple[int, int]] = set()
+        self._zone_sig: Tuple[int, ...] = ()
+        self._bases: List[Point2] = []
+        self._dirty = True
+        self._next_check = 0
+        self._rallied: Dict[int, Point2] = {}  # production tag -> rally issued
+        self._scvs: Set[int] = set()
+
+    def _log(self, payload: dict) -> None:
+        dbg = getattr(self.bot, "dbg", None)
+        if dbg is None or not self.debug:
+            return
+        try:
+            snap0 = self.api.snapshot()
+            payload.setdefault("t", snap0.t)
+            payload.setdefault("it", snap0.it)
+            dbg.log_action(payload)
+        except Exception:
+            return
+
+    # ---------------------------
+    # Zone / detection
+    # ---------------------------
+    def _townhalls(self) -> List[Any]:
+        return [th for t in TOWNHALLS for th in self.world.units(t)]
+
+    def _refresh_zone(self) -> None:
+        ths = self._townhalls()
+        sig = tuple(sorted(th.tag for th in ths))
+        if sig == self._zone_sig:
+            return
+        self._zone_sig = sig
+        self._bases = [th.position for th in ths]
+        self._zone = set()
+        for p in self._bases:
+            self._zone |= self.memory.cells_near(p, self.zone_radius)
+        self._dirty = True
+
+    def _watch(self) -> None:
+        """Zone buckets changed: which remembered enemy units are close enough to keep an eye on."""
+        entries = self.memory.entries
+        self.nearby = {
+            t for t in self.memory.in_cells(self._zone)
+            if not entries[t].is_structure and entries[t].type_id not in HARMLESS
+        }
+
+    def _evaluate(self) -> None:
+        """Enemy units in sight within zone_radius of a townhall, harmless ones out."""
+        self.evaluations += 1
+        threat = {
+            s.tag
+            for p in self._bases
+            for s in self.memory.near(p, self.zone_radius, structures=False, visible_only=True)
+            if s.type_id not in HARMLESS
+        }
+        if threat and not self.threat:
+            self._log({"event": "defense_alert", "enemies": len(threat)})
+        elif self.threat and not threat:
+            self._log({"event": "defense_clear"})
+        self.threat = threat
+
+    def _strength(self, enemies: List[Sighting]) -> float:
+        return sum(self.worker_weight if s.type_id in ENEMY_WORKERS else 1.0 for s in enemies)
+
+    # ---------------------------
+    # Rally
+    # ---------------------------
+    def _defense_point(self) -> Optional[Point2]:
+        if not self._bases:
+            return None
+        if len(self._bases) == 1:
+            ramp = getattr(self.bot, "main_base_ramp", None)
+            top = getattr(ramp, "top_center", None) if ramp is not None else None
+            if top is not None:
+                return snap(top)
+        center = getattr(getattr(self.bot, "game_info", None), "map_center", None)
+        if center is None:
+            return snap(self._bases[0])
+        front = min(self._bases, key=center.distance_to)
+        return snap(front.towards(center, 6))
+
+    async def _rally(self) -> None:
+        point = self._defense_point()
+        if point is None:
+            return
+        if point != self.rally_point:
+            self.rally_point = point
+            self._log({"event": "defense_rally", "pos": [point.x, point.y]})
+        live = set()
+        for ut in PRODUCTION:
+            for s in self.world.ready(ut):
+                live.add(s.tag)
+                if self._rallied.get(s.tag) == point:
+                    continue
+                try:
+                    await self.api.do(s(A.RALLY_BUILDING, point))
+                except Exception:
+                    continue
+                self._rallied[s.tag] = point
+        for tag in [t for t in self._rallied if t not in live]:
+            del self._rallied[tag]
+
+    # ---------------------------
+    # Response
+    # ---------------------------
+    def _free_marines(self) -> List[Any]:
+        busy = set(self.state.scouting)
+        for d in self.state.drops.values():
+            busy |= d.marine_tags
+        return [m for m in self.world.ready(U.MARINE) if m.tag not in busy]
+
+    async def _pull_scvs(self, need: int, target: Point2, base: Point2) -> None:
+        have = self.world.tag_map(U.SCV)
+        for t in [t for t in self._scvs if t not in have]:
+            self._scvs.discard(t)
+            self.reserved.discard(t)
+            self.state.defending.discard(t)
+        # leashed: whoever chased too far goes back
+        for t in list(self._scvs):
+            w = have[t]
+            if w.distance_to(base) > self.scv_leash:
+                await self._send_home(w)
+            elif getattr(w, "is_idle", False):
+                await self.api.do(w.attack(target))
+        missing = min(need, self.max_scvs) - len(self._scvs)
+        if missing > 0:
+            pool = [
+                w for w in have.values()
+                if w.tag not in self.reserved and w.tag not in self._scvs and w.distance_to(base) <= self.scv_leash
+            ]
+            pool.sort(key=lambda w: w.distance_to(target))
+            for w in pool[:missing]:
+                self._scvs.add(w.tag)
+                self.reserved.add(w.tag)
+                self.state.defending.add(w.tag)
+                await self.api.do(w.attack(target))
+            if pool:
+                self._log({"event": "defense_scvs", "pulled": len(self._scvs)})
+
+    async def _send_home(self, w: Any) -> None:
+        self._scvs.discard(w.tag)
+        self.reserved.discard(w.tag)
+        self.state.defending.discard(w.tag)
+        minerals = getattr(self.bot, "mineral_field", None)
+        if minerals:
+            mf = self.api.closest_to(minerals, w.position)
+            if mf is not None:
+                await self.api.do(w.gather(mf))
+
+    async def _stand_down(self) -> None:
+        have = self.world.tag_map(U.SCV)
+        for t in list(self._scvs):
+            w = have.get(t)
+            if w is not None:
+                await self._send_home(w)
+            else:
+                self._scvs.discard(t)
+                self.reserved.discard(t)
+        marines = self.world.tag_map(U.MARINE)
+        for t in list(self.state.defending):
+            m = marines.get(t)
+            if m is not None and self.rally_point is not None:
+                await self.api.do(m.attack(self.rally_point))
+        self.state.defending.clear()
+
+    async def _respond(self) -> None:
+        entries = self.memory.entries
+        enemies = [entries[t] for t in self.threat if t in entries]
+        if not enemies:
+            return
+        x = sum(s.position.x for s in enemies) / len(enemies)
+        y = sum(s.position.y for s in enemies) / len(enemies)
+        target = Point2((x, y))
+        base = min(self._bases, key=target.distance_to) if self._bases else target
+
+        army = self._free_marines()
+        for m in army:
+            self.state.defending.add(m.tag)
+        if army:
+            self.micro.engage_radius = self.zone_radius
+            await self.micro.step(army, target)
+
+        missing = self._strength(enemies) - len(army)
+        if missing > 0 or self._scvs:
+            await self._pull_scvs(max(0, math.ceil(missing * self.scv_per_unit)), target, base)
+
+    async def step(self) -> None:
+        now = game_loop(self.bot)
+        if now >= self._next_check:
+            self._next_check = now + self.check_every
+            self._refresh_zone()
+            await self._rally()
+        touched = self._dirty or not self.memory.touched.isdisjoint(self._zone)
+        if touched:
+            self._dirty = False
+            self._watch()
+        # with units in the buckets, distance / sight can change without touching a bucket
+        if touched or self.nearby:
+            self._evaluate()
+            if not self.threat and (self.state.defending or self._scvs):
+                await self._stand_down()
+        if self.threat:
+            await self._respond()
@@ -1,150 +1,302 @@
 #drop.py
 from __future__ import annotations
 
-from typing import Any, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
 from sc2.ids.ability_id import AbilityId as A
 from sc2.ids.unit_typeid import UnitTypeId as U
 from sc2.position import Point2
 
 from .api import BotAPI
-from .state import BotState
+from .influence import InfluenceMap
+from .memory import ENEMY_TOWNHALLS, EnemyMemory
+from .micro import MarineMicro
+from .state import BotState, DropPlan
 from .utils import game_loop, snap
 
 
 class Drop:
     """
-    Simple medivac drop state machine.
-    - waits for 1 medivac + >= 8 marines
-    - loads up to 8 marines
-    - moves to staging then drop
-    - unloads, stims, attacks enemy main
+    Drops de medivac em esquadrões independentes (BotState.drops).
+    - forma um esquadrão quando há medivac livre + >= min_marines marines
+      livres: os load_count mais próximos entram por tag, uma vez
+    - cada esquadrão tem sua máquina de estados (load -> staging -> drop ->
+      unload -> micro) e sua base alvo (a menos disputada); os LOADs vão
+      enfileirados e o medivac só sai com a carga completa (ou no
+      load_timeout): quem não embarcou volta para o pool livre
+    - por frame, cada esquadrão só olha os próprios membros (tag -> unit do
+      WorldView); o exército inteiro só é varrido ao formar esquadrões
+    - com um InfluenceMap: staging/ponto de drop vão para células sem
+      antiaéreo e o medivac voa até o staging pelo caminho mais barato
+    - com uma EnemyMemory: alvos = main achada + townhalls lembradas (mesmo
+      fora de vista), sem varrer enemy_structures
     """
 
-    def __init__(self, bot: Any, state: BotState, debug: bool = True):
+    def __init__(
+        self,
+        bot: Any,
+        state: BotState,
+        debug: bool = True,
+        api: Optional[BotAPI] = None,
+        influence: Optional[InfluenceMap] = None,
+        memory: Optional[EnemyMemory] = None,
+    ):
         self.bot = bot
-        self.api = BotAPI(bot)
+        self.api = api or BotAPI(bot)
+        self.world = self.api.world
         self.state = state
         self.debug = debug
+        self.influence = influence
+        self.memory = memory
 
         # Tunables
         self.min_marines = 8
         self.load_count = 8
         self.move_eps = 3.0
         self.ground_radius = 12.0
+        self.max_squads = 3
+        self.form_every = 22  # loops between attempts to form a new squad
+        self.load_radius = 10.0
+        self.load_timeout = 224  # loops (~10s) to board before leaving with whoever is aboard
+        self.unload_grace = 67  # loops after unloading before missing members count as dead
+        self.repath_every = 90  # loops between route refreshes on the threat map
+
+        self._next_form = 0
+        self._next_id = 1
+        self.micro = MarineMicro(bot, api=self.api, memory=memory)
+
+    @property
+    def squads(self) -> Dict[int, DropPlan]:
+        return self.state.drops
+
+    def _log(self, payload: dict) -> None:
+        dbg = getattr(self.bot, "dbg", None)
+        if dbg is None or not self.debug:
+            return
+        try:
+            snap0 = self.api.snapshot()
+            payload.setdefault("t", snap0.t)
+            payload.setdefault("it", snap0.it)
+            dbg.log_action(payload)
+        except Exception:
+            return
 
     def _enemy_main(self) -> Optional[Point2]:
+        if self.memory is not None:
+            main = self.memory.enemy_main()
+            if main is not None:
+                return main
         locs = getattr(self.bot, "enemy_start_locations", None)
         if not locs:
             return None
         return locs[0]
 
-    def _compute_positions(self) -> tuple[Optional[Point2], Optional[Point2]]:
-        enemy_main = self._enemy_main()
-        if enemy_main is None:
-            return None, None
-
-        center = self.bot.game_info.map_center
-        staging = snap(enemy_main.towards(center, 12))
-        drop_pos = snap(enemy_main.towards(center, 6))
-        return staging, drop_pos
+    # ---------------------------
+    # Targets
+    # ---------------------------
+    def _targets(self) -> List[Point2]:
+        """Enemy main first, then every enemy townhall we've seen (checked only when forming)."""
+        out: List[Point2] = []
+        main = self._enemy_main()
+        if main is not None:
+            out.append(main)
+        if self.memory is not None:
+            seen = [s.position for s in self.memory.townhalls()]
+        else:
+            seen = [s.position for s in getattr(self.bot, "enemy_structures", None) or [] if getattr(s, "type_id", None) in ENEMY_TOWNHALLS]
+        for p in seen:
+            if all(p.distance_to(q) > 8 for q in out):
+                out.append(p)
+        return out
 
-    def _sorted_by_distance(self, units, ref_unit):
-        if hasattr(units, "sorted_by_distance_to"):
-            try:
-                return units.sorted_by_distance_to(ref_unit)
-            except Exception:
-                pass
-        # fallback list sort
-        try:
-            return sorted(list(units), key=lambda u: u.distance_to(ref_unit))
-        except Exception:
-            return list(units)
+    def _pick_target(self) -> Optional[Point2]:
+        targets = self._targets()
+        if not targets:
+            return None
+        load = [sum(1 for d in self.squads.values() if d.target_base is not None and d.target_base.distance_to(t) < 8) for t in targets]
+        return targets[int(np.argmin(load))]  # first on ties: the main
 
-    def _closer_than(self, units, dist: float, pos: Point2):
-        return self.api.closer_than(units, dist, pos)
+    def _compute_positions(self, base: Point2) -> Tuple[Point2, Point2]:
+        center = self.bot.game_info.map_center
+        staging = base.towards(center, 12)
+        drop_pos = base.towards(center, 6)
+        inf = self.influence
+        if inf is not None and inf.ready:
+            # same spots while nothing shoots up there; otherwise the calmest cell nearby
+            staging = inf.safest_near(staging, 8.0)
+            drop_pos = inf.safest_near(drop_pos, 4.0, ground=True)
+        return snap(staging), snap(drop_pos)
 
-    async def step(self) -> None:
-        now = game_loop(self.bot)
+    # ---------------------------
+    # Forming
+    # ---------------------------
+    def _claimed(self) -> Tuple[set, set]:
+        meds, marines = set(), self.state.scouting | self.state.defending
+        for d in self.squads.values():
+            if d.medivac_tag is not None:
+                meds.add(d.medivac_tag)
+            marines |= d.marine_tags
+        return meds, marines
 
-        medivacs = self.api.ready(U.MEDIVAC)
-        marines = self.api.ready(U.MARINE)
+    @staticmethod
+    def _nearest(units: List[Any], ref: Point2, n: int) -> List[Any]:
+        if len(units) <= n:
+            return list(units)
+        xy = np.array([(u.position.x, u.position.y) for u in units], dtype=np.float64)
+        d2 = ((xy - (ref.x, ref.y)) ** 2).sum(axis=1)
+        idx = np.argpartition(d2, n - 1)[:n]
+        return [units[i] for i in idx[np.argsort(d2[idx], kind="stable")]]
 
-        if (not self.api.exists(medivacs)) or (self.api.amount(marines) < self.min_marines):
-            self.state.drop.in_progress = False
+    def _form(self, now: int) -> None:
+        if len(self.squads) >= self.max_squads or now < self._next_form:
             return
+        self._next_form = now + self.form_every
 
-        med = self.api.first(medivacs)
-        if med is None:
-            self.state.drop.in_progress = False
+        claimed_meds, claimed_marines = self._claimed()
+        meds = [m for m in self.world.ready(U.MEDIVAC) if m.tag not in claimed_meds]
+        if not meds:
+            return
+        free = [m for m in self.world.ready(U.MARINE) if m.tag not in claimed_marines]
+        if len(free) < self.min_marines:
+            return
+        target = self._pick_target()
+        if target is None:
             return
 
-        staging, drop_pos = self._compute_positions()
-        if staging is None or drop_pos is None:
+        med = meds[0]
+        members = self._nearest(free, med.position, self.load_count)
+        staging, drop_pos = self._compute_positions(target)
+        d = DropPlan(
+            squad_id=self._next_id,
+            in_progress=True,
+            target_base=target,
+            staging_pos=staging,
+            target_pos=drop_pos,
+            medivac_tag=med.tag,
+            marine_tags={m.tag for m in members},
+            started_loop=now,
+        )
+        self._next_id += 1
+        self.squads[d.squad_id] = d
+        self._log({"event": "drop_start", "squad": d.squad_id, "marines": len(members), "target": [drop_pos.x, drop_pos.y]})
+
+    # ---------------------------
+    # One squad
+    # ---------------------------
+    async def _fly(self, d: DropPlan, med: Any, goal: Point2, now: int) -> None:
+        """Medivac towards goal along the threat map route (straight without a map / with a calm one)."""
+        inf = self.influence
+        if inf is None:
+            await self.api.do(med.move(goal))
             return
+        if not d.waypoints or d.waypoints[-1] != goal or now - d.path_loop >= self.repath_every:
+            d.waypoints = inf.path(med.position, goal)
+            d.path_loop = now
+        while len(d.waypoints) > 1 and med.distance_to(d.waypoints[0]) <= self.move_eps:
+            d.waypoints.pop(0)
+        await self.api.do(med.move(d.waypoints[0]))
 
-        d = self.state.drop
-        if not d.in_progress:
-            d.in_progress = True
-            d.loaded = False
-            d.dropped = False
-            d.staging_pos = staging
-            d.target_pos = drop_pos
+    async def _step_squad(self, d: DropPlan, now: int) -> bool:
+        """Advance one squad; False when it's done (disband)."""
+        med = self.world.tag_map(U.MEDIVAC).get(d.medivac_tag)
+        marine_map = self.world.tag_map(U.MARINE)
+        # loaded marines aren't listed: only prune while they must be visible
+        ground = [marine_map[t] for t in d.marine_tags if t in marine_map]
 
         # --- LOAD PHASE ---
         if not d.loaded:
-            candidates = self._sorted_by_distance(marines, med)
-            loaded_any = False
-
-            for m in candidates[: self.load_count]:
-                if med.distance_to(m) > 10:
-                    continue
-                try:
-                    await self.bot.do(med(A.LOAD, m))
-                    loaded_any = True
-                except Exception:
-                    continue
-
-            if getattr(med, "cargo_used", 0) > 0 or loaded_any:
-                d.loaded = True
-            return
+            cargo = int(getattr(med, "cargo_used", 0) or 0) if med is not None else 0
+            if med is None or (not ground and cargo == 0):
+                self._log({"event": "drop_abort", "squad": d.squad_id, "medivac": med is not None, "marines": len(ground)})
+                return False
+            waiting = bool(ground) and cargo < len(d.marine_tags)
+            if waiting and (not d.boarding or now - d.started_loop < self.load_timeout):
+                near = [m for m in ground if med.distance_to(m) <= self.load_radius]
+                if not near:
+                    await self.api.do(med.move(self.api.closest_to(ground, med.position).position))
+                    return True
+                if not d.boarding:
+                    d.started_loop = now  # load_timeout counts from the first LOAD, not from forming
+                # queued: several LOADs in one frame would replace each other; re-sent if the medivac went idle
+                idle = getattr(med, "is_idle", False)
+                for m in near:
+                    if m.tag in d.boarding and not idle:
+                        continue
+                    try:
+                        await self.api.do(med(A.LOAD, m, queue=True))
+                        d.boarding.add(m.tag)
+                    except Exception:
+                        continue
+                return True
+            if cargo == 0:
+                await self.api.do(med.move(med.position))  # drop the queued LOADs with the squad
+                self._log({"event": "drop_abort", "squad": d.squad_id, "medivac": True, "marines": len(ground)})
+                return False
+            # aboard = members no longer on the ground; the rest go back to the free pool before we leave
+            d.marine_tags -= {m.tag for m in ground}
+            d.loaded = True
+            self._log({"event": "drop_loaded", "squad": d.squad_id, "cargo": cargo, "left": len(ground)})
+            return True
 
         # --- MOVE / UNLOAD PHASE ---
-        if d.loaded and not d.dropped:
+        if not d.dropped:
             assert d.staging_pos is not None and d.target_pos is not None
+            if med is None:
+                self._log({"event": "drop_abort", "squad": d.squad_id, "medivac": False, "marines": len(ground)})
+                return False
 
-            if med.distance_to(d.staging_pos) > self.move_eps:
-                await self.bot.do(med.move(d.staging_pos))
-                return
+            if not d.staged:
+                if med.distance_to(d.staging_pos) > self.move_eps:
+                    await self._fly(d, med, d.staging_pos, now)
+                    return True
+                d.staged = True
+                d.waypoints = []
+                # the base is in sight now: re-pick the drop point with what we see
+                if d.target_base is not None:
+                    d.target_pos = self._compute_positions(d.target_base)[1]
 
+            # last hop: short and straight, the drop point was already picked calm
             if med.distance_to(d.target_pos) > self.move_eps:
-                await self.bot.do(med.move(d.target_pos))
-                return
+                await self.api.do(med.move(d.target_pos))
+                return True
 
             try:
-                await self.bot.do(med(A.UNLOADALLAT_MEDIVAC, d.target_pos))
+                await self.api.do(med(A.UNLOADALLAT_MEDIVAC, d.target_pos))
             except Exception:
-                return
+                return True
 
             d.dropped = True
+            d.started_loop = now
             self.state.mark_try("drop", now)
-            return
+            self._log({"event": "drop_unload", "squad": d.squad_id, "pos": [d.target_pos.x, d.target_pos.y]})
+            return True
 
         # --- POST-DROP MICRO ---
-        if d.dropped:
-            enemy_main = self._enemy_main()
-            if enemy_main is None or d.target_pos is None:
-                return
-
-            ground = self._closer_than(marines, self.ground_radius, d.target_pos)
-
-            for m in ground:
-                try:
-                    if m.has_ability(A.EFFECT_STIM):
-                        await self.bot.do(m(A.EFFECT_STIM))
-                except Exception:
-                    pass
-                await self.bot.do(m.attack(enemy_main))
-
-            if getattr(med, "is_idle", False) and d.staging_pos is not None:
-                await self.bot.do(med.move(d.staging_pos))
\ No newline at end of file
+        if now - d.started_loop >= self.unload_grace:
+            d.marine_tags = {m.tag for m in ground}
+            if not ground:
+                self._log({"event": "drop_end", "squad": d.squad_id})
+                return False
+
+        enemy_main = self._enemy_main()
+        target = d.target_base or enemy_main
+        if target is None or d.target_pos is None:
+            return True
+
+        # focus fire / kiting / stim in batch; only changed orders go out
+        self.micro.engage_radius = self.ground_radius
+        await self.micro.step(ground, target)
+
+        if med is not None and getattr(med, "is_idle", False) and d.staging_pos is not None:
+            await self.api.do(med.move(d.staging_pos))
+            # the medivac is free for the next squad once it leaves
+            d.medivac_tag = None
+        return True
+
+    async def step(self) -> None:
+        now = game_loop(self.bot)
+        for sid in list(self.squads):
+            if not await self._step_squad(self.squads[sid], now):
+                del self.squads[sid]
+        self._form(now)
@@ -1,9 +1,41 @@
 #economy.py
 from __future__ import annotations
 
+import heapq
+import math
+from bisect import bisect_left
+from collections import deque
 from dataclasses import dataclass
-from typing import Any, Dict, Tuple
+from itertools import accumulate
+from typing import Any, Deque, Dict, List, Optional, Tuple
 from sc2.ids.unit_typeid import UnitTypeId as U
+from sc2.position import Point2
+
+from .utils import game_loop
+
+LOOPS_PER_MIN = 22.4 * 60
+
+# per worker, per game second (faster): ~57/min on a 2-per-patch line, ~56/min per gas worker
+MINERALS_PER_WORKER_S = 0.95
+GAS_PER_WORKER_S = 0.94
+
+# reservation priorities: higher is funded first
+PRIORITY: Dict[U, int] = {
+    U.SUPPLYDEPOT: 100,
+    U.SCV: 90,
+    U.BARRACKS: 80,
+    U.REFINERY: 75,
+    U.FACTORY: 70,
+    U.STARPORT: 65,
+    U.COMMANDCENTER: 60,
+    U.MEDIVAC: 30,
+    U.MARINE: 20,
+}
+COMMITTED = 1000  # order already issued: the money is spoken for until the structure shows up
+
+
+def priority_of(unit_type: U) -> int:
+    return PRIORITY.get(unit_type, 50)
 
 
 @dataclass(frozen=True)
@@ -14,18 +46,66 @@ class Cost:
 
 @dataclass
 class Budget:
+    """Totals of the live reservations (kept in sync by Economy)."""
     reserved_m: int = 0
     reserved_g: int = 0
 
-    def reset(self) -> None:
-        self.reserved_m = 0
-        self.reserved_g = 0
+
+@dataclass
+class Reservation:
+    owner: str
+    unit_type: U
+    cost: Cost
+    priority: int
+    pos: Optional[Point2] = None
+    deadline: Optional[int] = None  # game_loop it should start by (tie-break inside a priority)
+    expires: int = 0
+    seq: int = 0
+    committed: bool = False
+    baseline: int = 0  # structures of this type when the order went out
+    eta: float = 0.0  # seconds until affordable, counting everything ahead of it
+
+    def sort_key(self) -> tuple:
+        return (-self.priority, self.deadline if self.deadline is not None else math.inf, self.seq)
 
 
 class Economy:
+    """
+    Orçamento + previsão.
+    - reservas persistentes num heap de prioridade (owner, prioridade, deadline,
+      expiração); nada é zerado por frame: quem precisa renova a reserva, o
+      resto expira sozinho
+    - um item é "pagável" quando o banco cobre a soma acumulada das reservas à
+      frente dele (ele incluso): prefix sums + bisect, O(log n) por consulta
+    - income_per_sec: modelo por workers + taxa medida; eta de cada reserva
+    """
+
     def __init__(self, bot: Any):
         self.bot = bot
         self.budget = Budget()
+        # fed by observe() (ExpansionManager's per-base counts)
+        self.workers_m = 0
+        self.workers_g = 0
+
+        self._live: Dict[str, Reservation] = {}
+        self._heap: List[tuple] = []  # (sort_key, owner, reservation); stale entries skipped
+        self._seq = 0
+        self._dirty = True
+        self._sorted: List[Reservation] = []
+        self._keys: List[tuple] = []
+        self._cum_m: List[int] = []
+        self._cum_g: List[int] = []
+        self._rank: Dict[str, int] = {}
+        # spent this frame (the bank only updates next observation)
+        self._spent_m = 0
+        self._spent_g = 0
+
+        # income samples: (game_loop, collected_m, collected_g), ~1 per second
+        self._income: Deque[Tuple[int, float, float]] = deque(maxlen=64)
+        # fallback when score isn't exposed: sum of positive bank deltas
+        self._acc_m = 0.0
+        self._acc_g = 0.0
+        self._last_bank: Tuple[int, int] | None = None
 
         # Minimal fallback table (only for when calculate_cost is unavailable).
         self._fallback: Dict[U, Cost] = {
@@ -37,6 +117,7 @@ class Economy:
             U.SCV: Cost(50, 0),
             U.MARINE: Cost(50, 0),
             U.MEDIVAC: Cost(100, 100),
+            U.COMMANDCENTER: Cost(400, 0),
         }
 
     def cost(self, unit_type: U) -> Cost:
@@ -46,17 +127,232 @@ class Economy:
             return Cost(int(getattr(c, "minerals", 0)), int(getattr(c, "vespene", 0)))
         return self._fallback.get(unit_type, Cost(0, 0))
 
-    def available(self) -> Tuple[int, int]:
-        m = int(getattr(self.bot, "minerals", 0)) - self.budget.reserved_m
-        g = int(getattr(self.bot, "vespene", 0)) - self.budget.reserved_g
+    def bank(self) -> Tuple[int, int]:
+        m = int(getattr(self.bot, "minerals", 0) or 0) - self._spent_m
+        g = int(getattr(self.bot, "vespene", 0) or 0) - self._spent_g
         return m, g
 
-    def can_afford_reserved(self, unit_type: U) -> bool:
-        c = self.cost(unit_type)
-        m, g = self.available()
-        return m >= c.minerals and g >= c.vespene
+    def available(self) -> Tuple[int, int]:
+        self._refresh()
+        m, g = self.bank()
+        return m - self.budget.reserved_m, g - self.budget.reserved_g
+
+    # ---------------------------
+    # Reservations
+    # ---------------------------
+    @staticmethod
+    def owner_for(unit_type: U) -> str:
+        """Owner key shared by every path that builds this structure (macros, plan, builder)."""
+        return f"build:{unit_type.name}"
+
+    def reserve(
+        self,
+        owner: str,
+        unit_type: U,
+        priority: Optional[int] = None,
+        *,
+        pos: Optional[Point2] = None,
+        ttl: int = 45,
+        deadline: Optional[int] = None,
+    ) -> Reservation:
+        """Create or renew owner's reservation; it expires ttl loops after the last renewal."""
+        now = game_loop(self.bot)
+        prio = priority_of(unit_type) if priority is None else int(priority)
+        cur = self._live.get(owner)
+        if cur is not None and cur.unit_type == unit_type and (cur.committed or (cur.priority == prio and cur.deadline == deadline)):
+            cur.expires = max(cur.expires, now + ttl)
+            if pos is not None:
+                cur.pos = pos
+            return cur
+        self._seq += 1
+        res = Reservation(
+            owner=owner,
+            unit_type=unit_type,
+            cost=self.cost(unit_type),
+            priority=prio,
+            pos=pos,
+            deadline=deadline,
+            expires=now + ttl,
+            seq=self._seq,
+        )
+        self._live[owner] = res
+        heapq.heappush(self._heap, (res.sort_key(), owner, res))
+        self._dirty = True
+        return res
 
-    def reserve(self, unit_type: U) -> None:
+    def commit(self, owner: str, unit_type: U, *, ttl: int = 224) -> Reservation:
+        """Order issued: hold the money (top priority) until the structure appears or ttl runs out."""
+        res = self.reserve(owner, unit_type, COMMITTED, ttl=ttl)
+        if not res.committed:
+            res.committed = True
+            res.baseline = self._structure_count(unit_type)
+            res.expires = game_loop(self.bot) + ttl
+        return res
+
+    def release(self, owner: str, *, keep_committed: bool = False) -> None:
+        """Drop owner's reservation; keep_committed leaves one whose order already went out (tick clears it)."""
+        res = self._live.get(owner)
+        if res is None or (keep_committed and res.committed):
+            return
+        del self._live[owner]
+        self._dirty = True
+
+    def spend(self, unit_type: U) -> None:
+        """Same-frame bookkeeping for trains issued in a loop (the bank only drops next frame)."""
         c = self.cost(unit_type)
-        self.budget.reserved_m += c.minerals
-        self.budget.reserved_g += c.vespene
\ No newline at end of file
+        self._spent_m += c.minerals
+        self._spent_g += c.vespene
+
+    def _structure_count(self, unit_type: U) -> int:
+        structures = getattr(self.bot, "structures", None)
+        try:
+            return len(structures(unit_type)) if callable(structures) else 0
+        except Exception:
+            return 0
+
+    def tick(self) -> None:
+        """Once per step, before anyone reserves: expire stale / fulfilled reservations."""
+        self._spent_m = 0
+        self._spent_g = 0
+        now = game_loop(self.bot)
+        for owner, res in list(self._live.items()):
+            if res.expires < now or (res.committed and self._structure_count(res.unit_type) > res.baseline):
+                del self._live[owner]
+                self._dirty = True
+
+    def _refresh(self) -> None:
+        if not self._dirty:
+            return
+        # drop stale heap entries, then read the live ones off in priority order
+        self._heap = [e for e in self._heap if self._live.get(e[1]) is e[2]]
+        heapq.heapify(self._heap)
+        self._sorted = [e[2] for e in heapq.nsmallest(len(self._heap), self._heap)]
+        self._keys = [r.sort_key() for r in self._sorted]
+        self._cum_m = list(accumulate(r.cost.minerals for r in self._sorted))
+        self._cum_g = list(accumulate(r.cost.vespene for r in self._sorted))
+        self._rank = {r.owner: i for i, r in enumerate(self._sorted)}
+        self.budget.reserved_m = self._cum_m[-1] if self._cum_m else 0
+        self.budget.reserved_g = self._cum_g[-1] if self._cum_g else 0
+        self._dirty = False
+
+    def _need_through(self, unit_type: U, owner: Optional[str], priority: int) -> Tuple[int, int]:
+        """
+        Cumulative (m, g) that must be in the bank before this item can be paid.
+        A resource the item doesn't cost isn't gated (0): a mineral-only item
+        doesn't wait behind gas held for the reservations ahead of it.
+        """
+        self._refresh()
+        i = self._rank.get(owner) if owner is not None else None
+        if i is not None:
+            c = self._sorted[i].cost
+            pm, pg = self._cum_m[i], self._cum_g[i]
+        else:
+            # not reserved: it sits after everything with a higher (or equal) priority
+            j = bisect_left(self._keys, (-priority, math.inf, math.inf))
+            c = self.cost(unit_type)
+            pm = (self._cum_m[j - 1] if j else 0) + c.minerals
+            pg = (self._cum_g[j - 1] if j else 0) + c.vespene
+        return (pm if c.minerals else 0), (pg if c.vespene else 0)
+
+    def can_afford(self, unit_type: U, *, owner: Optional[str] = None, priority: int = 0) -> bool:
+        need_m, need_g = self._need_through(unit_type, owner, priority)
+        m, g = self.bank()
+        return m >= need_m and g >= need_g
+
+    def claim(self, unit_type: U, priority: Optional[int] = None) -> bool:
+        """Unit production: True (and the cost is booked for this frame) if it fits at its priority."""
+        prio = priority_of(unit_type) if priority is None else priority
+        if not self.can_afford(unit_type, priority=prio):
+            return False
+        self.spend(unit_type)
+        return True
+
+    def can_afford_reserved(self, unit_type: U) -> bool:
+        """Structure builds: funded at their reservation's place, else behind every reservation."""
+        return self.can_afford(unit_type, owner=self.owner_for(unit_type))
+
+    @property
+    def queue(self) -> List[Reservation]:
+        """Live reservations in funding order, each with its eta."""
+        self._refresh()
+        for i, r in enumerate(self._sorted):
+            r.eta = self._eta_for(
+                self._cum_m[i] if r.cost.minerals else 0, self._cum_g[i] if r.cost.vespene else 0
+            )
+        return list(self._sorted)
+
+    # ---------------------------
+    # Forecast
+    # ---------------------------
+    def income_per_sec(self) -> Tuple[float, float]:
+        """Worker model blended with the measured rate (once there's ~10s of history)."""
+        model_m = self.workers_m * MINERALS_PER_WORKER_S
+        model_g = self.workers_g * GAS_PER_WORKER_S
+        if len(self._income) < 2 or self._income[-1][0] - self._income[0][0] < 224:
+            return model_m, model_g
+        rm, rg = self.income_rate()
+        rm, rg = rm / 60.0, rg / 60.0
+        m = (model_m + rm) / 2 if model_m > 0 else rm
+        g = (model_g + rg) / 2 if model_g > 0 else rg
+        return m, g
+
+    def _eta_for(self, need_m: int, need_g: int) -> float:
+        bm, bg = self.bank()
+        rm, rg = self.income_per_sec()
+        eta = 0.0
+        for need, have, rate in ((need_m, bm, rm), (need_g, bg, rg)):
+            short = need - have
+            if short <= 0:
+                continue
+            eta = max(eta, short / rate if rate > 0 else math.inf)
+        return eta
+
+    def eta(self, unit_type: U, *, owner: Optional[str] = None, priority: int = 0) -> float:
+        """Seconds until unit_type is affordable at its place in the reservation order."""
+        return self._eta_for(*self._need_through(unit_type, owner, priority))
+
+    # ---------------------------
+    # Income (measured)
+    # ---------------------------
+    def _collected(self) -> Tuple[float, float]:
+        score = getattr(getattr(self.bot, "state", None), "score", None)
+        cm = getattr(score, "collected_minerals", None)
+        cg = getattr(score, "collected_vespene", None)
+        if cm is not None and cg is not None:
+            return float(cm), float(cg)
+        # underestimates when spending and mining land on the same frame; good enough for trends
+        m = int(getattr(self.bot, "minerals", 0) or 0)
+        g = int(getattr(self.bot, "vespene", 0) or 0)
+        if self._last_bank is not None:
+            self._acc_m += max(0, m - self._last_bank[0])
+            self._acc_g += max(0, g - self._last_bank[1])
+        self._last_bank = (m, g)
+        return self._acc_m, self._acc_g
+
+    def observe(self, workers_m: int | None = None, workers_g: int | None = None) -> None:
+        """Call once per step: keeps a short history of collected resources."""
+        if workers_m is not None:
+            self.workers_m = int(workers_m)
+        if workers_g is not None:
+            self.workers_g = int(workers_g)
+        now = game_loop(self.bot)
+        cm, cg = self._collected()
+        if self._income and now - self._income[-1][0] < 22:
+            return
+        self._income.append((now, cm, cg))
+
+    def income_rate(self, window_loops: int = 672) -> Tuple[float, float]:
+        """(minerals, vespene) per game minute over the last ~window_loops (default 30s)."""
+        if len(self._income) < 2:
+            return 0.0, 0.0
+        last = self._income[-1]
+        first = last
+        for s in reversed(self._income):
+            if last[0] - s[0] > window_loops:
+                break
+            first = s
+        dt = last[0] - first[0]
+        if dt <= 0:
+            return 0.0, 0.0
+        k = LOOPS_PER_MIN / dt
+        return (last[1] - first[1]) * k, (last[2] - first[2]) * k
@@ -0,0 +1,240 @@
+#expansion.py
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from sc2.ids.ability_id import AbilityId as A
+from sc2.ids.unit_typeid import UnitTypeId as U
+from sc2.position import Point2
+
+from .api import BotAPI
+from .resources import ResourceIndex
+from .utils import snap
+
+TOWNHALLS = (U.COMMANDCENTER, U.ORBITALCOMMAND, U.PLANETARYFORTRESS)
+
+
+@dataclass
+class BaseInfo:
+    index: int  # ResourceIndex base index
+    pos: Point2
+    townhall_tag: int
+    ready: bool
+    workers_m: int = 0
+    ideal_m: int = 0
+    workers_g: int = 0
+    ideal_g: int = 0
+
+    @property
+    def deficit(self) -> int:
+        return (self.ideal_m + self.ideal_g) - (self.workers_m + self.workers_g)
+
+    @property
+    def saturation(self) -> float:
+        return self.workers_m / self.ideal_m if self.ideal_m else 1.0
+
+
+class ExpansionManager:
+    """
+    Macro multi-base.
+    - sites: bases do ResourceIndex, ordenadas uma vez por distância da main
+    - update(): saturação mineral/gás por townhall (assigned/ideal_harvesters
+      quando o fork expõe; senão estimativa pelas minerais da base)
+    - expande quando as bases estão saturadas E a renda medida (Economy) passa
+      de expand_income; a CC sai pelo Builder como qualquer outra estrutura
+    - SCVs novos saem da townhall com maior déficit; townhalls saturadas
+      mandam o rally de workers para a base que mais precisa
+    """
+
+    def __init__(self, bot: Any, econ, builder, resources: ResourceIndex, api: Optional[BotAPI] = None, debug: bool = True):
+        self.bot = bot
+        self.api = api or BotAPI(bot)
+        self.world = self.api.world
+        self.econ = econ
+        self.builder = builder
+        self.resources = resources
+        self.debug = debug
+
+        # knobs (from strategy)
+        self.max_bases = 3
+        self.max_workers = 66
+        self.expand_income = 600
+        self.expand_saturation = 0.8
+
+        self.bases: Dict[int, BaseInfo] = {}
+        self._order: Optional[List[int]] = None
+        self._rally: Dict[int, int] = {}  # townhall tag -> base index its workers rally to
+
+    def _log(self, payload: dict) -> None:
+        dbg = getattr(self.bot, "dbg", None)
+        if dbg is None:
+            return
+        try:
+            snap0 = self.api.snapshot()
+            payload.setdefault("t", snap0.t)
+            payload.setdefault("it", snap0.it)
+            dbg.log_building(payload)
+        except Exception:
+            return
+
+    # ---------------------------
+    # Sites
+    # ---------------------------
+    def _site_order(self) -> List[int]:
+        """Base indices by distance from our main, enemy main excluded (computed once)."""
+        if self._order is None and self.resources.ready:
+            res = self.resources
+            start = getattr(self.bot, "start_location", None)
+            enemy = list(getattr(self.bot, "enemy_start_locations", None) or [])
+            order = []
+            for i in range(len(res.bases)):
+                p = Point2((float(res.bases[i][0]), float(res.bases[i][1])))
+                if any(p.distance_to(e) < 10 for e in enemy):
+                    continue
+                order.append((p.distance_to(start) if start is not None else 0.0, i))
+            self._order = [i for _, i in sorted(order)]
+        return self._order or []
+
+    def next_site(self) -> Optional[Point2]:
+        enemy = list(getattr(self.bot, "enemy_structures", None) or [])
+        for i in self._site_order():
+            if i in self.bases:
+                continue
+            x, y = self.resources.bases[i]
+            p = Point2((float(x), float(y)))
+            if any(getattr(s, "position", p).distance_to(p) < 12 for s in enemy):
+                continue
+            return snap(p)
+        return None
+
+    # ---------------------------
+    # Saturation
+    # ---------------------------
+    def update(self) -> None:
+        """Rebuild the per-base view; townhalls and refineries only (a handful of units)."""
+        res = self.resources
+        self.bases = {}
+        if not res.ready:
+            return
+
+        for t in TOWNHALLS:
+            for th in self.world.units(t):
+                b = res.base_of(th.position)
+                if b is None or b in self.bases:
+                    continue
+                info = BaseInfo(index=b, pos=th.position, townhall_tag=th.tag, ready=bool(getattr(th, "is_ready", False)))
+                if info.ready:
+                    ideal = getattr(th, "ideal_harvesters", None)
+                    info.ideal_m = int(ideal) if ideal is not None else 2 * len(res.minerals_at(b))
+                    assigned = getattr(th, "assigned_harvesters", None)
+                    info.workers_m = int(assigned) if assigned is not None else self._count_near(th.position)
+                self.bases[b] = info
+
+        for r in self.world.ready(U.REFINERY):
+            b = res.base_of(r.position)
+            info = self.bases.get(b)
+            if info is None or not info.ready:
+                continue
+            if getattr(r, "vespene_contents", 1) == 0:
+                continue
+            info.ideal_g += int(getattr(r, "ideal_harvesters", 3) or 0)
+            info.workers_g += int(getattr(r, "assigned_harvesters", 0) or 0)
+
+    def _count_near(self, pos: Point2, radius: float = 10.0) -> int:
+        workers = getattr(self.bot, "workers", None)
+        if workers is None:
+            return 0
+        gathering = getattr(workers, "gathering", workers)
+        return self.api.amount(self.api.closer_than(gathering, radius, pos))
+
+    def worker_target(self, floor: int) -> int:
+        """SCVs worth having: every owned base (in progress included) filled, capped by max_workers."""
+        want = 0
+        for info in self.bases.values():
+            # a CC still building will want its mineral line full (~16) when done
+            want += (info.ideal_m + info.ideal_g) if info.ready else 16
+        return min(self.max_workers, max(floor, want))
+
+    def neediest(self) -> Optional[BaseInfo]:
+        ready = [b for b in self.bases.values() if b.ready]
+        if not ready:
+            return None
+        return max(ready, key=lambda b: b.deficit)
+
+    def trainers(self) -> List[Any]:
+        """Idle ready townhalls, biggest worker deficit first."""
+        out = []
+        for info in sorted(self.bases.values(), key=lambda b: -b.deficit):
+            if not info.ready:
+                continue
+            for t in TOWNHALLS:
+                th = next((u for u in self.world.idle(t) if u.tag == info.townhall_tag), None)
+                if th is not None:
+                    out.append(th)
+                    break
+        return out
+
+    # ---------------------------
+    # Expand
+    # ---------------------------
+    def should_expand(self) -> bool:
+        if len(self.bases) >= self.max_bases:
+            return False
+        if any(not b.ready for b in self.bases.values()) or self.world.pending(U.COMMANDCENTER) > 0:
+            return False
+        ready = [b for b in self.bases.values() if b.ready]
+        if not ready:
+            return False
+        ideal = sum(b.ideal_m for b in ready)
+        if ideal <= 0 or sum(b.workers_m for b in ready) < self.expand_saturation * ideal:
+            return False
+        income_m, _ = self.econ.income_rate()
+        if income_m < self.expand_income:
+            return False
+        return self.next_site() is not None
+
+    async def _rally_workers(self) -> None:
+        """Saturated townhalls send new SCVs to the base with the largest deficit."""
+        need = self.neediest()
+        if need is None or need.deficit <= 0:
+            return
+        ab = getattr(A, "RALLY_WORKERS", None)
+        if ab is None:
+            return
+        for info in self.bases.values():
+            if not info.ready:
+                continue
+            target = need.index if info.deficit <= 0 else info.index
+            if self._rally.get(info.townhall_tag) == target:
+                continue
+            th = next((u for t in TOWNHALLS for u in self.world.ready(t) if u.tag == info.townhall_tag), None)
+            if th is None:
+                continue
+            # onto a mineral field of that base, so new SCVs start mining instead of idling at a point
+            dest: Any = self.bases[target].pos
+            minerals = self.resources.minerals_at(target)
+            fields = getattr(self.bot, "mineral_field", None)
+            if len(minerals) and fields:
+                cx, cy = minerals.mean(axis=0)
+                mf = self.api.closest_to(fields, Point2((float(cx), float(cy))))
+                if mf is not None and mf.distance_to(dest) <= 12:
+                    dest = mf
+            await self.api.do(th(ab, dest))
+            self._rally[info.townhall_tag] = target
+
+    async def step(self) -> None:
+        await self._rally_workers()
+        if not self.should_expand():
+            return
+        site = self.next_site()
+        income_m, _ = self.econ.income_rate()
+        self._log({
+            "event": "expand_intent",
+            "bases": len(self.bases),
+            "site": [site.x, site.y],
+            "income_m": round(income_m, 1),
+        })
+        ok = await self.builder.try_build("expand", U.COMMANDCENTER, site, cooldown=32, max_existing=None, exact=True)
+        if ok:
+            self._log({"event": "expand", "site": [site.x, site.y], "bases": len(self.bases) + 1})
@@ -0,0 +1,306 @@
+#influence.py
+from __future__ import annotations
+
+import heapq
+import math
+from itertools import chain
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sc2.ids.unit_typeid import UnitTypeId as U
+from sc2.position import Point2
+
+from .utils import game_loop
+
+CELL = 2  # tiles per cell
+MARGIN = 2.0  # tiles beyond weapon range (medivac radius + reaction time)
+HALF_LIFE = 448.0  # loops (~20s): threat we stopped seeing halves this fast
+THREAT_COST = 0.5  # path cost per cell = length * (1 + THREAT_COST * threat)
+PATH_POOL = 2  # path search runs on PATH_POOL x PATH_POOL blocks of cells
+HEURISTIC_WEIGHT = 1.5  # weighted A*: route at most 1.5x the cheapest
+EPS = 1e-3
+
+# (air range, air dps) for units whose object doesn't expose them (fakes, older forks, loaded bunkers)
+AIR_THREAT: Dict[U, Tuple[float, float]] = {
+    t: v
+    for t, v in (
+        (getattr(U, n, None), v)
+        for n, v in (
+            ("MARINE", (5.0, 9.8)),
+            ("GHOST", (6.0, 9.3)),
+            ("CYCLONE", (5.0, 11.2)),
+            ("THOR", (10.0, 11.0)),
+            ("VIKINGFIGHTER", (9.0, 14.0)),
+            ("MISSILETURRET", (7.0, 39.3)),
+            ("BUNKER", (6.0, 39.2)),
+            ("QUEEN", (7.0, 12.6)),
+            ("HYDRALISK", (5.0, 22.4)),
+            ("MUTALISK", (3.0, 8.6)),
+            ("CORRUPTOR", (6.0, 10.3)),
+            ("SPORECRAWLER", (7.0, 24.4)),
+            ("STALKER", (6.0, 9.7)),
+            ("SENTRY", (5.0, 8.4)),
+            ("ARCHON", (3.0, 20.0)),
+            ("PHOENIX", (5.0, 12.7)),
+            ("VOIDRAY", (6.0, 16.8)),
+            ("PHOTONCANNON", (7.0, 22.4)),
+        )
+    )
+    if t is not None
+}
+
+# 8-neighbourhood: (dx, dy, length)
+_NEIGH = tuple((dx, dy, math.sqrt(dx * dx + dy * dy)) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if dx or dy)
+
+
+def air_threat(u: Any) -> Tuple[float, float]:
+    """(range, dps) against air units; (0, 0) when u can't shoot up."""
+    if getattr(u, "build_progress", 1.0) < 1.0:
+        return 0.0, 0.0
+    try:
+        rng = float(getattr(u, "air_range", 0.0) or 0.0)
+        dps = float(getattr(u, "air_dps", 0.0) or 0.0)
+    except Exception:
+        rng = dps = 0.0
+    if rng > 0 and dps > 0:
+        return rng, dps
+    return AIR_THREAT.get(getattr(u, "type_id", None), (0.0, 0.0))
+
+
+class InfluenceMap:
+    """
+    Mapa de ameaça antiaérea (numpy) numa grade grossa (CELL tiles por célula).
+    - cada inimigo à vista que atira no ar carimba um disco (alcance + margem) com peso = dps
+    - por frame: decaimento pela meia-vida + máximo com os carimbos do frame,
+      então o que saiu da visão some aos poucos (estruturas snapshot seguem carimbadas)
+    - discos em cache por raio; só a fatia do disco é tocada por unidade
+    - consultas: threat_at, safest_near (ponto calmo perto de um alvo) e
+      path (A* 8-vizinhos, custo = comprimento * (1 + THREAT_COST * ameaça))
+    - com uma EnemyMemory, lê os registros visíveis dela (alcance/dps já
+      resolvidos) em vez de varrer enemy_units de novo
+    """
+
+    def __init__(self, bot: Any, cell: int = CELL, memory: Any = None):
+        self.bot = bot
+        self.cell = cell
+        self.memory = memory
+        self.ready = False
+        self.threat: Optional[np.ndarray] = None  # [cy, cx]
+        self.ground: Optional[np.ndarray] = None  # cell has a pathable tile (drop points)
+        self._seen: Optional[np.ndarray] = None  # sum of the stamps of what's visible now
+        self._stamped: Dict[int, Tuple[int, int, float, float]] = {}  # tag -> (cx, cy, range, dps)
+        self._kernels: Dict[int, np.ndarray] = {}
+        self._loop: Optional[int] = None
+        self.paths = 0  # path queries answered (perf / debug)
+
+    def build(self) -> bool:
+        gi = getattr(self.bot, "game_info", None)
+        path = getattr(getattr(gi, "pathing_grid", None), "data_numpy", None)
+        if path is not None:
+            h, w = np.shape(path)
+        else:
+            size = getattr(gi, "map_size", None)
+            try:
+                w, h = int(size.width), int(size.height)
+            except Exception:
+                return False
+        c = self.cell
+        ch, cw = -(-h // c), -(-w // c)
+        self.threat = np.zeros((ch, cw), dtype=np.float32)
+        self._seen = np.zeros(self.threat.shape, dtype=np.float64)
+        self._stamped.clear()
+        if path is not None:
+            padded = np.zeros((ch * c, cw * c), dtype=bool)
+            padded[:h, :w] = np.asarray(path) != 0
+            self.ground = padded.reshape(ch, c, cw, c).any(axis=(1, 3))
+        else:
+            self.ground = np.ones((ch, cw), dtype=bool)
+        self._loop = None
+        self.ready = True
+        return True
+
+    # ---------------------------
+    # Update
+    # ---------------------------
+    def _kernel(self, reach: float) -> np.ndarray:
+        """Disc in cells: 1 inside weapon range, 0.5 in the margin band. Cached by half-tile range."""
+        key = int(round(reach * 2))
+        k = self._kernels.get(key)
+        if k is None:
+            rng = key / 2.0
+            r = int(math.ceil((rng + MARGIN) / self.cell))
+            off = np.arange(-r, r + 1, dtype=np.float32) * self.cell
+            d = np.sqrt(off[None, :] ** 2 + off[:, None] ** 2)
+            k = np.where(d <= rng, 1.0, np.where(d <= rng + MARGIN, 0.5, 0.0)).astype(np.float32)
+            self._kernels[key] = k
+        return k
+
+    def _stamp(self, cx: int, cy: int, reach: float, weight: float) -> None:
+        out = self._seen
+        k = self._kernel(reach)
+        r = k.shape[0] // 2
+        h, w = out.shape
+        x0, y0 = cx - r, cy - r
+        x1, y1 = min(w, x0 + k.shape[1]), min(h, y0 + k.shape[0])
+        if x1 <= 0 or y1 <= 0 or x0 >= w or y0 >= h:
+            return
+        kx, ky = max(0, -x0), max(0, -y0)
+        x0, y0 = max(0, x0), max(0, y0)
+        out[y0:y1, x0:x1] += weight * k[ky:ky + (y1 - y0), kx:kx + (x1 - x0)]
+
+    def _sources(self) -> Iterable[Tuple[int, Point2, Tuple[float, float]]]:
+        """(tag, position, (air range, dps)) of every enemy in sight."""
+        if self.memory is not None:
+            return ((s.tag, s.position, s.air) for s in self.memory.visible)
+        units = getattr(self.bot, "enemy_units", None) or []
+        structures = getattr(self.bot, "enemy_structures", None) or []
+        return ((u.tag, u.position, air_threat(u)) for u in chain(units, structures))
+
+    def update(self) -> None:
+        """
+        Once per frame: decay what we remember, then take the max with what we see now.
+        The visible layer is kept between frames: only units that changed cell
+        (or weapon) are re-stamped, units that vanished are un-stamped.
+        """
+        if not self.ready and not self.build():
+            return
+        now = game_loop(self.bot)
+        if self._loop == now:
+            return
+        dt = now - self._loop if self._loop is not None else 0
+        self._loop = now
+
+        c = self.cell
+        alive = set()
+        for tag, p, (rng, dps) in self._sources():
+            if dps <= 0:
+                continue
+            alive.add(tag)
+            key = (int(p.x // c), int(p.y // c), rng, dps)
+            old = self._stamped.get(tag)
+            if old == key:
+                continue
+            if old is not None:
+                self._stamp(old[0], old[1], old[2], -old[3])
+            self._stamp(*key)
+            self._stamped[tag] = key
+        for tag in [t for t in self._stamped if t not in alive]:
+            old = self._stamped.pop(tag)
+            self._stamp(old[0], old[1], old[2], -old[3])
+        if not self._stamped:
+            self._seen.fill(0.0)  # drop float residue
+
+        if dt > 0:
+            self.threat *= np.float32(0.5 ** (dt / HALF_LIFE))
+        if self._stamped:
+            np.maximum(self.threat, self._seen, out=self.threat, casting="unsafe")
+
+    # ---------------------------
+    # Queries
+    # ---------------------------
+    def _cell(self, p: Point2) -> Tuple[int, int]:
+        h, w = self.threat.shape
+        return min(w - 1, max(0, int(p.x // self.cell))), min(h - 1, max(0, int(p.y // self.cell)))
+
+    def _center(self, cx: int, cy: int) -> Point2:
+        return Point2(((cx + 0.5) * self.cell, (cy + 0.5) * self.cell))
+
+    def threat_at(self, p: Point2) -> float:
+        if not self.ready:
+            return 0.0
+        cx, cy = self._cell(p)
+        return float(self.threat[cy, cx])
+
+    def safest_near(self, p: Point2, radius: float, ground: bool = False) -> Point2:
+        """Least threatened cell within radius of p (closest on ties); p itself when it's already calm."""
+        if not self.ready or self.threat_at(p) < EPS:
+            return p
+        h, w = self.threat.shape
+        cx, cy = self._cell(p)
+        r = int(math.ceil(radius / self.cell))
+        x0, x1 = max(0, cx - r), min(w, cx + r + 1)
+        y0, y1 = max(0, cy - r), min(h, cy + r + 1)
+        xs = (np.arange(x0, x1) + 0.5) * self.cell
+        ys = (np.arange(y0, y1) + 0.5) * self.cell
+        d = np.sqrt((xs[None, :] - p.x) ** 2 + (ys[:, None] - p.y) ** 2)
+        ok = d <= radius
+        if ground:
+            ok &= self.ground[y0:y1, x0:x1]
+        if not ok.any():
+            return p
+        # distance only breaks ties between equally calm cells
+        score = np.where(ok, self.threat[y0:y1, x0:x1] + d * 1e-3, np.inf)
+        iy, ix = np.unravel_index(int(np.argmin(score)), score.shape)
+        return self._center(x0 + int(ix), y0 + int(iy))
+
+    def _path_grid(self) -> np.ndarray:
+        """Threat max-pooled PATH_POOL x PATH_POOL: a quarter of the nodes, and never optimistic."""
+        t = self.threat
+        k = PATH_POOL
+        h, w = t.shape
+        ph, pw = -(-h // k), -(-w // k)
+        padded = np.zeros((ph * k, pw * k), dtype=np.float32)
+        padded[:h, :w] = t
+        return padded.reshape(ph, k, pw, k).max(axis=(1, 3))
+
+    def path(self, start: Point2, goal: Point2) -> List[Point2]:
+        """Cheapest flight from start to goal as waypoints (goal last); just [goal] when the map is calm."""
+        if not self.ready or float(self.threat.max()) < EPS:
+            return [goal]
+        grid = self._path_grid()
+        h, w = grid.shape
+        size = self.cell * PATH_POOL
+
+        def cell(p: Point2) -> Tuple[int, int]:
+            return min(w - 1, max(0, int(p.x // size))), min(h - 1, max(0, int(p.y // size)))
+
+        (sx, sy), (gx, gy) = cell(start), cell(goal)
+        if (sx, sy) == (gx, gy):
+            return [goal]
+        self.paths += 1
+        cost = (1.0 + THREAT_COST * grid).ravel().tolist()
+        si, gi = sy * w + sx, gy * w + gx
+        cost[gi] = 1.0  # entering the goal is unavoidable: pricing it only widens the search
+
+        def heur(x: int, y: int) -> float:
+            dx, dy = abs(x - gx), abs(y - gy)
+            # octile distance (cost >= 1 per cell), inflated: near-optimal routes, far fewer expansions
+            return HEURISTIC_WEIGHT * ((dx + dy) + (math.sqrt(2) - 2) * min(dx, dy))
+
+        best = [math.inf] * (h * w)
+        came = [-1] * (h * w)
+        best[si] = 0.0
+        heap = [(heur(sx, sy), -0.0, si)]  # ties: deepest first (equal-f cells are everywhere on a grid)
+        while heap:
+            _, gc, i = heapq.heappop(heap)
+            gc = -gc
+            if i == gi:
+                break
+            if gc > best[i]:
+                continue
+            y, x = divmod(i, w)
+            for dx, dy, ln in _NEIGH:
+                nx, ny = x + dx, y + dy
+                if nx < 0 or ny < 0 or nx >= w or ny >= h:
+                    continue
+                j = ny * w + nx
+                ng = gc + ln * cost[j]
+                if ng < best[j]:
+                    best[j] = ng
+                    came[j] = i
+                    heapq.heappush(heap, (ng + heur(nx, ny), -ng, j))
+        if came[gi] < 0:
+            return [goal]
+
+        cells = [gi]
+        while cells[-1] != si:
+            cells.append(came[cells[-1]])
+        cells.reverse()
+        # keep only the turns
+        out: List[Point2] = []
+        for a, b, c in zip(cells, cells[1:], cells[2:]):
+            if b - a != c - b:
+                y, x = divmod(b, w)
+                out.append(Point2(((x + 0.5) * size, (y + 0.5) * size)))
+        out.append(goal)
+        return out
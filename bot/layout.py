@@ -0,0 +1,232 @@
+#layout.py
+from __future__ import annotations
+
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from sc2.ids.unit_typeid import UnitTypeId as U
+from sc2.position import Point2
+
+from .placement import ADDON_HOSTS, FOOTPRINT, PlacementGrid
+from .state import PlacementPlan
+
+# PlacementPlan lists consulted (in order) for each buildable type
+SLOT_KINDS: Dict[U, Tuple[str, ...]] = {
+    U.SUPPLYDEPOT: ("wall_depots", "depot_slots"),
+    U.BARRACKS: ("rax_slots",),
+    U.FACTORY: ("factory_slots",),
+    U.STARPORT: ("starport_slots",),
+}
+
+
+class LayoutPlanner:
+    """
+    Planeja uma vez (on_start) todos os slots da main:
+    - depots do wall (ramp.corner_depots) + depots extras
+    - rax/factory/starport com espaço para addon e 1 tile de corredor
+    Tudo local (PlacementGrid), zero RPCs. O Builder só verifica o slot escolhido.
+    """
+
+    def __init__(
+        self,
+        bot: Any,
+        grid: PlacementGrid,
+        *,
+        n_depots: int = 10,
+        n_rax: int = 3,
+        n_factory: int = 1,
+        n_starport: int = 1,
+        region_radius: int = 30,
+    ):
+        self.bot = bot
+        self.grid = grid
+        self.n_depots = n_depots
+        self.n_rax = n_rax
+        self.n_factory = n_factory
+        self.n_starport = n_starport
+        self.region_radius = region_radius
+
+        self._claimed: Optional[np.ndarray] = None
+        self._claimed_sat: Optional[np.ndarray] = None
+
+    # ---------------------------
+    # Region
+    # ---------------------------
+    def _main_region(self, start: Point2) -> Optional[np.ndarray]:
+        """Flood fill over same-height pathable tiles from the start location."""
+        gi = getattr(self.bot, "game_info", None)
+        H, W = self.grid.shape
+        height = getattr(getattr(gi, "terrain_height", None), "data_numpy", None)
+        if height is None or np.shape(height) != (H, W):
+            return None
+        height = np.asarray(height).astype(np.int32)
+        path = getattr(getattr(gi, "pathing_grid", None), "data_numpy", None)
+        place = getattr(getattr(gi, "placement_grid", None), "data_numpy", None)
+        walk = np.zeros((H, W), dtype=bool)
+        if path is not None:
+            walk |= np.asarray(path) != 0
+        if place is not None:
+            walk |= np.asarray(place) != 0
+
+        sx, sy = int(start.x), int(start.y)
+        if not (0 <= sx < W and 0 <= sy < H):
+            return None
+        h0 = int(height[sy, sx])
+        same = walk & (np.abs(height - h0) <= 2)
+        same[sy, sx] = True
+
+        region = np.zeros((H, W), dtype=bool)
+        q = deque([(sx, sy)])
+        region[sy, sx] = True
+        r2 = self.region_radius * self.region_radius
+        while q:
+            x, y = q.popleft()
+            for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+                if 0 <= nx < W and 0 <= ny < H and not region[ny, nx] and same[ny, nx]:
+                    if (nx - sx) ** 2 + (ny - sy) ** 2 <= r2:
+                        region[ny, nx] = True
+                        q.append((nx, ny))
+        return region
+
+    # ---------------------------
+    # Claims (planned slots must not overlap each other)
+    # ---------------------------
+    def _claim(self, ox: int, oy: int, w: int, h: int) -> None:
+        H, W = self._claimed.shape
+        self._claimed[max(0, oy):min(H, oy + h), max(0, ox):min(W, ox + w)] = 1
+        self._claimed_sat = None
+
+    def _claimed_free(self, ox: np.ndarray, oy: np.ndarray, w: int, h: int) -> np.ndarray:
+        if self._claimed_sat is None:
+            c = self._claimed
+            sat = np.zeros((c.shape[0] + 1, c.shape[1] + 1), dtype=np.int32)
+            sat[1:, 1:] = c.cumsum(0).cumsum(1)
+            self._claimed_sat = sat
+        sat = self._claimed_sat
+        H, W = self._claimed.shape
+        x0 = np.clip(ox, 0, W)
+        y0 = np.clip(oy, 0, H)
+        x1 = np.clip(ox + w, 0, W)
+        y1 = np.clip(oy + h, 0, H)
+        return (sat[y1, x1] - sat[y0, x1] - sat[y1, x0] + sat[y0, x0]) == 0
+
+    def _fits(self, unit_type: U, ox: np.ndarray, oy: np.ndarray, margin: int) -> np.ndarray:
+        size = FOOTPRINT[unit_type]
+        w = size + (2 if unit_type in ADDON_HOSTS else 0)
+        ok = self.grid.free_rects(ox, oy, size, size)
+        if unit_type in ADDON_HOSTS:
+            ok &= self.grid.free_rects(ox + size, oy, 2, 2)
+        ok &= self._claimed_free(ox - margin, oy - margin, w + 2 * margin, size + 2 * margin)
+        return ok
+
+    def _take_fixed(self, unit_type: U, center: Point2, out: List[Point2], margin: int) -> None:
+        size = FOOTPRINT[unit_type]
+        ox = PlacementGrid.origin(center.x, size)
+        oy = PlacementGrid.origin(center.y, size)
+        if not bool(self._fits(unit_type, np.array([ox]), np.array([oy]), 0)[0]):
+            return
+        w = size + (2 if unit_type in ADDON_HOSTS else 0)
+        self._claim(ox - margin, oy - margin, w + 2 * margin, size + 2 * margin)
+        out.append(Point2((ox + size / 2, oy + size / 2)))
+
+    def _take_nearest(
+        self, unit_type: U, region_xy: np.ndarray, target: Point2, n: int, out: List[Point2], margin: int
+    ) -> None:
+        size = FOOTPRINT[unit_type]
+        half = size / 2
+        cx = region_xy[:, 0] + half
+        cy = region_xy[:, 1] + half
+        order = np.argsort((cx - target.x) ** 2 + (cy - target.y) ** 2, kind="stable")
+        ox = region_xy[order, 0]
+        oy = region_xy[order, 1]
+        w = size + (2 if unit_type in ADDON_HOSTS else 0)
+        for _ in range(n):
+            ok = np.flatnonzero(self._fits(unit_type, ox, oy, margin))
+            if ok.size == 0:
+                return
+            i = int(ok[0])
+            self._claim(int(ox[i]) - margin, int(oy[i]) - margin, w + 2 * margin, size + 2 * margin)
+            out.append(Point2((float(ox[i] + half), float(oy[i] + half))))
+
+    # ---------------------------
+    # Plan
+    # ---------------------------
+    def plan(self, place: PlacementPlan) -> bool:
+        if not self.grid.ready:
+            return False
+        start = getattr(self.bot, "start_location", None)
+        gi = getattr(self.bot, "game_info", None)
+        center = getattr(gi, "map_center", None)
+        if start is None or center is None:
+            return False
+
+        region = self._main_region(start)
+        if region is None:
+            return False
+
+        H, W = self.grid.shape
+        self._claimed = np.zeros((H, W), dtype=np.int32)
+        self._claimed_sat = None
+
+        # keep the CC, mineral line and geysers clear (CC 5x5 + worker lane)
+        self._claim(int(start.x) - 6, int(start.y) - 6, 13, 13)
+        for attr in ("mineral_field", "vespene_geyser"):
+            for u in getattr(self.bot, attr, None) or []:
+                p = u.position
+                if p.distance_to(start) < 14:
+                    self._claim(int(p.x) - 3, int(p.y) - 3, 7, 7)
+
+        ys, xs = np.nonzero(region)
+        region_xy = np.stack([xs, ys], axis=1).astype(np.int64)
+
+        wall: List[Point2] = []
+        depots: List[Point2] = []
+        rax: List[Point2] = []
+        factory: List[Point2] = []
+        starport: List[Point2] = []
+
+        ramp = getattr(self.bot, "main_base_ramp", None)
+        try:
+            corners = sorted(getattr(ramp, "corner_depots", None) or [], key=lambda p: (p.x, p.y))
+        except Exception:
+            corners = []
+        for p in corners:
+            self._take_fixed(U.SUPPLYDEPOT, p, wall, 0)
+        try:
+            ramp_rax = getattr(ramp, "barracks_correct_placement", None)
+        except Exception:
+            ramp_rax = None
+        if ramp_rax is not None:
+            self._take_fixed(U.BARRACKS, ramp_rax, rax, 0)
+
+        prod_target = start.towards(center, 10)
+        self._take_nearest(U.BARRACKS, region_xy, prod_target, self.n_rax - len(rax), rax, 1)
+        self._take_nearest(U.FACTORY, region_xy, start.towards(center, 12), self.n_factory, factory, 1)
+        self._take_nearest(U.STARPORT, region_xy, start.towards(center, 14), self.n_starport, starport, 1)
+        # extra depots away from the production block
+        self._take_nearest(U.SUPPLYDEPOT, region_xy, start.towards(center, -8), self.n_depots, depots, 0)
+
+        place.wall_depots = wall
+        place.depot_slots = depots
+        place.rax_slots = rax
+        place.factory_slots = factory
+        place.starport_slots = starport
+        place.ready = True
+        return True
+
+    # ---------------------------
+    # Runtime lookup
+    # ---------------------------
+    def next_slot(self, place: PlacementPlan, unit_type: U) -> Optional[Point2]:
+        """Head of the slot lists for unit_type, dropping slots the local grid says are taken."""
+        if not place.ready:
+            return None
+        for kind in SLOT_KINDS.get(unit_type, ()):
+            slots = getattr(place, kind)
+            while slots:
+                p = slots[0]
+                if not self.grid.ready or self.grid.can_place(unit_type, p):
+                    return p
+                slots.pop(0)
+        return None
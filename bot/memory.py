@@ -0,0 +1,259 @@
+#memory.py
+from __future__ import annotations
+
+from dataclasses import dataclass
+from itertools import chain
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sc2.ids.unit_typeid import UnitTypeId as U
+from sc2.position import Point2
+
+from .influence import air_threat
+from .utils import game_loop
+
+INDEX_CELL = 8  # tiles per spatial index bucket
+UNIT_TTL = 448  # loops (~20s) a unit out of sight is still believed to be where we saw it
+EXPIRE_EVERY = 8  # loops between expiry sweeps
+
+ENEMY_TOWNHALLS = tuple(
+    t for t in (
+        getattr(U, n, None)
+        for n in ("COMMANDCENTER", "ORBITALCOMMAND", "PLANETARYFORTRESS", "NEXUS", "HATCHERY", "LAIR", "HIVE")
+    )
+    if t is not None
+)
+
+
+@dataclass
+class Sighting:
+    """Last thing we know about one enemy tag."""
+
+    tag: int
+    type_id: Any
+    position: Point2
+    first_seen: int
+    last_seen: int
+    is_structure: bool
+    is_flying: bool
+    ready: bool
+    air: Tuple[float, float]  # (range, dps) against air units, see influence.air_threat
+    cell: Tuple[int, int]
+    unit: Any = None  # the live Unit while in sight; None once it left
+
+    @property
+    def visible(self) -> bool:
+        return self.unit is not None
+
+
+class EnemyMemory:
+    """
+    Memória de inimigos: última posição/tipo/loop de cada tag, com validade.
+    - a única varredura de enemy_units/enemy_structures do frame (update)
+    - índice espacial em grade uniforme (INDEX_CELL tiles): near(p, r) só olha
+      os baldes que cobrem o círculo; uma tag só troca de balde quando troca de célula
+    - índice por tipo (townhalls, of_types) e tipos já vistos (sticky)
+    - fora de vista: unidades expiram após unit_ttl, ou antes se o lugar está
+      visível e vazio; estruturas só saem mortas ou com o lugar visível e vazio
+    - `visible`: os registros do frame, com a Unit viva (InfluenceMap / micro)
+    - `touched`: baldes que ganharam/perderam tags neste frame (quem vigia uma
+      zona só recalcula quando um balde dela foi tocado)
+    """
+
+    def __init__(self, bot: Any, cell: int = INDEX_CELL, unit_ttl: int = UNIT_TTL):
+        self.bot = bot
+        self.cell = cell
+        self.unit_ttl = unit_ttl
+        self.entries: Dict[int, Sighting] = {}
+        self.visible: List[Sighting] = []
+        self.types_seen: Set[Any] = set()
+        self.touched: Set[Tuple[int, int]] = set()
+        self._grid: Dict[Tuple[int, int], Set[int]] = {}
+        self._by_type: Dict[Any, Set[int]] = {}
+        self._loop: Optional[int] = None
+        self._next_expire = 0
+        self._main: Optional[Point2] = None
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    # ---------------------------
+    # Update
+    # ---------------------------
+    def _cell(self, p: Point2) -> Tuple[int, int]:
+        return int(p.x // self.cell), int(p.y // self.cell)
+
+    def _add(self, u: Any, now: int) -> Sighting:
+        p = u.position
+        s = Sighting(
+            tag=u.tag,
+            type_id=u.type_id,
+            position=p,
+            first_seen=now,
+            last_seen=now,
+            is_structure=bool(getattr(u, "is_structure", False)),
+            is_flying=bool(getattr(u, "is_flying", False)),
+            ready=getattr(u, "build_progress", 1.0) >= 1.0,
+            air=air_threat(u),
+            cell=self._cell(p),
+            unit=u,
+        )
+        self.entries[s.tag] = s
+        self._grid.setdefault(s.cell, set()).add(s.tag)
+        self.touched.add(s.cell)
+        self._by_type.setdefault(s.type_id, set()).add(s.tag)
+        self.types_seen.add(s.type_id)
+        return s
+
+    def _retype(self, s: Sighting, u: Any) -> None:
+        """Morphs (lair, sieged tank, lifted barracks...) and structures finishing."""
+        t = u.type_id
+        self._by_type.get(s.type_id, set()).discard(s.tag)
+        self._by_type.setdefault(t, set()).add(s.tag)
+        self.types_seen.add(t)
+        s.type_id = t
+        s.is_flying = bool(getattr(u, "is_flying", False))
+        s.ready = getattr(u, "build_progress", 1.0) >= 1.0
+        s.air = air_threat(u)
+
+    def forget(self, tag: int) -> None:
+        s = self.entries.pop(tag, None)
+        if s is None:
+            return
+        self._grid.get(s.cell, set()).discard(tag)
+        self._by_type.get(s.type_id, set()).discard(tag)
+        self.touched.add(s.cell)
+
+    def _expire(self, now: int) -> None:
+        for tag in getattr(getattr(self.bot, "state", None), "dead_units", None) or ():
+            self.forget(tag)
+        if now < self._next_expire:
+            return
+        self._next_expire = now + EXPIRE_EVERY
+        is_visible = getattr(self.bot, "is_visible", None)
+        for s in [s for s in self.entries.values() if s.unit is None]:
+            if not s.is_structure and now - s.last_seen > self.unit_ttl:
+                self.forget(s.tag)
+                continue
+            try:
+                looking = bool(is_visible(s.position)) if callable(is_visible) else False
+            except Exception:
+                looking = False
+            if looking:
+                # we see the spot and it isn't there: moved away / destroyed
+                self.forget(s.tag)
+
+    def update(self) -> None:
+        """Once per frame: fold what's in sight into the memory and expire what's stale."""
+        now = game_loop(self.bot)
+        if self._loop == now:
+            return
+        self._loop = now
+        touched = self.touched = set()
+        units = getattr(self.bot, "enemy_units", None) or []
+        structures = getattr(self.bot, "enemy_structures", None) or []
+        visible: List[Sighting] = []
+        entries, grid, c = self.entries, self._grid, self.cell
+        for u in chain(units, structures):
+            s = entries.get(u.tag)
+            if s is None:
+                visible.append(self._add(u, now))
+                continue
+            if u.type_id != s.type_id or not s.ready:
+                self._retype(s, u)
+            p = u.position
+            s.position = p
+            s.last_seen = now
+            s.unit = u
+            cell = (int(p.x // c), int(p.y // c))
+            if cell != s.cell:
+                grid[s.cell].discard(s.tag)
+                grid.setdefault(cell, set()).add(s.tag)
+                touched.add(s.cell)
+                touched.add(cell)
+                s.cell = cell
+            visible.append(s)
+        for s in self.visible:
+            if s.last_seen != now:
+                s.unit = None  # left vision this frame
+        self.visible = visible
+        self._expire(now)
+
+    # ---------------------------
+    # Queries
+    # ---------------------------
+    def _buckets(self, p: Point2, r: float) -> Iterable[int]:
+        c = self.cell
+        x0, x1 = int((p.x - r) // c), int((p.x + r) // c)
+        y0, y1 = int((p.y - r) // c), int((p.y + r) // c)
+        grid = self._grid
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                tags = grid.get((cx, cy))
+                if tags:
+                    yield from tags
+
+    def cells_near(self, p: Point2, r: float) -> Set[Tuple[int, int]]:
+        """Index buckets that overlap the circle (p, r)."""
+        c = self.cell
+        out = set()
+        for cx in range(int((p.x - r) // c), int((p.x + r) // c) + 1):
+            for cy in range(int((p.y - r) // c), int((p.y + r) // c) + 1):
+                # closest point of the bucket to p
+                nx = min(max(p.x, cx * c), (cx + 1) * c)
+                ny = min(max(p.y, cy * c), (cy + 1) * c)
+                if (nx - p.x) ** 2 + (ny - p.y) ** 2 <= r * r:
+                    out.add((cx, cy))
+        return out
+
+    def in_cells(self, cells: Iterable[Tuple[int, int]]) -> Set[int]:
+        """Tags remembered inside these buckets."""
+        out: Set[int] = set()
+        grid = self._grid
+        for cell in cells:
+            tags = grid.get(cell)
+            if tags:
+                out |= tags
+        return out
+
+    def near(
+        self,
+        p: Point2,
+        r: float,
+        *,
+        structures: Optional[bool] = None,
+        visible_only: bool = False,
+    ) -> List[Sighting]:
+        """Remembered enemies within r of p (structures=True/False filters, None: both)."""
+        out: List[Sighting] = []
+        r2 = r * r
+        px, py = p.x, p.y
+        for tag in self._buckets(p, r):
+            s = self.entries[tag]
+            if structures is not None and s.is_structure != structures:
+                continue
+            if visible_only and s.unit is None:
+                continue
+            dx, dy = s.position.x - px, s.position.y - py
+            if dx * dx + dy * dy <= r2:
+                out.append(s)
+        return out
+
+    def of_types(self, types: Iterable[Any]) -> List[Sighting]:
+        return [self.entries[t] for ut in types for t in self._by_type.get(ut, ())]
+
+    def townhalls(self) -> List[Sighting]:
+        return self.of_types(ENEMY_TOWNHALLS)
+
+    def enemy_main(self) -> Optional[Point2]:
+        """The enemy start location: the only one, or the one we've seen a townhall at (sticky)."""
+        if self._main is not None:
+            return self._main
+        starts = list(getattr(self.bot, "enemy_start_locations", None) or [])
+        if len(starts) == 1:
+            self._main = starts[0]
+        else:
+            for st in starts:
+                if any(s.type_id in ENEMY_TOWNHALLS for s in self.near(st, 8, structures=True)):
+                    self._main = st
+                    break
+        return self._main
@@ -0,0 +1,205 @@
+#micro.py
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from sc2.ids.ability_id import AbilityId as A
+from sc2.position import Point2
+
+from .api import BotAPI
+from .utils import game_loop
+
+MARINE_RANGE = 5.0
+MARINE_DAMAGE = 6.0
+STIM_LOOPS = 246  # ~11s
+STIM_MIN_HP = 40.0
+ENGAGE_RADIUS = 9.0  # enemy units this close to a marine start the fight
+KITE_DIST = 2.5  # melee threat this close while reloading -> step back
+KITE_STEP = 2.0
+STRUCTURE_PENALTY = 1000.0  # units first, buildings when nothing else is in range
+
+
+class _Enemies:
+    """Enemy arrays for one frame (shared by every squad)."""
+
+    __slots__ = ("units", "xy", "hp", "radius", "ground_range", "structure", "flying")
+
+    def __init__(self, units: List[Any], structures: List[Any]):
+        allu = units + structures
+        n = len(allu)
+        self.units = allu
+        self.xy = np.array([(u.position.x, u.position.y) for u in allu], dtype=np.float64).reshape(n, 2)
+        self.hp = np.array(
+            [float(getattr(u, "health", 0.0) or 0.0) + float(getattr(u, "shield", 0.0) or 0.0) for u in allu],
+            dtype=np.float64,
+        )
+        self.radius = np.array([float(getattr(u, "radius", 0.5) or 0.5) for u in allu], dtype=np.float64)
+        self.ground_range = np.array([float(getattr(u, "ground_range", 0.0) or 0.0) for u in allu], dtype=np.float64)
+        self.structure = np.zeros(n, dtype=bool)
+        self.structure[len(units):] = True
+        self.flying = np.array([bool(getattr(u, "is_flying", False)) for u in allu], dtype=bool)
+
+
+class MarineMicro:
+    """
+    Micro de marines em lote (numpy), usada depois do drop.
+    - posições/HP/cooldown dos nossos e dos inimigos viram arrays uma vez por frame
+    - foco: cada marine pega o inimigo de menor HP restante ao alcance,
+      descontando o dano já atribuído (sem overkill); prédios só se não houver unidade
+    - kiting: recarregando e com melee colado -> passo para trás (vetor médio)
+    - stim só em combate, uma vez por duração
+    - só emite ordem quando o alvo/ação da unidade muda
+    """
+
+    def __init__(self, bot: Any, api: Optional[BotAPI] = None, memory: Any = None):
+        self.bot = bot
+        self.api = api or BotAPI(bot)
+        self.memory = memory  # EnemyMemory: this frame's enemies without another scan
+        self._loop: Optional[int] = None
+        self._enemies: Optional[_Enemies] = None
+        self._last: Dict[int, Tuple[tuple, int]] = {}  # tag -> (order key, loop)
+        self._stim_until: Dict[int, int] = {}
+        self.engage_radius = ENGAGE_RADIUS
+        self.orders = 0
+
+    def _frame_enemies(self) -> _Enemies:
+        now = game_loop(self.bot)
+        if self._enemies is None or self._loop != now:
+            self._loop = now
+            if self.memory is not None:
+                seen = self.memory.visible
+                units = [s.unit for s in seen if not s.is_structure]
+                structs = [s.unit for s in seen if s.is_structure]
+            else:
+                units = [u for u in (getattr(self.bot, "enemy_units", None) or []) if not getattr(u, "is_structure", False)]
+                structs = list(getattr(self.bot, "enemy_structures", None) or [])
+            self._enemies = _Enemies(units, structs)
+            # forget units we haven't driven for a while
+            for tag in [t for t, (_, at) in self._last.items() if now - at > 224]:
+                del self._last[tag]
+                self._stim_until.pop(tag, None)
+        return self._enemies
+
+    # ---------------------------
+    # Batch decisions
+    # ---------------------------
+    @staticmethod
+    def _assign(d: np.ndarray, reach: np.ndarray, en: _Enemies) -> np.ndarray:
+        """target[i] = enemy index for marine i (-1: none in range). Marines with fewer options pick first."""
+        n, m = d.shape
+        target = np.full(n, -1, dtype=np.int64)
+        if m == 0:
+            return target
+        in_range = d <= reach
+        counts = in_range.sum(axis=1)
+        if not counts.any():
+            return target
+        # the matrix work is numpy; the greedy itself runs on small python lists (a squad has ~8 marines)
+        score = (np.where(en.structure, STRUCTURE_PENALTY, 0.0) + en.hp).tolist()
+        left = en.hp.tolist()
+        rows, cols = np.nonzero(in_range)
+        opts: List[List[int]] = [[] for _ in range(n)]
+        for i, j in zip(rows.tolist(), cols.tolist()):
+            opts[i].append(j)
+        for i in np.argsort(counts, kind="stable").tolist():
+            cand = opts[i]
+            if not cand:
+                continue
+            alive = [j for j in cand if left[j] > 0] or cand  # all covered: overkill beats idling
+            j = min(alive, key=score.__getitem__)
+            target[i] = j
+            left[j] -= MARINE_DAMAGE
+            score[j] -= MARINE_DAMAGE
+        return target
+
+    @staticmethod
+    def _kite(xy: np.ndarray, d: np.ndarray, cooldown: np.ndarray, en: _Enemies) -> np.ndarray:
+        """Unit move vectors (0 where the marine should keep shooting)."""
+        out = np.zeros_like(xy)
+        if d.shape[1] == 0:
+            return out
+        melee = (~en.structure) & (~en.flying) & (en.ground_range < 2.0)
+        close = (d < KITE_DIST + en.radius[None, :]) & melee[None, :]
+        kite = (cooldown > 0) & close.any(axis=1)
+        if not kite.any():
+            return out
+        w = close[kite].astype(np.float64)
+        centroid = (w @ en.xy) / w.sum(axis=1, keepdims=True)
+        away = xy[kite] - centroid
+        norm = np.linalg.norm(away, axis=1, keepdims=True)
+        norm[norm == 0] = 1.0
+        out[kite] = away / norm * KITE_STEP
+        return out
+
+    # ---------------------------
+    # Orders
+    # ---------------------------
+    async def _issue(self, u: Any, key: tuple, cmd: Any, now: int, arrived: bool = False) -> bool:
+        last = self._last.get(u.tag)
+        # same order: only again if the unit dropped it (idle) before getting there
+        if last is not None and last[0] == key and (arrived or not getattr(u, "is_idle", False)):
+            self._last[u.tag] = (key, now)
+            return False
+        await self.api.do(cmd)
+        self._last[u.tag] = (key, now)
+        self.orders += 1
+        return True
+
+    async def _stim(self, u: Any, hp: float, now: int) -> None:
+        if hp < STIM_MIN_HP or now < self._stim_until.get(u.tag, 0):
+            return
+        try:
+            if not u.has_ability(A.EFFECT_STIM):
+                return
+            await self.api.do(u(A.EFFECT_STIM))
+            self._stim_until[u.tag] = now + STIM_LOOPS
+        except Exception:
+            return
+
+    async def step(self, units: List[Any], fallback: Point2) -> int:
+        """Micro one group of marines; attack-move to `fallback` when nothing is around. Returns orders issued."""
+        if not units:
+            return 0
+        now = game_loop(self.bot)
+        en = self._frame_enemies()
+        n = len(units)
+        xy = np.array([(u.position.x, u.position.y) for u in units], dtype=np.float64).reshape(n, 2)
+        hp = np.array([float(getattr(u, "health", 0.0) or 0.0) for u in units], dtype=np.float64)
+        cooldown = np.array([float(getattr(u, "weapon_cooldown", 0.0) or 0.0) for u in units], dtype=np.float64)
+
+        if len(en.units):
+            d = np.sqrt(((xy[:, None, :] - en.xy[None, :, :]) ** 2).sum(axis=2))
+            # radii: marine 0.375 + target
+            reach = MARINE_RANGE + 0.375 + en.radius[None, :]
+            target = self._assign(d, reach, en)
+            move = self._kite(xy, d, cooldown, en)
+            threat = (~en.structure) & (~en.flying)
+            engaged = (d[:, threat] < self.engage_radius).any(axis=1) if threat.any() else np.zeros(n, dtype=bool)
+        else:
+            target = np.full(n, -1, dtype=np.int64)
+            move = np.zeros_like(xy)
+            engaged = np.zeros(n, dtype=bool)
+
+        issued = 0
+        fb = (round(fallback.x), round(fallback.y))
+        arrived = (((xy - (fallback.x, fallback.y)) ** 2).sum(axis=1) <= 9.0).tolist()
+        kiting = move.any(axis=1).tolist()
+        target_l = target.tolist()
+        engaged_l = engaged.tolist()
+        for i, u in enumerate(units):
+            if engaged_l[i]:
+                await self._stim(u, hp[i], now)
+            if kiting[i]:
+                p = Point2((float(xy[i, 0] + move[i, 0]), float(xy[i, 1] + move[i, 1])))
+                # kiting is re-issued every time: the point moves with the marine
+                await self.api.do(u.move(p))
+                self._last[u.tag] = (("kite",), now)
+                self.orders += 1
+                issued += 1
+            elif target_l[i] >= 0:
+                e = en.units[target_l[i]]
+                issued += await self._issue(u, ("attack", e.tag), u.attack(e), now)
+            else:
+                issued += await self._issue(u, ("amove", fb), u.attack(fallback), now, arrived[i])
+        return issued
@@ -6,29 +6,75 @@ from sc2.position import Point2
 
 from .api import BotAPI
 from .state import BotState
-from .economy import Economy
+from .economy import Economy, priority_of
 from .placement import Placement
 from .build import Builder
+from .defense import Defense
 from .drop import Drop
-from .strategy import StrategyConfig, load_strategy
+from .influence import InfluenceMap
+from .memory import EnemyMemory
+from .scout import Scout
+from .expansion import ExpansionManager
+from .workers import WorkerAllocator
+from .layout import LayoutPlanner
+from .strategy import StrategyConfig, StrategyWatcher, load_strategy
 from .utils import snap
 from .plan import PlanExecutor
+from .perf import StepProfiler
+from .debuglog import LogRule
 
 
 class Orchestrator:
-    def __init__(self, bot, debug: bool = True, strat: StrategyConfig | None = None):
+    def __init__(self, bot, debug: bool = True, strat: StrategyConfig | None = None, watch: bool = False):
         self.bot = bot
         self.api = BotAPI(bot)
+        self.world = self.api.world
         self.debug = debug
 
         self.state = BotState()
         self.econ = Economy(bot)
         self.place = Placement(bot, debug=debug)
-        self.builder = Builder(bot, self.econ, self.place, self.state, debug=debug)
-        self.drop = Drop(bot, self.state, debug=debug)
+        self.builder = Builder(bot, self.econ, self.place, self.state, debug=debug, api=self.api)
+        self.memory = EnemyMemory(bot)
+        self.influence = InfluenceMap(bot, memory=self.memory)
+        self.drop = Drop(bot, self.state, debug=debug, api=self.api, influence=self.influence, memory=self.memory)
+        self.layout = LayoutPlanner(bot, self.place.grid)
+        self.workers = WorkerAllocator(bot, api=self.api, reserved=self.builder.reserved_workers)
+        self.expansion = ExpansionManager(bot, self.econ, self.builder, self.place.resources, api=self.api, debug=debug)
+        self.scout = Scout(
+            bot,
+            self.state,
+            self.memory,
+            resources=self.place.resources,
+            reserved=self.builder.reserved_workers,
+            debug=debug,
+            api=self.api,
+        )
+        self.defense = Defense(bot, self.state, self.memory, reserved=self.builder.reserved_workers, debug=debug, api=self.api)
 
         # strategy
-        self.strat = strat or load_strategy(None)
+        self.strat: StrategyConfig = strat or load_strategy(None)
+        self.plan: PlanExecutor | None = None
+        self._apply_strategy(self.strat)
+        # hot reload (run.py --watch): swapped in at the top of step(), never mid-frame
+        self.strat_watch = StrategyWatcher(self.strat).start() if watch and self.strat.path else None
+
+        # log sampling lives in DebugLogger (rules registered once per intent key)
+        self._intent_rules: set[str] = set()
+        self._configure_log_rules()
+
+        # per-stage timings -> "perf" channel every ~10s of game time
+        self.perf = StepProfiler(
+            enabled=True,
+            emit_every=224,
+            rpc_counter=lambda: self.api.rpc_count + self.place.rpc_count,
+        )
+
+    # =============================================================================
+    # Strategy
+    # =============================================================================
+    def _apply_strategy(self, strat: StrategyConfig) -> None:
+        self.strat = strat
 
         # knobs (from strategy)
         self.scv_target = self.strat.economy.scv_target
@@ -46,18 +92,39 @@ class Orchestrator:
             self.drop.load_count = int(self.strat.drop.load_count)
             self.drop.move_eps = float(self.strat.drop.move_eps)
             self.drop.ground_radius = float(self.strat.drop.ground_radius)
+            self.drop.max_squads = int(self.strat.drop.max_squads)
         except Exception:
             # be defensive: ignore and keep Drop defaults
             pass
 
-        # plan executor
+        econ_cfg = self.strat.economy
+        self.expansion.max_bases = int(econ_cfg.max_bases)
+        self.expansion.max_workers = int(econ_cfg.max_workers)
+        self.expansion.expand_income = int(econ_cfg.expand_income)
+        self.expansion.expand_saturation = float(econ_cfg.expand_saturation)
+
+        # plan executor (rebuilt on reload; one-shot steps that didn't change stay done)
+        old = self.plan
         try:
             self.plan = PlanExecutor(self)
+            if old is not None:
+                self.plan.inherit(old)
         except Exception:
             self.plan = None
 
-        # throttles
-        self._last_intent_it: dict[str, int] = {}
+    def _reload_strategy(self) -> None:
+        new = self.strat_watch.poll()
+        err = self.strat_watch.poll_error()
+        if err is not None:
+            # the edit was rejected: say so, or the old build keeps playing silently
+            print(f"[STRAT] reload rejected, keeping {self.strat.name}: {err}")
+            self._log("state", {"event": "strat_reload_error", "name": self.strat.name, "error": err})
+        if new is None:
+            return
+        old_name = self.strat.name
+        self._apply_strategy(new)
+        print(f"[STRAT] reloaded {new.path}")
+        self._log("state", {"event": "strat_reload", "from": old_name, "to": new.name, "path": new.path})
 
     # =============================================================================
     # Debug helpers (throttled)
@@ -65,7 +132,19 @@ class Orchestrator:
     def _has_dbg(self) -> bool:
         return hasattr(self.bot, "dbg") and self.bot.dbg is not None
 
-    def _log(self, channel: str, payload: dict) -> None:
+    def _configure_log_rules(self) -> None:
+        if not self._has_dbg() or not hasattr(self.bot.dbg, "set_rule"):
+            return
+        dbg = self.bot.dbg
+        # _need_depot runs twice per frame and mostly repeats itself
+        dbg.set_rule("action", "depot_check", LogRule(rle=True, ignore=("minerals",)))
+        # failed builds retry every cooldown with the same payload
+        dbg.set_rule("building", "build_result", LogRule(rle=True, ignore=("minerals",), by=("name",)))
+        dbg.set_rule("building", "build_skip", LogRule(rle=True, by=("name",)))
+        dbg.set_rule("placement", "can_place", LogRule(rle=True, by=("unit",)))
+        dbg.set_rule("placement", "placement_hint", LogRule(rle=True, by=("unit",)))
+
+    def _log(self, channel: str, payload: dict, *, key: str | None = None) -> None:
         if not self._has_dbg():
             return
         try:
@@ -74,8 +153,12 @@ class Orchestrator:
             payload.setdefault("t", snap0.t)
             payload.setdefault("it", snap0.it)
 
-            # route to dbg.<log_*>
             dbg = self.bot.dbg
+            if key is not None and hasattr(dbg, "set_rule"):
+                dbg.log(channel, payload, key=key)
+                return
+
+            # route to dbg.<log_*>
             fn = None
             if channel == "action":
                 fn = getattr(dbg, "log_action", None)
@@ -85,6 +168,8 @@ class Orchestrator:
                 fn = getattr(dbg, "log_placement", None)
             elif channel == "building":
                 fn = getattr(dbg, "log_building", None)
+            elif channel == "perf":
+                fn = getattr(dbg, "log_perf", None)
             else:
                 fn = getattr(dbg, "log_action", None)
 
@@ -96,14 +181,51 @@ class Orchestrator:
 
     def _emit_intent(self, key: str, payload: dict, *, every_n_it: int = 10) -> None:
         """
-        Evita spammar a mesma intenção todo frame.
+        Evita spammar a mesma intenção todo frame (rate limit do DebugLogger, por key).
         """
-        it = self.api.snapshot().it
-        last = self._last_intent_it.get(key, -10**9)
-        if it - last < every_n_it:
+        if not self._has_dbg():
+            return
+        dbg = self.bot.dbg
+        if key not in self._intent_rules and hasattr(dbg, "set_rule"):
+            dbg.set_rule("action", str(payload.get("event", "*")), LogRule(every_n_it=every_n_it), key=key)
+            self._intent_rules.add(key)
+        self._log("action", payload, key=key)
+
+    # =============================================================================
+    # Layout (planejado uma vez)
+    # =============================================================================
+    def on_start(self) -> None:
+        """Sync: safe to call from the fork's non-awaited on_start."""
+        self._plan_layout()
+
+    def _plan_layout(self) -> None:
+        if self.state.place.ready:
             return
-        self._last_intent_it[key] = it
-        self._log("action", payload)
+        self.place.sync_grid()
+        try:
+            ok = self.layout.plan(self.state.place)
+        except Exception as e:
+            ok = False
+            if self.debug:
+                print(f"[LAYOUT] planning failed: {e}")
+        # one shot: if it can't plan now, the macros keep their towards() fallback
+        self.state.place.ready = True
+        p = self.state.place
+        self._log(
+            "placement",
+            {
+                "event": "layout_plan",
+                "ok": bool(ok),
+                "wall_depots": len(p.wall_depots),
+                "depots": len(p.depot_slots),
+                "rax": len(p.rax_slots),
+                "factory": len(p.factory_slots),
+                "starport": len(p.starport_slots),
+            },
+        )
+
+    def _slot_for(self, unit_type: U):
+        return self.layout.next_slot(self.state.place, unit_type)
 
     # =============================================================================
     # CC principal
@@ -116,7 +238,7 @@ class Orchestrator:
                 return self.api.first(th_ready)
 
         for t in (U.ORBITALCOMMAND, U.PLANETARYFORTRESS, U.COMMANDCENTER):
-            ready = self.api.ready(t)
+            ready = self.world.ready(t)
             if self.api.exists(ready):
                 return self.api.first(ready)
 
@@ -127,8 +249,8 @@ class Orchestrator:
     # =============================================================================
     def _need_depot(self) -> bool:
         # Count existing + pending depots
-        existing_depots = self.api.amount(self.api.units(U.SUPPLYDEPOT))
-        pending_depots = self.api.already_pending(U.SUPPLYDEPOT)
+        existing_depots = self.world.count(U.SUPPLYDEPOT)
+        pending_depots = self.world.pending(U.SUPPLYDEPOT)
         total_depots = existing_depots + pending_depots
         
         supply_left = int(getattr(self.bot, "supply_left", 0) or 0)
@@ -157,51 +279,70 @@ class Orchestrator:
         return False
 
     def _need_rax(self) -> bool:
-        if not self.api.exists(self.api.ready(U.SUPPLYDEPOT)):
+        if not self.api.exists(self.world.ready(U.SUPPLYDEPOT)):
             return False
-        return not self.api.exists(self.api.units(U.BARRACKS))
+        return not self.api.exists(self.world.units(U.BARRACKS))
 
     def _need_refinery(self) -> bool:
         # Refinery can start once barracks exists (even if still building), not just when ready
-        if not self.api.exists(self.api.units(U.BARRACKS)):
+        if not self.api.exists(self.world.units(U.BARRACKS)):
             return False
         # Check if refinery already exists or is pending
-        existing_refinery = self.api.amount(self.api.units(U.REFINERY))
-        pending_refinery = self.api.already_pending(U.REFINERY)
-        return (existing_refinery + pending_refinery) == 0
+        return self.world.have(U.REFINERY) == 0
 
     def _need_factory(self) -> bool:
         if not self.need_factory:
             return False
-        if self.state.build.factory_started:
+        # existing or on the way, whoever ordered it (macro or plan)
+        if self.world.have(U.FACTORY) > 0:
             return False
         # Require a READY refinery (tech prerequisite) rather than just 'started'
-        return self.api.exists(self.api.ready(U.REFINERY))
+        return self.api.exists(self.world.ready(U.REFINERY))
 
     def _need_starport(self) -> bool:
         if not self.need_starport:
             return False
-        if self.state.build.starport_started:
+        if self.world.have(U.STARPORT) > 0:
             return False
         # Starport requires a READY Factory
-        return self.api.exists(self.api.ready(U.FACTORY))
+        return self.api.exists(self.world.ready(U.FACTORY))
 
     def _reserve_critical(self) -> None:
+        """
+        Reserve every structure we need right now (Economy funds them by priority),
+        with its site so the builder can leave early.
+        """
+        econ = self.econ
+        needs = []
         if self._need_depot():
-            self.econ.reserve(U.SUPPLYDEPOT)
-            return
+            needs.append((U.SUPPLYDEPOT, self._slot_for(U.SUPPLYDEPOT)))
         if self._need_rax():
-            self.econ.reserve(U.BARRACKS)
-            return
+            needs.append((U.BARRACKS, self._slot_for(U.BARRACKS)))
         if self._need_refinery():
-            self.econ.reserve(U.REFINERY)
-            return
+            cc = self._main_cc()
+            needs.append((U.REFINERY, self.place.find_refinery_spot(cc.position) if cc is not None else None))
         if self._need_factory():
-            self.econ.reserve(U.FACTORY)
-            return
+            needs.append((U.FACTORY, self._slot_for(U.FACTORY)))
         if self._need_starport():
-            self.econ.reserve(U.STARPORT)
-            return
+            needs.append((U.STARPORT, self._slot_for(U.STARPORT)))
+        if self.expansion.should_expand():
+            needs.append((U.COMMANDCENTER, self.expansion.next_site()))
+        for ut, pos in needs:
+            econ.reserve(econ.owner_for(ut), ut, priority_of(ut), pos=pos)
+        # one-off tech already there: don't hold its money until the ttl runs out
+        # (the plan re-reserves in its stage if it wants another one)
+        wanted = {ut for ut, _ in needs}
+        for ut in (U.BARRACKS, U.REFINERY, U.FACTORY, U.STARPORT):
+            if ut not in wanted and self.world.have(ut) > 0:
+                econ.release(econ.owner_for(ut), keep_committed=True)
+
+    async def _premove_builders(self) -> None:
+        """SCV leaves for the site when its walk ~ the time until the queued item is affordable."""
+        self.builder.release_stale()
+        for item in self.econ.queue:
+            if item.committed or item.pos is None or item.eta <= 0:
+                continue
+            await self.builder.premove(item.unit_type, item.pos, item.eta)
 
     # =============================================================================
     # MACRO: WORKERS
@@ -210,7 +351,7 @@ class Orchestrator:
         workers = getattr(self.bot, "workers", None)
         if workers is None:
             return
-        if self.api.amount(workers) >= self.scv_target:
+        if self.api.amount(workers) >= self.expansion.worker_target(self.scv_target):
             return
 
         # Only block SCV if supply is actually capped (0 left), not just "low"
@@ -229,9 +370,14 @@ class Orchestrator:
             )
             return
 
-        if getattr(cc, "is_idle", False) and self.api.can_afford(U.SCV) and supply_left > 0:
+        # the townhall whose base is shortest on workers trains first
+        trainers = self.expansion.trainers() or ([cc] if getattr(cc, "is_idle", False) else [])
+        for th in trainers:
+            if supply_left <= 0 or not self.econ.claim(U.SCV):
+                break
             self._log("action", {"event": "do", "what": "train", "unit": "SCV"})
-            await self.bot.do(cc.train(U.SCV))
+            await self.api.do(th.train(U.SCV))
+            supply_left -= 1
 
     # =============================================================================
     # MACRO: DEPOT / RAX
@@ -240,14 +386,18 @@ class Orchestrator:
         if not self._need_depot():
             return
 
-        # Calculate a position towards the map center, but clamp to map bounds
-        towards = snap(cc.position.towards(self.bot.game_info.map_center, 6))
-        map_h = self.bot.game_info.map_size.height
-        map_w = self.bot.game_info.map_size.width
-        desired = Point2((
-            max(3, min(map_w - 3, towards.x)),
-            max(3, min(map_h - 3, towards.y))
-        ))
+        slot = self._slot_for(U.SUPPLYDEPOT)
+        if slot is not None:
+            desired = slot
+        else:
+            # Calculate a position towards the map center, but clamp to map bounds
+            towards = snap(cc.position.towards(self.bot.game_info.map_center, 6))
+            map_h = self.bot.game_info.map_size.height
+            map_w = self.bot.game_info.map_size.width
+            desired = Point2((
+                max(3, min(map_w - 3, towards.x)),
+                max(3, min(map_h - 3, towards.y))
+            ))
         
         snap0 = self.api.snapshot()
         minerals = int(getattr(self.bot, "minerals", 0) or 0)
@@ -267,7 +417,9 @@ class Orchestrator:
             every_n_it=10,
         )
 
-        ok = await self.builder.try_build("depot", U.SUPPLYDEPOT, desired, cooldown=6, max_existing=None)
+        ok = await self.builder.try_build(
+            "depot", U.SUPPLYDEPOT, desired, cooldown=6, max_existing=None, exact=slot is not None
+        )
         
         self._log(
             "building",
@@ -311,6 +463,24 @@ class Orchestrator:
             every_n_it=10,
         )
 
+        slot = self._slot_for(U.BARRACKS)
+        if slot is not None:
+            ok = await self.builder.try_build("rax", U.BARRACKS, slot, cooldown=18, exact=True)
+            self._log(
+                "building",
+                {
+                    "event": "build_result",
+                    "name": "rax",
+                    "unit": str(U.BARRACKS),
+                    "desired": [int(slot.x), int(slot.y)],
+                    "ok": bool(ok),
+                    "source": "layout",
+                },
+            )
+            if ok:
+                self.state.build.rax_started = True
+            return
+
         ramp = getattr(self.bot, "main_base_ramp", None)
         ramp_pos = getattr(ramp, "barracks_correct_placement", None) if ramp is not None else None
         if ramp_pos is not None:
@@ -383,80 +553,6 @@ class Orchestrator:
     # =============================================================================
     # MACRO: REFINERY (geyser-based)
     # =============================================================================
-    def _iter_geyser_candidates(self):
-        """Yield all vespene geyser units from any available source
-        
-        Note: self.api.units(type_id) returns PLAYER units only.
-        For neutral units, we must use bot.state.vespene_geyser, bot.vespene_geyser, or state.neutral_units.
-        """
-        # 1) Try bot.state.vespene_geyser first (if available in this fork)
-        try:
-            state = getattr(self.bot, "state", None)
-            if state is not None:
-                vg = getattr(state, "vespene_geyser", None)
-                if vg is not None:
-                    for u in vg:
-                        yield u
-                    return
-        except Exception:
-            pass
-
-        # 2) Try bot.vespene_geyser property directly
-        try:
-            vg = getattr(self.bot, "vespene_geyser", None)
-            if vg is not None and getattr(vg, "exists", False):
-                for u in vg:
-                    yield u
-                return
-        except Exception:
-            pass
-
-        # 3) Try state.neutral_units (not game_info.map_neutral_units)
-        try:
-            state = getattr(self.bot, "state", None)
-            if state is not None:
-                neutrals = getattr(state, "neutral_units", None)
-                if neutrals is not None:
-                    for u in neutrals:
-                        tid = getattr(u, "type_id", None)
-                        if tid in (U.VESPENEGEYSER, U.PROTOSSVESPENEGEYSER, U.SHAKURASVESPENEGEYSER):
-                            yield u
-                    return
-        except Exception:
-            pass
-
-        # 4) Fallback: Try all_units and filter by name (this is slow but comprehensive)
-        try:
-            all_u = getattr(self.bot, "all_units", None)
-            if all_u is not None:
-                found = False
-                for u in all_u:
-                    name = str(getattr(u, "name", "")).lower()
-                    if "vespenegeyser" in name:
-                        yield u
-                        found = True
-                if found:
-                    return
-        except Exception:
-            pass
-
-    def _is_geyser_unit(self, u) -> bool:
-        tid = getattr(u, "type_id", None)
-        if tid in (U.VESPENEGEYSER, U.PROTOSSVESPENEGEYSER, U.SHAKURASVESPENEGEYSER):
-            return True
-        nm = str(getattr(u, "name", "")).lower()
-        return ("vespenegeyser" in nm) or ("shakurasvespenegeyser" in nm) or ("protossvespenegeyser" in nm)
-
-    def _pos(self, u):
-        p = getattr(u, "position", None)
-        if p is not None:
-            return p
-        x = getattr(u, "x", None)
-        y = getattr(u, "y", None)
-        if x is not None and y is not None:
-            return Point2((float(x), float(y)))
-        return None
-
     async def _macro_refinery(self, cc) -> None:
         if not self._need_refinery():
             return
@@ -472,101 +568,80 @@ class Orchestrator:
             every_n_it=15,
         )
 
-        candidates = []
-        for u in self._iter_geyser_candidates():
-            if not self._is_geyser_unit(u):
-                continue
-            p = self._pos(u)
-            if p is None:
-                continue
-            d = p.distance_to(cc.position)
-            if d <= 12:
-                candidates.append((d, u))
-
-        if not candidates:
+        res = self.place.resources
+        gi = res.free_geyser(cc.position, max_dist=12)
+        if gi is None:
             self._emit_intent(
                 "ref_no_candidates",
                 {
                     "event": "ref_no_candidates",
-                    "note": "missing neutrals/vespene list",
+                    "note": "no free geyser at this base" if res.ready else "resource index not built",
                     "cc": [int(cc.position.x), int(cc.position.y)],
-                    "debug": {
-                        "all_units_count": len(list(self.bot.all_units)) if hasattr(self.bot, "all_units") else 0,
-                    }
+                    "geysers": int(len(res.geyser_xy)),
                 },
                 every_n_it=30,
             )
-            if self.debug:
-                print(f"[REFINERY] No geyser candidates found near {cc.position}")
-                # Debug: list all units
-                au = getattr(self.bot, "all_units", None)
-                if au:
-                    for u in list(au)[:10]:
-                        print(f"  - {getattr(u, 'name', '?')}: {getattr(u, 'position', '?')}")
             return
-            return
-
-        candidates.sort(key=lambda t: t[0])
 
-        ref_structs = self.api.units(U.REFINERY)
         workers = getattr(self.bot, "workers", None)
         if workers is None or not self.api.exists(workers):
             return
 
-        for dist, geyser in candidates:
-            gp = self._pos(geyser)
-            if gp is None:
-                continue
-
-            if self.api.exists(self.api.closer_than(ref_structs, 1.0, gp)):
-                continue
+        geyser = res.geyser_unit(gi)
+        gp = res.geyser_pos(gi)
+        dist = gp.distance_to(cc.position)
+        if not self.econ.can_afford_reserved(U.REFINERY):
+            return
 
-            if not self.econ.can_afford_reserved(U.REFINERY):
-                return
+        worker_pool = workers.gathering if hasattr(workers, "gathering") else workers
+        worker = self.api.closest_to(worker_pool if self.api.exists(worker_pool) else workers, gp)
+        if worker is None:
+            return
 
-            worker_pool = workers.gathering if hasattr(workers, "gathering") else workers
-            worker = self.api.closest_to(worker_pool if self.api.exists(worker_pool) else workers, gp)
-            if worker is None:
-                return
+        self._log(
+            "building",
+            {
+                "event": "build_attempt",
+                "name": "refinery",
+                "unit": str(U.REFINERY),
+                "geyser_dist": float(dist),
+                "pos": [int(gp.x), int(gp.y)],
+            },
+        )
 
+        try:
+            ok = await self.api.do(worker.build(U.REFINERY, geyser), immediate=True)
+        except Exception as e:
             self._log(
                 "building",
                 {
-                    "event": "build_attempt",
+                    "event": "build_attempt_fallback",
                     "name": "refinery",
                     "unit": str(U.REFINERY),
-                    "geyser_dist": float(dist),
                     "pos": [int(gp.x), int(gp.y)],
+                    "exc": str(e),
                 },
             )
-
             try:
-                await self.bot.do(worker.build(U.REFINERY, geyser))
-            except Exception as e:
-                self._log(
-                    "building",
-                    {
-                        "event": "build_attempt_fallback",
-                        "name": "refinery",
-                        "unit": str(U.REFINERY),
-                        "pos": [int(gp.x), int(gp.y)],
-                        "exc": str(e),
-                    },
-                )
-                await self.bot.do(worker.build(U.REFINERY, gp))
+                ok = await self.api.do(worker.build(U.REFINERY, gp), immediate=True)
+            except Exception:
+                ok = False
 
-            self.state.build.ref_started = True
-            self._log(
-                "building",
-                {
-                    "event": "build_result",
-                    "name": "refinery",
-                    "unit": str(U.REFINERY),
-                    "pos": [int(gp.x), int(gp.y)],
-                    "ok": True,
-                },
-            )
+        self._log(
+            "building",
+            {
+                "event": "build_result",
+                "name": "refinery",
+                "unit": str(U.REFINERY),
+                "pos": [int(gp.x), int(gp.y)],
+                "ok": bool(ok),
+            },
+        )
+        if not ok:
             return
+        # hold the money only once the engine took the order
+        self.econ.commit(self.econ.owner_for(U.REFINERY), U.REFINERY)
+        self.state.build.ref_started = True
 
     # =============================================================================
     # MACRO: FACTORY / STARPORT
@@ -575,7 +650,8 @@ class Orchestrator:
         if not self._need_factory():
             return
 
-        desired = snap(cc.position.towards(self.bot.game_info.map_center, 12))
+        slot = self._slot_for(U.FACTORY)
+        desired = slot if slot is not None else snap(cc.position.towards(self.bot.game_info.map_center, 12))
         self._emit_intent(
             "intent_factory",
             {
@@ -588,7 +664,7 @@ class Orchestrator:
             every_n_it=15,
         )
 
-        ok = await self.builder.try_build("factory", U.FACTORY, desired, cooldown=24)
+        ok = await self.builder.try_build("factory", U.FACTORY, desired, cooldown=24, exact=slot is not None)
         self._log(
             "building",
             {
@@ -606,7 +682,8 @@ class Orchestrator:
         if not self._need_starport():
             return
 
-        desired = snap(cc.position.towards(self.bot.game_info.map_center, 14))
+        slot = self._slot_for(U.STARPORT)
+        desired = slot if slot is not None else snap(cc.position.towards(self.bot.game_info.map_center, 14))
         self._emit_intent(
             "intent_starport",
             {
@@ -619,7 +696,7 @@ class Orchestrator:
             every_n_it=15,
         )
 
-        ok = await self.builder.try_build("starport", U.STARPORT, desired, cooldown=24)
+        ok = await self.builder.try_build("starport", U.STARPORT, desired, cooldown=24, exact=slot is not None)
         self._log(
             "building",
             {
@@ -637,43 +714,59 @@ class Orchestrator:
     # PRODUÇÃO: MARINES / MEDIVAC
     # =============================================================================
     async def _produce_marines(self) -> None:
-        if not self.state.build.rax_started:
-            return
-
-        rax = self.api.ready(U.BARRACKS)
+        rax = self.world.ready(U.BARRACKS)
         if not self.api.exists(rax):
             return
 
         # Keep minimum for drop (`marines_for_drop`) but cap overall production
-        if self.api.amount(self.api.units(U.MARINE)) >= self.marine_cap:
+        if self.world.count(U.MARINE) >= self.marine_cap:
             return
 
-        for b in self.api.idle(rax):
-            if self.econ.can_afford_reserved(U.MARINE) and int(getattr(self.bot, "supply_left", 0) or 0) > 0:
-                self._log("action", {"event": "do", "what": "train", "unit": "MARINE"})
-                await self.bot.do(b.train(U.MARINE))
+        supply_left = int(getattr(self.bot, "supply_left", 0) or 0)
+        for b in self.world.idle(U.BARRACKS):
+            if supply_left <= 0 or not self.econ.claim(U.MARINE):
+                break
+            self._log("action", {"event": "do", "what": "train", "unit": "MARINE"})
+            await self.api.do(b.train(U.MARINE))
+            supply_left -= 1
 
     async def _produce_medivac(self) -> None:
-        if not self.state.build.starport_started:
-            return
-
-        sp = self.api.ready(U.STARPORT)
+        sp = self.world.ready(U.STARPORT)
         if not self.api.exists(sp):
             return
 
-        if self.api.amount(self.api.units(U.MEDIVAC)) >= 1:
+        if self.world.count(U.MEDIVAC) >= 1:
             return
 
-        for s in self.api.idle(sp):
-            if self.econ.can_afford_reserved(U.MEDIVAC) and int(getattr(self.bot, "supply_left", 0) or 0) > 0:
-                self._log("action", {"event": "do", "what": "train", "unit": "MEDIVAC"})
-                await self.bot.do(s.train(U.MEDIVAC))
+        supply_left = int(getattr(self.bot, "supply_left", 0) or 0)
+        for s in self.world.idle(U.STARPORT):
+            if supply_left < 2 or not self.econ.claim(U.MEDIVAC):
+                break
+            self._log("action", {"event": "do", "what": "train", "unit": "MEDIVAC"})
+            await self.api.do(s.train(U.MEDIVAC))
+            supply_left -= 2
 
     # =============================================================================
     # STEP
     # =============================================================================
     async def step(self):
-        self.econ.budget.reset()
+        prof = self.perf
+        if self.strat_watch is not None:
+            # frame boundary: last frame's orders are flushed, nothing of this one issued yet
+            self._reload_strategy()
+        try:
+            with prof.stage("total"):
+                await self._step()
+        finally:
+            # every buffered unit order of this frame goes out as one batch
+            with prof.stage("flush"):
+                await self.api.flush()
+            if prof.end_step():
+                self._log("perf", prof.report())
+
+    async def _step(self):
+        prof = self.perf
+        self.econ.tick()
 
         cc = self._main_cc()
         if cc is None:
@@ -702,23 +795,63 @@ class Orchestrator:
                 },
             )
 
-        await self.api.distribute_workers()
+        # the one scan of enemy units this frame; everything else asks the memory
+        with prof.stage("memory"):
+            self.memory.update()
+
+        with prof.stage("sync_grid"):
+            self.place.sync_grid()
+            self._plan_layout()
 
-        self._reserve_critical()
+        with prof.stage("distribute_workers"):
+            await self.workers.step()
+
+        with prof.stage("expansion"):
+            self.expansion.update()
+            bases = self.expansion.bases.values()
+            self.econ.observe(
+                workers_m=sum(b.workers_m for b in bases),
+                workers_g=sum(b.workers_g for b in bases),
+            )
 
-        await self._macro_depot(cc)
-        await self._macro_rax(cc)
-        await self._macro_refinery(cc)
-        await self._macro_factory(cc)
-        await self._macro_starport(cc)
+        with prof.stage("reserve"):
+            self._reserve_critical()
+
+        with prof.stage("macro_depot"):
+            await self._macro_depot(cc)
+        with prof.stage("macro_rax"):
+            await self._macro_rax(cc)
+        with prof.stage("macro_refinery"):
+            await self._macro_refinery(cc)
+        with prof.stage("macro_factory"):
+            await self._macro_factory(cc)
+        with prof.stage("macro_starport"):
+            await self._macro_starport(cc)
+        with prof.stage("expand"):
+            await self.expansion.step()
 
         # Execute strategy plan (build/prod) if available
         if getattr(self, "plan", None) is not None:
-            await self.plan.step()
+            with prof.stage("plan"):
+                await self.plan.step()
+
+        with prof.stage("premove"):
+            await self._premove_builders()
+
+        with prof.stage("produce"):
+            await self._produce_marines()
+            await self._produce_medivac()
+        with prof.stage("macro_workers"):
+            await self._macro_workers(cc)
+
+        with prof.stage("scout"):
+            await self.scout.step()
+        with prof.stage("defense"):
+            await self.defense.step()
 
-        await self._produce_marines()
-        await self._produce_medivac()
-        await self._macro_workers(cc)
+        with prof.stage("influence"):
+            self.influence.update()
 
         if getattr(self.strat, "drop", None) is None or self.strat.drop.enabled:
-            await self.drop.step()
\ No newline at end of file
+            with prof.stage("drop"):
+                await self.drop.step()
@@ -0,0 +1,138 @@
+#perf.py
+from __future__ import annotations
+
+from array import array
+from time import perf_counter_ns
+from typing import Any, Callable, Dict, List, Optional
+
+
+class _Stage:
+    """
+    Ring buffer de um estágio (ns + RPCs por frame), preallocado.
+    Reutilizado como context manager: nenhuma alocação por frame.
+    """
+
+    __slots__ = ("name", "prof", "ns", "rpc", "n", "_t0", "_r0", "_acc_ns", "_acc_rpc", "_ran")
+
+    def __init__(self, name: str, prof: "StepProfiler", window: int):
+        self.name = name
+        self.prof = prof
+        self.ns = array("q", [0]) * window
+        self.rpc = array("q", [0]) * window
+        self.n = 0
+        self._t0 = 0
+        self._r0 = 0
+        # a stage may run more than once per frame: accumulate until end_step
+        self._acc_ns = 0
+        self._acc_rpc = 0
+        self._ran = False
+
+    def __enter__(self) -> "_Stage":
+        self._ran = True
+        self._r0 = self.prof._rpcs()
+        self._t0 = perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._acc_ns += perf_counter_ns() - self._t0
+        self._acc_rpc += self.prof._rpcs() - self._r0
+
+    def commit(self) -> None:
+        if not self._ran:
+            return
+        i = self.n % len(self.ns)
+        self.ns[i] = self._acc_ns
+        self.rpc[i] = self._acc_rpc
+        self.n += 1
+        self._acc_ns = 0
+        self._acc_rpc = 0
+        self._ran = False
+
+    def summary(self) -> Dict[str, Any]:
+        k = min(self.n, len(self.ns))
+        if k == 0:
+            return {"n": 0}
+        ns = sorted(self.ns[:k])
+        rpc = self.rpc[:k]
+        return {
+            "n": self.n,
+            "p50_ms": round(ns[k // 2] / 1e6, 3),
+            "p95_ms": round(ns[min(k - 1, (k * 95) // 100)] / 1e6, 3),
+            "max_ms": round(ns[-1] / 1e6, 3),
+            "rpc_avg": round(sum(rpc) / k, 2),
+            "rpc_max": max(rpc),
+        }
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullStage":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        return None
+
+
+_NULL = _NullStage()
+
+
+class StepProfiler:
+    """
+    Tempo de parede + RPCs aguardados por estágio do Orchestrator.step().
+    - p50/p95/max numa janela deslizante (ring buffer de `window` frames)
+    - a cada `emit_every` frames manda um registro no canal "perf"
+    Barato o bastante para ficar ligado em produção.
+    """
+
+    def __init__(
+        self,
+        *,
+        enabled: bool = True,
+        window: int = 256,
+        emit_every: int = 224,
+        rpc_counter: Optional[Callable[[], int]] = None,
+    ):
+        self.enabled = bool(enabled)
+        self.window = int(window)
+        self.emit_every = int(emit_every)
+        self._rpc_counter = rpc_counter
+        self._stages: Dict[str, _Stage] = {}
+        self._order: List[str] = []
+        self._steps = 0
+
+    def _rpcs(self) -> int:
+        fn = self._rpc_counter
+        if fn is None:
+            return 0
+        try:
+            return int(fn())
+        except Exception:
+            return 0
+
+    def stage(self, name: str):
+        if not self.enabled:
+            return _NULL
+        st = self._stages.get(name)
+        if st is None:
+            st = _Stage(name, self, self.window)
+            self._stages[name] = st
+            self._order.append(name)
+        return st
+
+    def end_step(self) -> bool:
+        """Close the frame. Returns True when a report is due."""
+        if not self.enabled:
+            return False
+        for st in self._stages.values():
+            st.commit()
+        self._steps += 1
+        return self.emit_every > 0 and self._steps % self.emit_every == 0
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "event": "perf",
+            "steps": self._steps,
+            "window": self.window,
+            "stages": {name: self._stages[name].summary() for name in self._order},
+        }
@@ -1,12 +1,16 @@
 # placement.py
 from __future__ import annotations
 
+import math
 from dataclasses import dataclass
-from typing import Optional, Iterable
+from typing import Any, Dict, Optional, Iterable
+
+import numpy as np
 from sc2.position import Point2
 from sc2.ids.unit_typeid import UnitTypeId as U
 from sc2.ids.ability_id import AbilityId as A
 
+from .resources import ResourceIndex
 from .utils import snap
 
 
@@ -16,10 +20,257 @@ class PlacementResult:
     strict: bool  # True se veio de query do motor / can_place, False se foi fallback fraco
 
 
+# footprint side (tiles) for structures we build or that block our grid
+FOOTPRINT: Dict[U, int] = {
+    U.COMMANDCENTER: 5,
+    U.ORBITALCOMMAND: 5,
+    U.PLANETARYFORTRESS: 5,
+    U.SUPPLYDEPOT: 2,
+    U.SUPPLYDEPOTLOWERED: 2,
+    U.REFINERY: 3,
+    U.BARRACKS: 3,
+    U.ENGINEERINGBAY: 3,
+    U.BUNKER: 3,
+    U.MISSILETURRET: 2,
+    U.FACTORY: 3,
+    U.STARPORT: 3,
+    U.ARMORY: 3,
+    U.FUSIONCORE: 3,
+    U.SENSORTOWER: 1,
+    U.GHOSTACADEMY: 3,
+    U.BARRACKSTECHLAB: 2,
+    U.BARRACKSREACTOR: 2,
+    U.FACTORYTECHLAB: 2,
+    U.FACTORYREACTOR: 2,
+    U.STARPORTTECHLAB: 2,
+    U.STARPORTREACTOR: 2,
+}
+
+# buildings that may later get a 2x2 addon at (+2.5, -0.5)
+ADDON_HOSTS = (U.BARRACKS, U.FACTORY, U.STARPORT)
+
+
+def footprint_size(unit_type: U, unit: Any = None) -> Optional[int]:
+    size = FOOTPRINT.get(unit_type)
+    if size is not None:
+        return size
+    fr = getattr(unit, "footprint_radius", None) if unit is not None else None
+    if fr:
+        return max(1, int(round(float(fr) * 2)))
+    return None
+
+
+class PlacementGrid:
+    """
+    Grade local de construção (numpy), montada uma vez a partir de
+    game_info.placement_grid & pathing_grid.
+    - ocupação por estruturas é atualizada incrementalmente (diff de tags)
+    - consultas "cabe um NxN aqui?" via summed-area table, vetorizadas
+    É só um filtro rápido: o motor continua sendo a palavra final.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.ready = False
+        self._base: Optional[np.ndarray] = None  # 1 = terrain not buildable
+        self._occ: Optional[np.ndarray] = None  # footprint counters
+        self._sat: Optional[np.ndarray] = None
+        self._dirty = True
+        self._stamped: Dict[int, tuple[Point2, int]] = {}  # tag -> (center, size)
+        self._ring_cache: Dict[int, np.ndarray] = {}
+
+    def build(self) -> bool:
+        gi = getattr(self.bot, "game_info", None)
+        place = getattr(getattr(gi, "placement_grid", None), "data_numpy", None)
+        if place is None:
+            return False
+        buildable = np.asarray(place) != 0
+        path = getattr(getattr(gi, "pathing_grid", None), "data_numpy", None)
+        if path is not None and np.shape(path) == buildable.shape:
+            # pathing grid carries minerals/rocks that the placement grid ignores
+            buildable &= np.asarray(path) != 0
+        self._base = (~buildable).astype(np.int32)
+        self._occ = np.zeros_like(self._base)
+        self._stamped.clear()
+        self._dirty = True
+        self.ready = True
+
+        # resources block placement too (stamped once, never removed)
+        for attr in ("mineral_field", "vespene_geyser"):
+            for u in getattr(self.bot, attr, None) or []:
+                size = 3 if attr == "vespene_geyser" else None
+                if size is None:
+                    self._stamp_rect(u.position, 2, 1, +1)
+                else:
+                    self._stamp(u.position, size, +1)
+        return True
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return self._base.shape if self._base is not None else (0, 0)
+
+    # ---------------------------
+    # Incremental occupancy
+    # ---------------------------
+    @staticmethod
+    def origin(c: float, size: int) -> int:
+        return int(math.floor(c - size / 2 + 0.5))
+
+    def _stamp_rect(self, pos: Point2, w: int, h: int, delta: int) -> None:
+        ox, oy = self.origin(pos.x, w), self.origin(pos.y, h)
+        H, W = self.shape
+        x0, x1 = max(0, ox), min(W, ox + w)
+        y0, y1 = max(0, oy), min(H, oy + h)
+        if x0 >= x1 or y0 >= y1:
+            return
+        self._occ[y0:y1, x0:x1] += delta
+        self._dirty = True
+
+    def _stamp(self, pos: Point2, size: int, delta: int) -> None:
+        self._stamp_rect(pos, size, size, delta)
+
+    def add(self, tag: int, unit_type: U, pos: Point2, unit: Any = None) -> None:
+        if not self.ready or tag in self._stamped:
+            return
+        size = footprint_size(unit_type, unit)
+        if size is None:
+            return
+        self._stamp(pos, size, +1)
+        self._stamped[tag] = (pos, size)
+
+    def remove(self, tag: int) -> None:
+        rec = self._stamped.pop(tag, None)
+        if rec is None or not self.ready:
+            return
+        pos, size = rec
+        self._stamp(pos, size, -1)
+
+    def sync(self, structures) -> bool:
+        """Stamp new structures and clear destroyed ones (diff by tag). True if anything changed."""
+        if not self.ready or structures is None:
+            return False
+        n0 = len(self._stamped)
+        changed = False
+        seen = set()
+        for u in structures:
+            tag = getattr(u, "tag", None)
+            if tag is None or getattr(u, "is_flying", False):
+                continue
+            seen.add(tag)
+            if tag not in self._stamped:
+                self.add(tag, getattr(u, "type_id", None), u.position, u)
+        for tag in [t for t in self._stamped if t not in seen]:
+            self.remove(tag)
+            changed = True
+        return changed or len(self._stamped) != n0
+
+    # ---------------------------
+    # Queries
+    # ---------------------------
+    def _table(self) -> np.ndarray:
+        if self._dirty or self._sat is None:
+            blocked = ((self._base + self._occ) > 0).astype(np.int32)
+            sat = np.zeros((blocked.shape[0] + 1, blocked.shape[1] + 1), dtype=np.int32)
+            sat[1:, 1:] = blocked.cumsum(0).cumsum(1)
+            self._sat = sat
+            self._dirty = False
+        return self._sat
+
+    def free_rects(self, ox: np.ndarray, oy: np.ndarray, w: int, h: int) -> np.ndarray:
+        """Vectorized: True where the w x h rect with lower-left tile (ox, oy) is all buildable."""
+        sat = self._table()
+        H, W = self.shape
+        inside = (ox >= 0) & (oy >= 0) & (ox + w <= W) & (oy + h <= H)
+        x0 = np.clip(ox, 0, W)
+        y0 = np.clip(oy, 0, H)
+        x1 = np.clip(ox + w, 0, W)
+        y1 = np.clip(oy + h, 0, H)
+        blocked = sat[y1, x1] - sat[y0, x1] - sat[y1, x0] + sat[y0, x0]
+        return inside & (blocked == 0)
+
+    def can_place_many(self, unit_type: U, xs: np.ndarray, ys: np.ndarray, *, with_addon: bool = False) -> np.ndarray:
+        size = footprint_size(unit_type)
+        if not self.ready or size is None:
+            return np.ones(len(xs), dtype=bool)
+        ox = np.floor(xs - size / 2 + 0.5).astype(np.int64)
+        oy = np.floor(ys - size / 2 + 0.5).astype(np.int64)
+        ok = self.free_rects(ox, oy, size, size)
+        if with_addon and unit_type in ADDON_HOSTS:
+            ok &= self.free_rects(ox + size, oy, 2, 2)
+        return ok
+
+    def can_place(self, unit_type: U, pos: Point2, *, with_addon: bool = False) -> bool:
+        return bool(self.can_place_many(unit_type, np.array([pos.x]), np.array([pos.y]), with_addon=with_addon)[0])
+
+    def _ring_offsets(self, max_dist: int) -> np.ndarray:
+        offs = self._ring_cache.get(max_dist)
+        if offs is None:
+            offs = np.array(
+                [(p.x, p.y) for r in range(max_dist + 1) for p in Placement._ring(0, 0, r)], dtype=np.int64
+            )
+            self._ring_cache[max_dist] = offs
+        return offs
+
+    def candidates(
+        self, unit_type: U, near: Point2, max_dist: int, *, limit: int = 8, with_addon: bool = False
+    ) -> list[Point2]:
+        """Nearest valid centers (ring order), properly aligned to the footprint."""
+        size = footprint_size(unit_type)
+        if not self.ready or size is None:
+            return []
+        offs = self._ring_offsets(max_dist)
+        half = size / 2
+        # ring tiles are lower-left-of-center tiles; centers sit on tile + size/2
+        ox = int(near.x) + offs[:, 0] - int(half)
+        oy = int(near.y) + offs[:, 1] - int(half)
+        ok = self.free_rects(ox, oy, size, size)
+        if with_addon and unit_type in ADDON_HOSTS:
+            ok &= self.free_rects(ox + size, oy, 2, 2)
+        idx = np.flatnonzero(ok)[:limit]
+        return [Point2((float(ox[i] + half), float(oy[i] + half))) for i in idx]
+
+
 class Placement:
     def __init__(self, bot, debug: bool = True):
         self.bot = bot
         self.debug = debug
+        self.grid = PlacementGrid(bot)
+        self.resources = ResourceIndex(bot)
+        # engine round-trips issued by placement queries (for the profiler)
+        self.rpc_count = 0
+
+    def sync_grid(self) -> None:
+        """Build the local grid once, then keep structure footprints up to date."""
+        if not self.grid.ready:
+            try:
+                if not self.grid.build():
+                    return
+            except Exception as e:
+                if self.debug:
+                    print(f"[PLACEMENT] grid build failed: {e}")
+                return
+        structures = getattr(self.bot, "structures", None)
+        if structures is None:
+            return
+        changed = False
+        try:
+            changed = self.grid.sync(structures)
+        except Exception as e:
+            if self.debug:
+                print(f"[PLACEMENT] grid sync failed: {e}")
+        self.sync_resources(changed)
+
+    def sync_resources(self, structures_changed: bool = False) -> None:
+        """Build the resource index once; refresh geyser state only when something changed."""
+        try:
+            if not self.resources.ready:
+                if self.resources.build():
+                    self._dbg(f"[RESOURCES] {len(self.resources.geyser_xy)} geysers, {len(self.resources.bases)} bases")
+                return
+            self.resources.sync(structures_changed)
+        except Exception as e:
+            if self.debug:
+                print(f"[PLACEMENT] resource index failed: {e}")
 
     def _dbg(self, msg: str):
         if self.debug:
@@ -44,51 +295,107 @@ class Placement:
         }
         return mapping.get(unit_type)
 
-    async def can_place_strict(self, unit_type: U, pos: Point2) -> tuple[bool, bool]:
+    def _query_ability(self, ab: A):
         """
-        Returns (can_place, strict_used)
-        strict_used=True means we asked the engine or can_place API.
-        strict_used=False means fallback to placement_grid.
+        Newer python-sc2 wants AbilityData in query_building_placement; older forks accept AbilityId.
         """
-        pos = snap(pos)
+        gd = getattr(self.bot, "game_data", None) or getattr(self.bot, "_game_data", None)
+        abilities = getattr(gd, "abilities", None)
+        if abilities is not None:
+            try:
+                return abilities[ab.value]
+            except Exception:
+                pass
+        return ab
+
+    @staticmethod
+    def _result_ok(r) -> bool:
+        # ActionResult enum (Success == 1) vs plain bool, depending on the fork
+        if isinstance(r, bool):
+            return r
+        v = getattr(r, "value", r)
+        try:
+            return int(v) == 1
+        except Exception:
+            return bool(r)
+
+    async def can_place_many(self, unit_type: U, positions: list[Point2]) -> tuple[list[bool], bool]:
+        """
+        Batched version of can_place_strict: one engine round-trip for the whole list.
+        Returns (oks, strict_used) with oks aligned to positions.
+        """
+        if not positions:
+            return [], True
+        positions = [snap(p) for p in positions]
         client = getattr(self.bot, "_client", None)
         ab = self._ability_for(unit_type)
 
-        # 1) Best: query_building_placement (engine)
+        # 1) Best: query_building_placement (engine) - accepts a list
         if client is not None and hasattr(client, "query_building_placement") and ab is not None:
             try:
-                res = await client.query_building_placement(ab, [pos])
-                result = bool(res[0])
-                if self.debug:
-                    print(f"[PLACEMENT] query_building_placement result: {result}")
-                return result, True
+                self.rpc_count += 1
+                res = await client.query_building_placement(self._query_ability(ab), positions)
+                oks = [self._result_ok(r) for r in res]
+                if len(oks) == len(positions):
+                    if self.debug:
+                        print(f"[PLACEMENT] query_building_placement batch={len(positions)} ok={sum(oks)}")
+                    return oks, True
             except Exception as e:
                 # silent fallback
                 if self.debug:
                     print(f"[PLACEMENT] query_building_placement failed: {e}")
-                pass
 
-        # 2) Common: bot.can_place(unit_type, pos)
+        # 2) Common: bot.can_place(unit_type, pos) - one call per position
         if hasattr(self.bot, "can_place"):
             try:
-                ok = await self.bot.can_place(unit_type, pos)
-                result = bool(ok)
+                oks = []
+                for p in positions:
+                    self.rpc_count += 1
+                    ok = await self.bot.can_place(unit_type, p)
+                    oks.append(bool(ok))
                 if self.debug:
-                    print(f"[PLACEMENT] bot.can_place({unit_type}) result: {result}")
-                return result, True
+                    print(f"[PLACEMENT] bot.can_place({unit_type}) batch={len(positions)} ok={sum(oks)}")
+                return oks, True
             except Exception as e:
                 if self.debug:
                     print(f"[PLACEMENT] bot.can_place failed: {e}")
-                pass
 
-        # 3) Weak fallback: placement_grid or assume ok
-        # If we reach here, the strict methods (query_building_placement, can_place) aren't available
-        # Always return True to let the actual build command determine if placement is valid
+        # 3) Weak fallback: the local grid (not strict - it doesn't know about units/creep changes);
+        # assume ok only if the grid isn't built, and let the build command decide
+        if self.grid.ready:
+            xs = np.array([p.x for p in positions], dtype=np.float64)
+            ys = np.array([p.y for p in positions], dtype=np.float64)
+            oks = [bool(v) for v in self.grid.can_place_many(unit_type, xs, ys)]
+            if self.debug:
+                print(f"[PLACEMENT] Using grid fallback batch={len(positions)} ok={sum(oks)}")
+            return oks, False
         if self.debug:
             print(f"[PLACEMENT] Using fallback (returning True)")
-        return True, False
+        return [True] * len(positions), False
+
+    async def can_place_strict(self, unit_type: U, pos: Point2) -> tuple[bool, bool]:
+        """
+        Returns (can_place, strict_used)
+        strict_used=True means we asked the engine or can_place API.
+        strict_used=False means fallback (local grid, or assume ok if it isn't built).
+        """
+        oks, strict = await self.can_place_many(unit_type, [pos])
+        return bool(oks[0]), strict
+
+    @staticmethod
+    def _ring(x0: int, y0: int, r: int) -> Iterable[Point2]:
+        # top/bottom edges
+        for dx in range(-r, r + 1):
+            for dy in ((-r, r) if r > 0 else (0,)):
+                yield Point2((x0 + dx, y0 + dy))
+        # left/right edges (excluding corners already tested)
+        for dy in range(-r + 1, r):
+            for dx in (-r, r):
+                yield Point2((x0 + dx, y0 + dy))
 
-    async def find_near(self, unit_type: U, near: Point2, max_dist: int = 25) -> Optional[PlacementResult]:
+    async def find_near(
+        self, unit_type: U, near: Point2, max_dist: int = 25, *, chunk_size: int = 128
+    ) -> Optional[PlacementResult]:
         near = snap(near)
 
         # Optional helper in some forks: bot.find_placement
@@ -103,86 +410,44 @@ class Placement:
             except Exception:
                 pass
 
-        # Ring search (Manhattan-ish ring)
-        x0, y0 = int(near.x), int(near.y)
-        checked_count = 0
-        for r in range(0, max_dist + 1):
-            # top/bottom edges
-            for dx in range(-r, r + 1):
-                for dy in (-r, r):
-                    p = Point2((x0 + dx, y0 + dy))
-                    ok, strict = await self.can_place_strict(unit_type, p)
-                    checked_count += 1
-                    if ok:
-                        return PlacementResult(snap(p), strict)
-            # left/right edges (excluding corners already tested)
-            for dy in range(-r + 1, r):
-                for dx in (-r, r):
-                    p = Point2((x0 + dx, y0 + dy))
-                    ok, strict = await self.can_place_strict(unit_type, p)
-                    checked_count += 1
+        # Local grid: scan every candidate at once, confirm only the best few with the engine
+        if self.grid.ready:
+            try:
+                cands = self.grid.candidates(unit_type, near, max_dist)
+            except Exception:
+                cands = []
+            if cands:
+                oks, strict = await self.can_place_many(unit_type, cands)
+                for p, ok in zip(cands, oks):
                     if ok:
                         return PlacementResult(snap(p), strict)
 
+        # Ring search (Manhattan-ish ring), whole rings batched into one query per chunk.
+        # Rings are appended in order, so the first hit in a chunk is the nearest overall.
+        x0, y0 = int(near.x), int(near.y)
+        chunk: list[Point2] = []
+        for r in range(0, max_dist + 1):
+            chunk.extend(self._ring(x0, y0, r))
+            if len(chunk) < chunk_size and r < max_dist:
+                continue
+            oks, strict = await self.can_place_many(unit_type, chunk)
+            for p, ok in zip(chunk, oks):
+                if ok:
+                    return PlacementResult(snap(p), strict)
+            chunk = []
+
         return None
 
     def find_refinery_spot(self, near: Point2, max_dist: float = 15.0) -> Optional[Point2]:
+        """Free geyser of the base at `near` (ResourceIndex lookup, no unit scan)."""
         near = snap(near)
-
-        # 1) Try built-in bot.vespene_geyser property
-        geysers = getattr(self.bot, "vespene_geyser", None) or getattr(self.bot, "vespene_geysers", None)
-        if geysers is not None and getattr(geysers, "exists", False):
-            try:
-                g = geysers.closest_to(near)
-                if g.distance_to(near) <= max_dist:
-                    self._dbg(f"[REFINERY] Found via bot.vespene_geyser: {snap(g.position)}")
-                    return snap(g.position)
-            except Exception:
-                pass
-
-        # 2) Fallback: search by unit type ID (VespeneGeyser, ProtossVespeneGeyser, ShakurasVespeneGeyser)
-        candidates = []
-        for tid in (U.VESPENEGEYSER, U.PROTOSSVESPENEGEYSER, U.SHAKURASVESPENEGEYSER):
-            try:
-                us = self.bot.units(tid)
-                if getattr(us, "exists", False):
-                    candidates.extend(list(us))
-            except Exception:
-                pass
-
-        # 3) Fallback: search all units by name (case-insensitive, matches any geyser variant)
-        if not candidates:
-            au = getattr(self.bot, "all_units", None)
-            if au is not None:
-                for u in au:
-                    name = str(getattr(u, "name", "")).lower()
-                    # Match any variant: "vespenegeyser", "protossvespenegeyser", "shakurasvespenegeyser"
-                    if "vespenegeyser" in name:
-                        candidates.append(u)
-                        self._dbg(f"[REFINERY] Found geyser by name: {getattr(u, 'name', 'Unknown')}")
-
-        if not candidates:
-            self._dbg(f"[REFINERY] No geysers found near {near}")
+        if not self.resources.ready:
+            self.sync_resources()
+        i = self.resources.free_geyser(near, max_dist)
+        if i is None:
+            self._dbg(f"[REFINERY] No free geyser near {near}")
             return None
-
-        # escolher o mais perto dentro do range
-        best = None
-        best_d = 1e18
-        for g in candidates:
-            gp = getattr(g, "position", None)
-            if gp is None:
-                x, y = getattr(g, "x", None), getattr(g, "y", None)
-                if x is None or y is None:
-                    continue
-                gp = Point2((float(x), float(y)))
-            d = gp.distance_to(near)
-            if d <= max_dist and d < best_d:
-                best_d = d
-                best = gp
-
-        if best is not None:
-            self._dbg(f"[REFINERY] Selected geyser at {snap(best)} (distance: {best_d:.1f})")
-        return snap(best) if best is not None else None
+        return snap(self.resources.geyser_pos(i))
 
     async def find_position(self, unit_type: U, desired: Point2, max_dist: int = 25) -> Optional[PlacementResult]:
         """
@@ -6,85 +6,179 @@ from sc2.ids.unit_typeid import UnitTypeId as U
 from sc2.position import Point2
 
 from .api import BotAPI
-from .utils import snap
+from .conditions import ENEMY_SEEN, GAS, LOOP, MINERALS, SUPPLY_LEFT, SUPPLY_USED
+from .economy import priority_of
+from .plandag import PlanDAG, PlanStep, compile_plan
+from .utils import game_loop, snap
+
+
+class _DagState:
+    """Per-plan runtime state: last condition result per step and the steps currently true."""
+
+    def __init__(self, dag: PlanDAG):
+        self.dag = dag
+        self.completed: set[int] = set()
+        self.armed: set[int] = set()
+        self.fresh = True  # nothing evaluated yet
+        self.rank: Dict[int, int] = {i: k for k, i in enumerate(dag.order)}  # step -> position in dag.order
+
+        self.values: List[int] = [0] * len(dag.slots)
+
+    def reevaluate(self, sample: Dict[Any, int]) -> int:
+        """Refresh the value list from this frame's sample; re-check steps reading a changed slot."""
+        dag = self.dag
+        v = self.values
+        idx: set = set()
+        for slot, key in enumerate(dag.slots.keys):
+            x = sample.get(key, 0)
+            if x != v[slot]:
+                v[slot] = x
+                idx.update(dag.by_input.get(slot, ()))
+        if self.fresh:
+            idx = set(range(len(dag.steps)))
+            self.fresh = False
+        n = 0
+        for i in idx:
+            if i in self.completed:
+                continue
+            n += 1
+            if dag.steps[i].cond.fn(v):
+                self.armed.add(i)
+            else:
+                self.armed.discard(i)
+        return n
+
+    def complete(self, i: int) -> None:
+        self.completed.add(i)
+        self.armed.discard(i)
 
 
 class PlanExecutor:
     """Simple executor for strategy build/production plans.
 
-    Supports conditions: have_gte, have_lte, minerals_gte, gas_gte,
-    supply_left_gte, supply_left_lte.
+    Conditions: see bot/conditions.py (counts, resources, supply, time,
+    enemy_seen, all/any/not).
 
     Supports actions: build (unit type string), train (unit type string).
     Build actions reuse Orchestrator.Builder.try_build for placement.
+
+    Plans arrive compiled (StrategyConfig.build_dag / production_dag, see
+    bot/plandag.py). Each frame only the inputs the plans reference are
+    sampled, and only steps indexed under an input that changed are
+    re-checked; steps whose condition holds stay armed until they complete.
     """
 
     def __init__(self, orchestrator):
         self.orch = orchestrator
         self.bot = orchestrator.bot
         self.api = orchestrator.api
+        self.world = orchestrator.world
         self.builder = orchestrator.builder
         self.econ = orchestrator.econ
         self.place = orchestrator.place
         self.state = orchestrator.state
-        # completed indices for one-shot steps
-        self._completed_build: set[int] = set()
-        self._completed_prod: set[int] = set()
-
-    def _unit_from_name(self, name: str):
-        if not name:
-            return None
-        n = name.strip().upper()
-        return getattr(U, n, None)
-
-    def _have_count(self, unit_name: str) -> int:
-        ut = self._unit_from_name(unit_name)
-        if ut is None:
-            return 0
-        existing = self.api.amount(self.api.units(ut))
-        pending = self.api.already_pending(ut)
-        return existing + pending
-
-    def _check_when(self, when: Dict[str, Any]) -> bool:
-        # empty when -> true
-        if not when:
-            return True
-        # minerals/gas
-        if "minerals_gte" in when:
-            if int(getattr(self.bot, "minerals", 0) or 0) < int(when["minerals_gte"]):
-                return False
-        if "gas_gte" in when:
-            if int(getattr(self.bot, "vespene", 0) or 0) < int(when["gas_gte"]):
-                return False
-        # supply
-        if "supply_left_gte" in when:
-            if int(getattr(self.bot, "supply_left", 0) or 0) < int(when["supply_left_gte"]):
-                return False
-        if "supply_left_lte" in when:
-            if int(getattr(self.bot, "supply_left", 0) or 0) > int(when["supply_left_lte"]):
-                return False
-        # have_gte/have_lte maps
-        if "have_gte" in when:
-            for k, v in when["have_gte"].items():
-                if self._have_count(k) < int(v):
-                    return False
-        if "have_lte" in when:
-            for k, v in when["have_lte"].items():
-                if self._have_count(k) > int(v):
-                    return False
-        return True
-
-    async def _do_build(self, do: Dict[str, Any]) -> bool:
-        name = do.get("build")
-        if not name:
-            return False
-        ut = self._unit_from_name(name)
-        if ut is None:
-            return False
+        self._strat = None
+        self._build: Optional[_DagState] = None
+        self._prod: Optional[_DagState] = None
+        self._keys: List[Any] = []
+        self._seen: set = set()  # enemy types seen at least once (only the referenced ones)
+        # steps re-checked last frame (profiling / debug)
+        self.evaluated = 0
+
+    def _bind(self, strat) -> None:
+        """(Re)build the runtime state when the strategy object changes."""
+        self._strat = strat
+        build = getattr(strat, "build_dag", None)
+        if build is None and getattr(strat, "build_plan", None):
+            build = compile_plan(strat.build_plan, "build")
+        prod = getattr(strat, "production_dag", None)
+        if prod is None and getattr(strat, "production_plan", None):
+            prod = compile_plan(strat.production_plan, "production")
+        self._build = _DagState(build) if build is not None else None
+        self._prod = _DagState(prod) if prod is not None else None
+        keys: dict = {}
+        for st in (self._build, self._prod):
+            if st is not None:
+                keys.update(dict.fromkeys(st.dag.slots.keys))
+        self._keys = list(keys)
+
+    def inherit(self, old: "PlanExecutor") -> None:
+        """After a strategy reload: keep one-shot steps that are still the same step at the same index done."""
+        strat = getattr(self.orch, "strat", None)
+        if strat is None:
+            return
+        self._bind(strat)
+        self._seen |= old._seen
+        for new_st, old_st in ((self._build, old._build), (self._prod, old._prod)):
+            if new_st is None or old_st is None:
+                continue
+            for i in old_st.completed:
+                if i < len(new_st.dag.steps) and new_st.dag.steps[i].raw == old_st.dag.steps[i].raw:
+                    new_st.completed.add(i)
+
+    def _enemy_seen(self, wanted: set) -> None:
+        # sticky: a type only needs to be found once
+        missing = wanted - self._seen
+        if not missing:
+            return
+        memory = getattr(self.orch, "memory", None)
+        if memory is not None:
+            self._seen |= missing & memory.types_seen
+            return
+        for src in ("enemy_units", "enemy_structures"):
+            for u in getattr(self.bot, src, None) or []:
+                t = getattr(u, "type_id", None)
+                if t in missing:
+                    self._seen.add(t)
+                    missing.discard(t)
+                    if not missing:
+                        return
+
+    def _sample(self) -> Dict[Any, int]:
+        """Current value of every input the plans reference (one query per key)."""
+        bot = self.bot
+        out: Dict[Any, int] = {}
+        enemy: set = set()
+        for key in self._keys:
+            if key == MINERALS:
+                out[key] = int(getattr(bot, "minerals", 0) or 0)
+            elif key == GAS:
+                out[key] = int(getattr(bot, "vespene", 0) or 0)
+            elif key == SUPPLY_LEFT:
+                out[key] = int(getattr(bot, "supply_left", 0) or 0)
+            elif key == SUPPLY_USED:
+                out[key] = int(getattr(bot, "supply_used", 0) or 0)
+            elif key == LOOP:
+                out[key] = game_loop(bot)
+            elif key[0] == "have":
+                out[key] = self.world.have(key[1])
+            elif key[0] == "ready":
+                out[key] = self.api.amount(self.world.ready(key[1]))
+            elif key[0] == "pending":
+                out[key] = self.world.pending(key[1])
+            elif key[0] == ENEMY_SEEN:
+                enemy.add(key[1])
+        if enemy:
+            self._enemy_seen(enemy)
+            for ut in enemy:
+                out[(ENEMY_SEEN, ut)] = int(ut in self._seen)
+        return out
+
+    async def _do_build(self, step: PlanStep) -> bool:
+        ut = step.unit
         # pick CC
         cc = self.orch._main_cc()
         if cc is None:
             return False
+        # precomputed layout slot first (one verification query in the builder)
+        slot = self.orch._slot_for(ut)
+        # same owner as the orchestrator macros: one reservation per structure type
+        self.econ.reserve(self.econ.owner_for(ut), ut, priority_of(ut), pos=slot)
+        key = step.name.lower()
+        if slot is not None:
+            ok = await self.builder.try_build(key, ut, slot, exact=True)
+            return bool(ok)
+
         # simple desired positioning similar to macros
         if ut == U.SUPPLYDEPOT:
             desired = snap(cc.position.towards(self.bot.game_info.map_center, 6))
@@ -104,120 +198,89 @@ class PlanExecutor:
             desired = snap(cc.position.towards(self.bot.game_info.map_center, 10))
 
         # call builder
-        ok = await self.builder.try_build(name.lower(), ut, desired)
+        ok = await self.builder.try_build(key, ut, desired)
         return bool(ok)
 
-    async def _do_train(self, do: Dict[str, Any]) -> bool:
-        name = do.get("train")
-        if not name:
-            return False
-        ut = self._unit_from_name(name)
-        if ut is None:
-            return False
+    async def _do_train(self, step: PlanStep) -> bool:
+        ut = step.unit
         # MARINE
         if ut == U.MARINE:
-            rax = self.api.ready(U.BARRACKS)
+            rax = self.world.ready(U.BARRACKS)
             if not self.api.exists(rax):
                 return False
             trained = False
-            for b in self.api.idle(rax):
-                if self.econ.can_afford_reserved(U.MARINE) and int(getattr(self.bot, "supply_left", 0) or 0) > 0:
+            for b in self.world.idle(U.BARRACKS):
+                if int(getattr(self.bot, "supply_left", 0) or 0) > 0 and self.econ.claim(U.MARINE):
                     try:
-                        await self.bot.do(b.train(U.MARINE))
+                        await self.api.do(b.train(U.MARINE))
                         trained = True
                     except Exception:
                         pass
             return trained
         if ut == U.MEDIVAC:
-            sp = self.api.ready(U.STARPORT)
+            sp = self.world.ready(U.STARPORT)
             if not self.api.exists(sp):
                 return False
             trained = False
-            for s in self.api.idle(sp):
-                if self.econ.can_afford_reserved(U.MEDIVAC) and int(getattr(self.bot, "supply_left", 0) or 0) > 0:
+            for s in self.world.idle(U.STARPORT):
+                if int(getattr(self.bot, "supply_left", 0) or 0) > 0 and self.econ.claim(U.MEDIVAC):
                     try:
-                        await self.bot.do(s.train(U.MEDIVAC))
+                        await self.api.do(s.train(U.MEDIVAC))
                         trained = True
                     except Exception:
                         pass
             return trained
         return False
 
-    async def _do_addon(self, do: Dict[str, Any]) -> bool:
-        addon = do.get("addon") or {}
-        parent_name = addon.get("to")
-        addon_type = (addon.get("type") or "").strip().upper()
-        if not parent_name or not addon_type:
-            return False
-        parent_ut = self._unit_from_name(parent_name)
-        if parent_ut is None:
-            return False
-
-        # guess addon unit name (e.g., BARRACKS + TECHLAB -> BARRACKSTECHLAB)
-        cand_name = f"{parent_name.strip().upper()}{addon_type}"
-        addon_ut = getattr(U, cand_name, None)
-        if addon_ut is None:
-            return False
+    async def _do_addon(self, step: PlanStep) -> bool:
+        parent_ut, addon_ut = step.parent, step.unit
 
         # find a ready parent without a nearby addon
-        parents = self.api.ready(parent_ut)
+        parents = self.world.ready(parent_ut)
         if not self.api.exists(parents):
             return False
 
         for p in parents:
             # skip if an addon of this type already exists very near
-            if self.api.exists(self.api.closer_than(self.api.units(addon_ut), 1.5, p.position)):
+            if self.api.exists(self.api.closer_than(self.world.units(addon_ut), 1.5, p.position)):
                 continue
             try:
-                await self.bot.do(p.build(addon_ut))
+                await self.api.do(p.build(addon_ut))
                 return True
             except Exception:
-                try:
-                    # fallback: try parent.build with no await
-                    await self.bot.do(p.build(addon_ut))
-                    return True
-                except Exception:
-                    continue
+                continue
         return False
 
+    async def _run(self, st: _DagState, allowed: tuple) -> None:
+        # dag.order (producers before the steps waiting on them, plan order otherwise);
+        # only steps whose condition currently holds
+        for i in sorted(st.armed, key=st.rank.__getitem__):
+            step = st.dag.steps[i]
+            if step.kind not in allowed:
+                continue
+            if step.kind == "addon":
+                ok = await self._do_addon(step)
+            elif step.kind == "build":
+                ok = await self._do_build(step)
+            else:
+                ok = await self._do_train(step)
+            if ok and step.once:
+                st.complete(i)
+
     async def step(self) -> None:
         strat = getattr(self.orch, "strat", None)
         if strat is None:
             return
-        # build plan
-        build_plan = getattr(strat, "build_plan", None) or []
-        for i, step in enumerate(build_plan):
-            if i in self._completed_build:
-                continue
-            when = step.get("when", {}) or {}
-            do = step.get("do", {}) or {}
-            if not self._check_when(when):
-                continue
-            # dispatch action: build or addon
-            if "build" in do:
-                ok = await self._do_build(do)
-            elif "addon" in do:
-                ok = await self._do_addon(do)
-            else:
-                ok = False
-            # if executed, and step has once (default True), mark completed
-            once = step.get("once", True)
-            if ok and once:
-                self._completed_build.add(i)
-
-        # production plan
-        prod_plan = getattr(strat, "production_plan", None) or []
-        for i, step in enumerate(prod_plan):
-            if i in self._completed_prod:
-                continue
-            when = step.get("when", {}) or {}
-            do = step.get("do", {}) or {}
-            if not self._check_when(when):
-                continue
-            ok = False
-            if "train" in do:
-                ok = await self._do_train(do)
-            elif "addon" in do:
-                ok = await self._do_addon(do)
-            if ok and step.get("once", False):
-                self._completed_prod.add(i)
\ No newline at end of file
+        if strat is not self._strat:
+            self._bind(strat)
+        if self._build is None and self._prod is None:
+            return
+
+        sample = self._sample()
+        self.evaluated = 0
+        if self._build is not None:
+            self.evaluated += self._build.reevaluate(sample)
+            await self._run(self._build, ("build", "addon"))
+        if self._prod is not None:
+            self.evaluated += self._prod.reevaluate(sample)
+            await self._run(self._prod, ("train", "addon"))
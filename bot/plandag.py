@@ -0,0 +1,127 @@
+#plandag.py
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+from sc2.ids.unit_typeid import UnitTypeId as U
+
+from .conditions import ALWAYS, Condition, Slots, compile_when, unit_from_name
+
+
+@dataclass
+class PlanStep:
+    index: int
+    kind: str  # build | train | addon | none
+    unit: Optional[U]  # build/train target, or the addon unit
+    cond: Condition
+    once: bool
+    name: str = ""  # original unit name (builder key / logs)
+    parent: Optional[U] = None  # addon host
+    deps: Tuple[int, ...] = ()  # steps producing a unit this one waits for
+    raw: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def inputs(self) -> FrozenSet[int]:
+        return self.cond.inputs
+
+
+@dataclass
+class PlanDAG:
+    """
+    Plano compilado: nomes resolvidos para UnitTypeId, condições compiladas
+    (bot/conditions.py) ligadas aos slots de entrada de que dependem
+    (by_input) e arestas produtor -> consumidor (deps), que dão a ordem em
+    que o executor roda os passos armados (order).
+    O executor só reavalia os passos cujas entradas mudaram.
+    """
+
+    kind: str  # "build" | "production"
+    steps: List[PlanStep]
+    slots: Slots  # input keys, in the order of the value list the conditions read
+    by_input: Dict[int, Tuple[int, ...]]  # slot -> steps
+    order: List[int]  # topological (producers first); plan order breaks ties
+    errors: List[str]
+
+
+def _compile_step(i: int, raw: Dict[str, Any], kind: str, slots: Slots, errors: List[str]) -> PlanStep:
+    where = f"{kind}[{i}]"
+    if not isinstance(raw, dict):
+        errors.append(f"{where}: step must be an object")
+        return PlanStep(i, "none", None, ALWAYS, True, raw={})
+    cond = compile_when(raw.get("when", {}) or {}, slots, where, errors)
+    do = raw.get("do", {}) or {}
+    once = bool(raw.get("once", kind == "build"))
+
+    step_kind, unit, name, parent = "none", None, "", None
+    if "build" in do or "train" in do:
+        step_kind = "build" if "build" in do else "train"
+        name = str(do.get(step_kind) or "")
+        unit = unit_from_name(name)
+        if unit is None:
+            errors.append(f"{where}: unknown unit {name!r}")
+            step_kind = "none"
+    elif "addon" in do:
+        addon = do.get("addon") or {}
+        parent = unit_from_name(addon.get("to"))
+        addon_type = str(addon.get("type") or "").strip().upper()
+        unit = getattr(U, f"{str(addon.get('to') or '').strip().upper()}{addon_type}", None)
+        name = addon_type
+        if parent is None or unit is None:
+            errors.append(f"{where}: bad addon {addon!r}")
+            step_kind, unit, parent = "none", None, None
+        else:
+            step_kind = "addon"
+    else:
+        errors.append(f"{where}: no build/train/addon action")
+
+    return PlanStep(i, step_kind, unit, cond, once, name=name, parent=parent, raw=raw)
+
+
+def compile_plan(raw_steps: Optional[List[Dict[str, Any]]], kind: str = "build", slots: Optional[Slots] = None) -> PlanDAG:
+    errors: List[str] = []
+    slots = slots if slots is not None else Slots()
+    steps = [_compile_step(i, s, kind, slots, errors) for i, s in enumerate(raw_steps or [])]
+
+    by_input: Dict[int, List[int]] = {}
+    for s in steps:
+        for k in s.inputs:
+            by_input.setdefault(k, []).append(s.index)
+
+    # edges: a step waiting on have/ready_gte(T) depends on the steps that make T
+    producers: Dict[U, List[int]] = {}
+    for s in steps:
+        if s.unit is not None:
+            producers.setdefault(s.unit, []).append(s.index)
+    for s in steps:
+        deps = set()
+        for ut in s.cond.needs:
+            deps.update(p for p in producers.get(ut, ()) if p != s.index)
+        s.deps = tuple(sorted(deps))
+
+    order = _topo(steps, errors, kind)
+    return PlanDAG(kind, steps, slots, {k: tuple(v) for k, v in by_input.items()}, order, errors)
+
+
+def _topo(steps: List[PlanStep], errors: List[str], kind: str) -> List[int]:
+    """Kahn's algorithm, lowest index first; a cycle is reported and its steps appended in plan order."""
+    indeg = {s.index: len(s.deps) for s in steps}
+    users: Dict[int, List[int]] = {}
+    for s in steps:
+        for d in s.deps:
+            users.setdefault(d, []).append(s.index)
+    ready = sorted(i for i, n in indeg.items() if n == 0)
+    order: List[int] = []
+    while ready:
+        i = ready.pop(0)
+        order.append(i)
+        for j in users.get(i, ()):
+            indeg[j] -= 1
+            if indeg[j] == 0:
+                ready.append(j)
+                ready.sort()
+    if len(order) < len(steps):
+        left = [s.index for s in steps if s.index not in set(order)]
+        errors.append(f"{kind}: dependency cycle between steps {left}")
+        order.extend(left)
+    return order
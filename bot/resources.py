@@ -0,0 +1,200 @@
+#resources.py
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from sc2.ids.unit_typeid import UnitTypeId as U
+from sc2.position import Point2
+
+from .utils import game_loop
+
+GEYSER_TYPES = (U.VESPENEGEYSER, U.PROTOSSVESPENEGEYSER, U.SHAKURASVESPENEGEYSER)
+
+# anything that sits on a geyser (ours or the enemy's) makes it unavailable
+GAS_BUILDINGS = tuple(
+    t for t in (
+        getattr(U, n, None)
+        for n in ("REFINERY", "REFINERYRICH", "ASSIMILATOR", "ASSIMILATORRICH", "EXTRACTOR", "EXTRACTORRICH")
+    )
+    if t is not None
+)
+
+
+def _xy_key(p: Point2) -> Tuple[int, int]:
+    # geysers and the gas building on top share the same center (half-tile grid)
+    return int(round(p.x * 2)), int(round(p.y * 2))
+
+
+class ResourceIndex:
+    """
+    Índice de recursos montado uma vez no início do jogo.
+    - cada mineral field / geyser é atribuído à expansão mais próxima
+    - posições em arrays numpy; geysers por base em listas de índices
+    - taken/depleted só são recalculados quando o conjunto de estruturas muda
+      (ou a cada refresh_every loops, para pegar refinarias inimigas)
+    Escolher um geyser livre vira uma consulta por base, sem varrer all_units.
+    """
+
+    def __init__(self, bot: Any, refresh_every: int = 224):
+        self.bot = bot
+        self.refresh_every = refresh_every
+        self.ready = False
+
+        self.bases = np.zeros((0, 2), dtype=np.float64)
+        self.geyser_xy = np.zeros((0, 2), dtype=np.float64)
+        self.geyser_base = np.zeros(0, dtype=np.int32)
+        self.mineral_xy = np.zeros((0, 2), dtype=np.float64)
+        self.mineral_base = np.zeros(0, dtype=np.int32)
+        self.taken = np.zeros(0, dtype=bool)
+        self.depleted = np.zeros(0, dtype=bool)
+
+        self._geyser_units: List[Any] = []
+        self._geysers_of: List[List[int]] = []
+        self._by_xy: Dict[Tuple[int, int], int] = {}
+        self._base_cache: Dict[Tuple[int, int], int] = {}
+        self._next_refresh = 0
+
+    # ---------------------------
+    # Build (once)
+    # ---------------------------
+    def _scan(self) -> Tuple[List[Any], List[Any]]:
+        """Geysers and mineral fields from whatever this python-sc2 fork exposes."""
+        geysers = list(getattr(self.bot, "vespene_geyser", None) or [])
+        minerals = list(getattr(self.bot, "mineral_field", None) or [])
+        if geysers and minerals:
+            return geysers, minerals
+
+        # older forks: only neutral_units / all_units (scanned once, here)
+        st = getattr(self.bot, "state", None)
+        pool = getattr(st, "neutral_units", None) or getattr(self.bot, "all_units", None) or []
+        need_g, need_m = not geysers, not minerals
+        for u in pool:
+            nm = str(getattr(u, "name", "")).lower()
+            if need_g and (getattr(u, "type_id", None) in GEYSER_TYPES or "vespenegeyser" in nm):
+                geysers.append(u)
+            elif need_m and "mineralfield" in nm:
+                minerals.append(u)
+        return geysers, minerals
+
+    def _base_locations(self) -> List[Point2]:
+        out: List[Point2] = []
+        start = getattr(self.bot, "start_location", None)
+        if start is not None:
+            out.append(start)
+        try:
+            exps = list(getattr(self.bot, "expansion_locations_list", None) or [])
+        except Exception:
+            exps = []  # expansion locations not computed in this fork/map
+        for p in exps:
+            if all(p.distance_to(q) > 3 for q in out):
+                out.append(p)
+        return out
+
+    def _nearest_base(self, xy: np.ndarray) -> np.ndarray:
+        if len(self.bases) == 0 or len(xy) == 0:
+            return np.zeros(len(xy), dtype=np.int32)
+        d2 = ((xy[:, None, :] - self.bases[None, :, :]) ** 2).sum(axis=2)
+        return d2.argmin(axis=1).astype(np.int32)
+
+    def build(self) -> bool:
+        geysers, minerals = self._scan()
+        if not geysers and not minerals:
+            return False
+
+        bases = self._base_locations()
+        if not bases:
+            # no expansion data: treat each geyser as its own "base"
+            bases = [g.position for g in geysers]
+        self.bases = np.array([(p.x, p.y) for p in bases], dtype=np.float64).reshape(-1, 2)
+
+        self._geyser_units = geysers
+        self.geyser_xy = np.array([(g.position.x, g.position.y) for g in geysers], dtype=np.float64).reshape(-1, 2)
+        self.mineral_xy = np.array([(m.position.x, m.position.y) for m in minerals], dtype=np.float64).reshape(-1, 2)
+        self.geyser_base = self._nearest_base(self.geyser_xy)
+        self.mineral_base = self._nearest_base(self.mineral_xy)
+        self.taken = np.zeros(len(geysers), dtype=bool)
+        self.depleted = np.zeros(len(geysers), dtype=bool)
+
+        self._geysers_of = [[] for _ in range(len(self.bases))]
+        for i, b in enumerate(self.geyser_base.tolist()):
+            self._geysers_of[b].append(i)
+        self._by_xy = {_xy_key(g.position): i for i, g in enumerate(geysers)}
+        self._base_cache.clear()
+
+        self.ready = True
+        self._refresh()
+        return True
+
+    # ---------------------------
+    # Refresh (rare)
+    # ---------------------------
+    def sync(self, structures_changed: bool) -> None:
+        if not self.ready:
+            return
+        if structures_changed or game_loop(self.bot) >= self._next_refresh:
+            self._refresh()
+
+    def _refresh(self) -> None:
+        self._next_refresh = game_loop(self.bot) + self.refresh_every
+        self.taken[:] = False
+
+        for src, ours in (("structures", True), ("enemy_structures", False)):
+            for s in getattr(self.bot, src, None) or []:
+                if getattr(s, "type_id", None) not in GAS_BUILDINGS:
+                    continue
+                i = self._by_xy.get(_xy_key(s.position))
+                if i is None:
+                    continue
+                self.taken[i] = True
+                if ours and getattr(s, "is_ready", False) and getattr(s, "vespene_contents", 1) == 0:
+                    self.depleted[i] = True
+
+        # keep geyser objects current (build commands target them by tag)
+        for g in getattr(self.bot, "vespene_geyser", None) or []:
+            i = self._by_xy.get(_xy_key(g.position))
+            if i is not None:
+                self._geyser_units[i] = g
+
+    # ---------------------------
+    # Queries
+    # ---------------------------
+    def base_of(self, pos: Point2) -> Optional[int]:
+        if len(self.bases) == 0:
+            return None
+        key = _xy_key(pos)
+        b = self._base_cache.get(key)
+        if b is None:
+            b = int(self._nearest_base(np.array([[pos.x, pos.y]], dtype=np.float64))[0])
+            self._base_cache[key] = b
+        return b
+
+    def geysers_at(self, base: int) -> List[int]:
+        return self._geysers_of[base] if 0 <= base < len(self._geysers_of) else []
+
+    def minerals_at(self, base: int) -> np.ndarray:
+        return self.mineral_xy[self.mineral_base == base]
+
+    def free_geyser(self, near: Point2, max_dist: float = 15.0) -> Optional[int]:
+        """Index of the closest untaken, non-depleted geyser of the base at `near`."""
+        if not self.ready:
+            return None
+        b = self.base_of(near)
+        if b is None:
+            return None
+        best, best_d = None, max_dist
+        for i in self.geysers_at(b):
+            if self.taken[i] or self.depleted[i]:
+                continue
+            x, y = self.geyser_xy[i]
+            d = ((x - near.x) ** 2 + (y - near.y) ** 2) ** 0.5
+            if d <= best_d:
+                best, best_d = i, d
+        return best
+
+    def geyser_pos(self, i: int) -> Point2:
+        x, y = self.geyser_xy[i]
+        return Point2((float(x), float(y)))
+
+    def geyser_unit(self, i: int) -> Any:
+        return self._geyser_units[i]
@@ -0,0 +1,238 @@
+#scout.py
+from __future__ import annotations
+
+import math
+from typing import Any, Dict, List, Optional
+
+from sc2.ids.unit_typeid import UnitTypeId as U
+from sc2.position import Point2
+
+from .api import BotAPI
+from .memory import EnemyMemory
+from .state import BotState
+from .utils import game_loop
+
+
+class Scout:
+    """
+    Reconhecimento que alimenta a EnemyMemory.
+    - SCV: uma viagem (a partir de scv_at) pelas bases iniciais inimigas até
+      achar a main, uma volta em torno dela e de volta à mineração; fica em
+      `reserved` (Builder/WorkerAllocator não o pegam no caminho)
+    - marine: a cada marine_every, um marine livre visita a base (perto da
+      main inimiga) vista há mais tempo e volta para casa
+    - quem está em reconhecimento fica em BotState.scouting (Drop ignora)
+    """
+
+    def __init__(
+        self,
+        bot: Any,
+        state: BotState,
+        memory: EnemyMemory,
+        resources: Any = None,
+        reserved: Optional[set] = None,
+        debug: bool = True,
+        api: Optional[BotAPI] = None,
+    ):
+        self.bot = bot
+        self.api = api or BotAPI(bot)
+        self.world = self.api.world
+        self.state = state
+        self.memory = memory
+        self.resources = resources
+        self.reserved: set = reserved if reserved is not None else set()
+        self.debug = debug
+
+        # Tunables
+        self.scv_at = 1344  # loops (~60s)
+        self.scv_timeout = 2016  # loops (~90s) out before heading home anyway
+        self.circle_radius = 9.0
+        self.marine_every = 1344
+        self.marine_timeout = 1344
+        self.arrive_eps = 4.0
+        self.enemy_bases = 4  # marine only checks the bases this close (in order) to the enemy main
+
+        self._scv: Optional[int] = None
+        self._scv_done = False
+        self._scv_sent = 0
+        self._scv_route: List[Point2] = []
+        self._scv_goal: Optional[Point2] = None
+        self._circled = False
+        self._marine: Optional[int] = None
+        self._marine_goal: Optional[Point2] = None
+        self._marine_sent = 0
+        self._next_marine = 0
+        self._checked: Dict[Point2, int] = {}  # base -> loop a marine last got there
+
+    def _log(self, payload: dict) -> None:
+        dbg = getattr(self.bot, "dbg", None)
+        if dbg is None or not self.debug:
+            return
+        try:
+            snap0 = self.api.snapshot()
+            payload.setdefault("t", snap0.t)
+            payload.setdefault("it", snap0.it)
+            dbg.log_action(payload)
+        except Exception:
+            return
+
+    def _release(self, tag: Optional[int]) -> None:
+        if tag is None:
+            return
+        self.state.scouting.discard(tag)
+        self.reserved.discard(tag)
+
+    # ---------------------------
+    # SCV
+    # ---------------------------
+    def _circle(self, center: Point2, start: Point2) -> List[Point2]:
+        """Points around center, starting on the side we come from."""
+        a0 = math.atan2(start.y - center.y, start.x - center.x)
+        r = self.circle_radius
+        return [
+            Point2((center.x + r * math.cos(a0 + k * math.pi / 3), center.y + r * math.sin(a0 + k * math.pi / 3)))
+            for k in range(7)
+        ]
+
+    def _pick_scv(self, workers: List[Any], target: Point2) -> Optional[Any]:
+        """Like Builder._pick_worker: a gathering SCV with empty hands, else an idle one; never one mid-build."""
+        mining = [
+            w for w in workers
+            if getattr(w, "is_gathering", False) and not getattr(w, "is_carrying_resource", False)
+        ]
+        for pool in (mining, self.api.idle(workers)):
+            if pool:
+                return self.api.closest_to(pool, target)
+        return None
+
+    async def _scv_home(self, w: Any, why: str) -> None:
+        minerals = getattr(self.bot, "mineral_field", None)
+        home = getattr(self.bot, "start_location", None)
+        try:
+            if minerals and home is not None:
+                await self.api.do(w.gather(self.api.closest_to(minerals, home)))
+            elif home is not None:
+                await self.api.do(w.move(home))
+        except Exception:
+            pass
+        self._log({"event": "scout_home", "unit": "SCV", "why": why})
+        self._release(self._scv)
+        self._scv = None
+        self._scv_done = True
+
+    async def _step_scv(self, now: int) -> None:
+        if self._scv_done:
+            return
+        if self._scv is None:
+            if now < self.scv_at:
+                return
+            starts = list(getattr(self.bot, "enemy_start_locations", None) or [])
+            workers = [w for w in (getattr(self.bot, "workers", None) or []) if w.tag not in self.reserved]
+            if not starts or not workers:
+                self._scv_done = not starts
+                return
+            home = getattr(self.bot, "start_location", None) or workers[0].position
+            route = sorted(starts, key=home.distance_to)
+            w = self._pick_scv(workers, route[0])
+            if w is None:
+                return  # everyone busy building / returning cargo: try next frame
+            self._scv_route = route
+            self._scv = w.tag
+            self._scv_sent = now
+            self.reserved.add(w.tag)
+            self.state.scouting.add(w.tag)
+            self._log({"event": "scout_start", "unit": "SCV", "targets": len(self._scv_route)})
+
+        w = self.world.tag_map(U.SCV).get(self._scv)
+        if w is None:
+            self._log({"event": "scout_lost", "unit": "SCV"})
+            self._release(self._scv)
+            self._scv = None
+            self._scv_done = True
+            return
+        hp, hp_max = getattr(w, "health", 1.0) or 0.0, getattr(w, "health_max", 1.0) or 1.0
+        if now - self._scv_sent > self.scv_timeout or hp < 0.5 * hp_max:
+            await self._scv_home(w, "timeout" if hp >= 0.5 * hp_max else "hurt")
+            return
+
+        main = self.memory.enemy_main()
+        if main is not None and not self._circled:
+            # found it (or it's the only one): swap the remaining starts for a lap around it
+            self._circled = True
+            self._scv_route = [main] + self._circle(main, w.position)
+            self._log({"event": "scout_main", "pos": [main.x, main.y]})
+        while self._scv_route and w.distance_to(self._scv_route[0]) <= self.arrive_eps:
+            self._scv_route.pop(0)
+        if not self._scv_route:
+            await self._scv_home(w, "done")
+            return
+        goal = self._scv_route[0]
+        if goal != self._scv_goal or getattr(w, "is_idle", False):
+            self._scv_goal = goal
+            await self.api.do(w.move(goal))
+
+    # ---------------------------
+    # Marine
+    # ---------------------------
+    def _marine_target(self) -> Optional[Point2]:
+        """The base near the enemy main that nobody has looked at for the longest (not the main itself)."""
+        main = self.memory.enemy_main()
+        res = self.resources
+        if main is None or res is None or not getattr(res, "ready", False):
+            return None
+        home = getattr(self.bot, "start_location", None)
+        bases = [Point2((float(x), float(y))) for x, y in res.bases]
+        bases = [b for b in bases if b.distance_to(main) > 10 and (home is None or b.distance_to(home) > 10)]
+        bases.sort(key=main.distance_to)
+        bases = bases[: self.enemy_bases]
+        if not bases:
+            return None
+        return min(bases, key=lambda b: self._checked.get(b, -1))
+
+    async def _step_marine(self, now: int) -> None:
+        if self._marine is None:
+            if now < self._next_marine:
+                return
+            self._next_marine = now + self.marine_every
+            goal = self._marine_target()
+            if goal is None:
+                return
+            busy = self.state.scouting | self.state.defending
+            for d in self.state.drops.values():
+                busy |= d.marine_tags
+            free = [m for m in self.world.ready(U.MARINE) if m.tag not in busy and getattr(m, "is_idle", False)]
+            if not free:
+                return
+            m = self.api.closest_to(free, goal)
+            if m is None:
+                return
+            self._marine, self._marine_goal, self._marine_sent = m.tag, goal, now
+            self.state.scouting.add(m.tag)
+            await self.api.do(m.move(goal))
+            self._log({"event": "scout_start", "unit": "MARINE", "pos": [goal.x, goal.y]})
+            return
+
+        m = self.world.tag_map(U.MARINE).get(self._marine)
+        goal = self._marine_goal
+        if m is None or goal is None:
+            self._log({"event": "scout_lost", "unit": "MARINE"})
+            if goal is not None:
+                self._checked[goal] = now  # it got far enough to die there
+        elif m.distance_to(goal) <= self.arrive_eps or now - self._marine_sent > self.marine_timeout:
+            self._checked[goal] = now
+            home = getattr(self.bot, "start_location", None)
+            if home is not None:
+                await self.api.do(m.move(home))
+            self._log({"event": "scout_home", "unit": "MARINE", "pos": [goal.x, goal.y]})
+        else:
+            if getattr(m, "is_idle", False):
+                await self.api.do(m.move(goal))
+            return
+        self._release(self._marine)
+        self._marine = None
+        self._marine_goal = None
+
+    async def step(self) -> None:
+        now = game_loop(self.bot)
+        await self._step_scv(now)
+        await self._step_marine(now)
@@ -3,17 +3,28 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Set
 from sc2.position import Point2
 
 
 @dataclass
 class DropPlan:
+    """One drop squad (bot/drop.py): its members by tag and where it's going."""
+
+    squad_id: int = 0
     in_progress: bool = False
     loaded: bool = False
+    staged: bool = False  # reached staging_pos once
     dropped: bool = False
     target_pos: Optional[Point2] = None
     staging_pos: Optional[Point2] = None
+    target_base: Optional[Point2] = None
+    medivac_tag: Optional[int] = None
+    marine_tags: Set[int] = field(default_factory=set)
+    boarding: Set[int] = field(default_factory=set)  # members a LOAD was queued for
+    started_loop: int = 0
+    waypoints: List[Point2] = field(default_factory=list)  # medivac route on the threat map (goal last)
+    path_loop: int = 0
 
 
 @dataclass
@@ -29,14 +40,26 @@ class BuildPlan:
 class PlacementPlan:
     ready: bool = False
     wall_depots: List[Point2] = field(default_factory=list)
+    depot_slots: List[Point2] = field(default_factory=list)
     rax_slots: List[Point2] = field(default_factory=list)
     factory_slots: List[Point2] = field(default_factory=list)
     starport_slots: List[Point2] = field(default_factory=list)
 
+    def discard(self, pos: Point2) -> None:
+        """Remove a slot (used or found blocked) from whichever list holds it."""
+        for slots in (self.wall_depots, self.depot_slots, self.rax_slots, self.factory_slots, self.starport_slots):
+            if pos in slots:
+                slots.remove(pos)
+
 
 @dataclass
 class BotState:
-    drop: DropPlan = field(default_factory=DropPlan)
+    # active drop squads by squad id
+    drops: Dict[int, DropPlan] = field(default_factory=dict)
+    # units out scouting (bot/scout.py): squads and the allocator leave them alone
+    scouting: Set[int] = field(default_factory=set)
+    # units pulled to defend a base (bot/defense.py)
+    defending: Set[int] = field(default_factory=set)
     build: BuildPlan = field(default_factory=BuildPlan)
     place: PlacementPlan = field(default_factory=PlacementPlan)
 
@@ -2,15 +2,38 @@ from __future__ import annotations
 
 import json
 import os
-from dataclasses import dataclass
+import threading
+import time
+from dataclasses import dataclass, replace
 from pathlib import Path
 from typing import Any, Dict, Optional
 
+from .conditions import Slots
+from .plandag import PlanDAG, compile_plan
+from .strategy_check import check_strategy
+
+# bot/strats first, then the repo's top-level strats/
+STRAT_DIRS = (Path(__file__).parent / "strats", Path(__file__).resolve().parent.parent / "strats")
+
+
+class StrategyError(ValueError):
+    """A strategy file that can't be used as is (bad JSON, schema, unit names, prerequisites)."""
+
+    def __init__(self, path: Path | str, problems: list[str]):
+        self.path = str(path)
+        self.problems = problems
+        super().__init__(f"{self.path}: " + "; ".join(problems))
+
 
 @dataclass(frozen=True)
 class EconomyCfg:
     scv_target: int = 20
     depot_trigger_supply_left: int = 4
+    # expansion (bot/expansion.py)
+    max_bases: int = 3
+    max_workers: int = 66
+    expand_income: int = 600  # minerals/min measured before taking the next base
+    expand_saturation: float = 0.8  # mineral workers / ideal on the bases we own
 
 
 @dataclass(frozen=True)
@@ -32,6 +55,7 @@ class DropCfg:
     load_count: int = 8
     move_eps: float = 3.0
     ground_radius: float = 12.0
+    max_squads: int = 3  # simultaneous drop squads (bot/drop.py)
 
 
 @dataclass(frozen=True)
@@ -44,6 +68,12 @@ class StrategyConfig:
     # raw plan lists (optional)
     build_plan: list[Dict[str, Any]] | None = None
     production_plan: list[Dict[str, Any]] | None = None
+    # compiled once here (bot/plandag.py); PlanExecutor compiles on its own if missing
+    build_dag: PlanDAG | None = None
+    production_dag: PlanDAG | None = None
+    # file it came from (None: built-in defaults) and its mtime when parsed
+    path: str | None = None
+    mtime_ns: int = 0
 
 
 def _get(d: Dict[str, Any], key: str, default: Any) -> Any:
@@ -79,32 +109,50 @@ def _as_bool(x: Any, *, default: bool) -> bool:
     return default
 
 
-def load_strategy(strategy_name: Optional[str], *, base_dir: str | Path | None = None) -> StrategyConfig:
-    """
-    Load strats/<name>.json. Fallback to default.json. If none found, return defaults.
-    """
-    if base_dir is None:
-        base = Path(__file__).parent / "strats"
-    else:
-        base = Path(base_dir)
+def _resolve(strategy_name: Optional[str], base_dir: str | Path | None) -> tuple[str, Optional[Path]]:
+    bases = STRAT_DIRS if base_dir is None else (Path(base_dir),)
     name = (strategy_name or os.getenv("SC2_STRAT") or "default").strip()
-    candidates = [base / f"{name}.json", base / "default.json"]
-
-    path = next((p for p in candidates if p.exists()), None)
+    path = next((b / f"{name}.json" for b in bases if (b / f"{name}.json").exists()), None)
+    if path is None and name != "default":
+        # asked for by name: a typo must not silently play default.json
+        raise StrategyError(f"{name}.json", [f"not found in {[str(b) for b in bases]}"])
     if path is None:
-        return StrategyConfig(name=name)
+        path = next((b / "default.json" for b in bases if (b / "default.json").exists()), None)
+    return name, path
+
 
-    data = json.loads(path.read_text(encoding="utf-8"))
+def _parse(path: Path, name: str, mtime_ns: int) -> StrategyConfig:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except ValueError as e:
+        raise StrategyError(path, [f"invalid JSON: {e}"]) from None
+    if not isinstance(data, dict):
+        raise StrategyError(path, [f"top level must be an object, got {type(data).__name__}"])
     econ = data.get("economy", {}) or {}
     tech = data.get("tech", {}) or {}
     prod = data.get("production", {}) or {}
+    # "production" is also the key of the production plan list (default.json): no knobs then
+    if not isinstance(prod, dict):
+        prod = {}
     drop = data.get("drop", {}) or {}
+    build_plan = data.get("build", None)
+    prod_plan = data.get("production", None)
+    if not isinstance(build_plan, list):
+        build_plan = None
+    if not isinstance(prod_plan, list):
+        prod_plan = None
+    # both plans read one value list: each input is sampled once per frame
+    slots = Slots()
 
     cfg = StrategyConfig(
         name=str(_get(data, "name", name)),
         economy=EconomyCfg(
             scv_target=_as_int(_get(econ, "scv_target", 20), default=20),
             depot_trigger_supply_left=_as_int(_get(econ, "depot_trigger_supply_left", 4), default=4),
+            max_bases=_as_int(_get(econ, "max_bases", 3), default=3),
+            max_workers=_as_int(_get(econ, "max_workers", 66), default=66),
+            expand_income=_as_int(_get(econ, "expand_income", 600), default=600),
+            expand_saturation=_as_float(_get(econ, "expand_saturation", 0.8), default=0.8),
         ),
         tech=TechCfg(
             need_factory=_as_bool(_get(tech, "need_factory", True), default=True),
@@ -120,18 +168,164 @@ def load_strategy(strategy_name: Optional[str], *, base_dir: str | Path | None =
             load_count=_as_int(_get(drop, "load_count", 8), default=8),
             move_eps=_as_float(_get(drop, "move_eps", 3.0), default=3.0),
             ground_radius=_as_float(_get(drop, "ground_radius", 12.0), default=12.0),
+            max_squads=_as_int(_get(drop, "max_squads", 3), default=3),
         ),
-        build_plan=data.get("build", None),
-        production_plan=data.get("production", None),
+        build_plan=build_plan,
+        production_plan=prod_plan,
+        build_dag=compile_plan(build_plan, "build", slots) if build_plan else None,
+        production_dag=compile_plan(prod_plan, "production", slots) if prod_plan else None,
+        path=str(path),
+        mtime_ns=mtime_ns,
     )
+    # fail fast: schema, unit names, conditions, tech prerequisites (timings are the CLI's job)
+    report = check_strategy(data, cfg.build_dag, cfg.production_dag, timings=False)
+    if report.errors:
+        raise StrategyError(path, report.errors)
+    for w in report.warnings:
+        print(f"[STRAT] {path.name}: {w}")
 
     # basic sanity: don't allow extremely low scv target
     if cfg.economy.scv_target < 12:
-        cfg = StrategyConfig(
-            name=cfg.name,
-            economy=EconomyCfg(scv_target=12, depot_trigger_supply_left=cfg.economy.depot_trigger_supply_left),
-            tech=cfg.tech,
-            production=cfg.production,
-            drop=cfg.drop,
-        )
+        cfg = replace(cfg, economy=replace(cfg.economy, scv_target=12))
     return cfg
+
+
+class StrategyRegistry:
+    """
+    Cache de StrategyConfig por arquivo: só relê/compila o JSON quando o
+    mtime (ou o tamanho) muda. changed() é um stat(), barato o bastante
+    para ser chamado periodicamente durante o jogo (hot reload).
+    """
+
+    def __init__(self):
+        self._cache: Dict[str, tuple[int, int, StrategyConfig]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, strategy_name: Optional[str], *, base_dir: str | Path | None = None) -> StrategyConfig:
+        name, path = _resolve(strategy_name, base_dir)
+        if path is None:
+            return StrategyConfig(name=name)
+        return self._load(path, name)
+
+    def _load(self, path: Path, name: str) -> StrategyConfig:
+        st = path.stat()
+        key = str(path.resolve())
+        with self._lock:
+            hit = self._cache.get(key)
+            if hit is not None and hit[0] == st.st_mtime_ns and hit[1] == st.st_size:
+                return hit[2]
+        cfg = _parse(path, name, st.st_mtime_ns)
+        with self._lock:
+            self._cache[key] = (st.st_mtime_ns, st.st_size, cfg)
+        return cfg
+
+    def changed(self, cfg: StrategyConfig) -> Optional[StrategyConfig]:
+        """A newer config when cfg's file was modified since it was parsed, else None."""
+        if not cfg.path:
+            return None
+        path = Path(cfg.path)
+        try:
+            st = path.stat()
+        except OSError:
+            return None  # deleted / mid-save: keep what we have
+        if st.st_mtime_ns == cfg.mtime_ns:
+            return None
+        new = self._load(path, path.stem)
+        return new if new is not cfg else None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+
+REGISTRY = StrategyRegistry()
+
+
+def load_strategy(strategy_name: Optional[str], *, base_dir: str | Path | None = None) -> StrategyConfig:
+    """
+    Load <name>.json from bot/strats or strats/. No name: default.json, or the
+    built-in defaults if there is none. Raises StrategyError for a missing
+    named strategy or one that fails check_strategy.
+    Parsed configs are cached by path + mtime (REGISTRY).
+    """
+    return REGISTRY.get(strategy_name, base_dir=base_dir)
+
+
+class StrategyWatcher:
+    """
+    Hot reload da estratégia.
+    - uma thread daemon faz stat() do arquivo a cada `interval` s e, se mudou,
+      já deixa o novo StrategyConfig parseado/compilado em `_pending`
+    - o jogo só pega o resultado em poll(), chamado na fronteira entre frames:
+      nada muda no meio de um step; `_current`/`_pending` ficam sob um Lock
+      (a thread e o poll() trocam os dois)
+    - JSON quebrado / StrategyError mantém a config atual; o erro sai uma vez
+      por mtime em poll_error() e o arquivo só é reparseado quando o mtime muda
+    """
+
+    def __init__(self, cfg: StrategyConfig, registry: StrategyRegistry | None = None, interval: float = 1.0):
+        self.registry = registry or REGISTRY
+        self.interval = interval
+        self._current = cfg
+        self._pending: Optional[StrategyConfig] = None
+        self._lock = threading.Lock()  # guards _current / _pending / _error
+        self._error: Optional[str] = None  # rejected reload not reported yet
+        self._failed_mtime: Optional[int] = None  # mtime_ns of the last rejected file
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._next_check = 0.0
+        self.last_error: Optional[str] = None
+
+    def start(self) -> "StrategyWatcher":
+        if self._thread is None and self._current.path:
+            self._thread = threading.Thread(target=self._run, name="StrategyWatcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _check(self) -> None:
+        with self._lock:
+            cur = self._current
+        try:
+            mtime = os.stat(cur.path).st_mtime_ns if cur.path else None
+        except OSError:
+            return  # deleted / mid-save: keep what we have
+        if mtime is None or mtime == self._failed_mtime:
+            return  # same broken file as last time: wait for the next save
+        try:
+            new = self.registry.changed(cur)  # parse/compile outside the lock
+        except Exception as e:  # bad JSON while the file is being edited, StrategyError
+            self.last_error = f"{type(e).__name__}: {e}"
+            self._failed_mtime = mtime
+            with self._lock:
+                self._error = self.last_error
+            return
+        if new is not None:
+            self.last_error = None
+            self._failed_mtime = None
+            with self._lock:
+                self._current = new
+                self._pending = new
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._check()
+
+    def poll(self) -> Optional[StrategyConfig]:
+        """New config to apply now (once), or None. Without the thread it checks inline, throttled."""
+        if self._thread is None:
+            now = time.monotonic()
+            if now >= self._next_check:
+                self._next_check = now + self.interval
+                self._check()
+        with self._lock:
+            cfg, self._pending = self._pending, None
+        return cfg
+
+    def poll_error(self) -> Optional[str]:
+        """Why the last edit was rejected (once per failing save), or None."""
+        with self._lock:
+            err, self._error = self._error, None
+        return err
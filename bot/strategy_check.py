@@ -0,0 +1,307 @@
+#strategy_check.py
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from sc2.ids.unit_typeid import UnitTypeId as U
+
+from .conditions import LOOPS_PER_SEC
+from .economy import GAS_PER_WORKER_S, MINERALS_PER_WORKER_S
+from .plandag import PlanDAG, PlanStep, compile_plan
+
+try:
+    from sc2.dicts.unit_train_build_abilities import TRAIN_INFO
+except Exception:  # older forks
+    TRAIN_INFO = {}
+
+# knob schema: section -> key -> type ("int" | "float" | "bool" | "str")
+KNOBS: Dict[str, Dict[str, str]] = {
+    "economy": {
+        "scv_target": "int",
+        "depot_trigger_supply_left": "int",
+        "max_bases": "int",
+        "max_workers": "int",
+        "expand_income": "int",
+        "expand_saturation": "float",
+    },
+    "tech": {"need_factory": "bool", "need_starport": "bool"},
+    "production": {"marine_cap": "int", "marines_for_drop": "int"},
+    "drop": {
+        "enabled": "bool",
+        "min_marines": "int",
+        "load_count": "int",
+        "move_eps": "float",
+        "ground_radius": "float",
+        "max_squads": "int",
+    },
+}
+TOP_LEVEL = ("name", "economy", "tech", "production", "drop", "build")
+
+# (minerals, vespene, build seconds) for the timing estimate
+UNIT_DATA: Dict[U, Tuple[int, int, float]] = {
+    U.SCV: (50, 0, 12),
+    U.MARINE: (50, 0, 18),
+    U.MARAUDER: (100, 25, 21),
+    U.REAPER: (50, 50, 32),
+    U.HELLION: (100, 0, 21),
+    U.WIDOWMINE: (75, 25, 21),
+    U.SIEGETANK: (150, 125, 32),
+    U.CYCLONE: (150, 100, 32),
+    U.MEDIVAC: (100, 100, 30),
+    U.VIKINGFIGHTER: (150, 75, 30),
+    U.LIBERATOR: (150, 150, 43),
+    U.BANSHEE: (150, 100, 43),
+    U.RAVEN: (100, 200, 43),
+    U.SUPPLYDEPOT: (100, 0, 21),
+    U.BARRACKS: (150, 0, 46),
+    U.REFINERY: (75, 0, 21),
+    U.FACTORY: (150, 100, 43),
+    U.STARPORT: (150, 100, 36),
+    U.COMMANDCENTER: (400, 0, 71),
+    U.ENGINEERINGBAY: (125, 0, 25),
+    U.BUNKER: (100, 0, 29),
+    U.MISSILETURRET: (100, 0, 18),
+    U.ARMORY: (150, 100, 46),
+    U.GHOSTACADEMY: (150, 50, 29),
+    U.FUSIONCORE: (150, 150, 46),
+    U.BARRACKSTECHLAB: (50, 25, 18),
+    U.BARRACKSREACTOR: (50, 50, 36),
+    U.FACTORYTECHLAB: (50, 25, 18),
+    U.FACTORYREACTOR: (50, 50, 36),
+    U.STARPORTTECHLAB: (50, 25, 18),
+    U.STARPORTREACTOR: (50, 50, 36),
+}
+
+# what the game starts with, and what the orchestrator macros make regardless of the plans
+START_UNITS = (U.COMMANDCENTER, U.SCV)
+MACRO_UNITS = (U.SUPPLYDEPOT, U.BARRACKS, U.REFINERY, U.MARINE, U.MEDIVAC)
+
+
+def requirements(unit_type: U) -> List[U]:
+    """Structures that must be ready before unit_type can start (producer, tech building, techlab)."""
+    for producer, table in TRAIN_INFO.items():
+        info = table.get(unit_type)
+        if info is None:
+            continue
+        out = [producer]
+        req = info.get("required_building")
+        if req is not None:
+            out.append(req)
+        if info.get("requires_techlab"):
+            lab = getattr(U, f"{producer.name}TECHLAB", None)
+            if lab is not None:
+                out.append(lab)
+        return out
+    return []
+
+
+@dataclass
+class StepTiming:
+    plan: str
+    index: int
+    unit: U
+    start_s: Optional[float]  # None: not feasible within the horizon
+    done_s: Optional[float]
+
+
+@dataclass
+class Report:
+    errors: List[str] = field(default_factory=list)
+    warnings: List[str] = field(default_factory=list)
+    timings: List[StepTiming] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+
+# -------------------------
+# Schema
+# -------------------------
+def _type_ok(value: Any, kind: str) -> bool:
+    if kind == "bool":
+        return isinstance(value, bool) or (isinstance(value, str) and value.strip().lower() in
+                                           {"1", "true", "yes", "y", "on", "0", "false", "no", "n", "off"})
+    if kind == "str":
+        return isinstance(value, str)
+    if isinstance(value, bool):
+        return False
+    if kind == "int":
+        return isinstance(value, int) or (isinstance(value, float) and value.is_integer())
+    return isinstance(value, (int, float))
+
+
+def _check_schema(data: Any, rep: Report) -> None:
+    if not isinstance(data, dict):
+        rep.errors.append(f"top level must be an object, got {type(data).__name__}")
+        return
+    unknown = [k for k in data if k not in TOP_LEVEL]
+    if unknown:
+        rep.errors.append(f"unknown top-level keys {unknown} (expected some of {list(TOP_LEVEL)})")
+    if "name" in data and not isinstance(data["name"], str):
+        rep.errors.append("name must be a string")
+    for section, schema in KNOBS.items():
+        sec = data.get(section)
+        if sec is None or (section == "production" and isinstance(sec, list)):
+            continue
+        if not isinstance(sec, dict):
+            rep.errors.append(f"{section} must be an object")
+            continue
+        for k, v in sec.items():
+            kind = schema.get(k)
+            if kind is None:
+                rep.warnings.append(f"{section}.{k}: unknown knob (ignored)")
+            elif v is not None and not _type_ok(v, kind):
+                rep.errors.append(f"{section}.{k}: expected {kind}, got {v!r}")
+    if "build" in data and not isinstance(data["build"], list):
+        rep.errors.append("build must be a list of steps")
+    if "production" in data and not isinstance(data["production"], (dict, list)):
+        rep.errors.append("production must be an object (knobs) or a list of steps")
+
+
+# -------------------------
+# Prerequisites
+# -------------------------
+def _available(data: Dict[str, Any], dags: List[PlanDAG]) -> Dict[U, str]:
+    tech = data.get("tech") if isinstance(data.get("tech"), dict) else {}
+    src: Dict[U, str] = {u: "start" for u in START_UNITS}
+    src.update({u: "macro" for u in MACRO_UNITS})
+    if tech.get("need_factory", True) not in (False, "false", "no", "0", "off"):
+        src.setdefault(U.FACTORY, "macro")
+    if tech.get("need_starport", True) not in (False, "false", "no", "0", "off"):
+        src.setdefault(U.STARPORT, "macro")
+    for dag in dags:
+        for s in dag.steps:
+            if s.unit is not None:
+                src.setdefault(s.unit, f"{dag.kind}[{s.index}]")
+    return src
+
+
+def _check_prereqs(data: Dict[str, Any], dags: List[PlanDAG], rep: Report) -> None:
+    have = _available(data, dags)
+    for dag in dags:
+        for s in dag.steps:
+            if s.unit is None:
+                continue
+            reqs = [s.parent] if s.kind == "addon" else requirements(s.unit)
+            for r in reqs:
+                if r not in have:
+                    rep.errors.append(f"{dag.kind}[{s.index}]: {s.unit.name} needs {r.name}, which nothing builds")
+
+
+# -------------------------
+# Timing estimate
+# -------------------------
+class _Sim:
+    """
+    Estimativa grosseira do tempo mais cedo de cada passo: 12 SCVs, SCVs
+    contínuos até scv_target, renda por worker do modelo da Economy, gás só
+    depois da refinaria (3 workers). Os planos rodam juntos como no
+    PlanExecutor: a cada segundo todo passo pendente cujos pré-requisitos já
+    estão prontos, cujos produtores (PlanStep.deps) já começaram, com time_gte
+    e dinheiro, começa (build antes de production, ordem do plano no empate);
+    um passo não espera o relógio dos anteriores.
+    """
+
+    HORIZON_S = 900
+
+    def __init__(self, scv_target: int):
+        self.scv_target = scv_target
+        self.t = 0.0
+        self.m, self.g = 50.0, 0.0
+        self.scvs = 12
+        self.gas_workers = 0
+        self.scv_done: Optional[float] = None  # one CC: one SCV in production at a time
+        self.done: Dict[U, List[float]] = {u: [0.0] for u in START_UNITS}
+        self._gas_at: List[float] = []
+
+    def _tick(self) -> None:
+        for t in [x for x in self._gas_at if x <= self.t]:
+            self._gas_at.remove(t)
+            self.gas_workers += 3
+        if self.scv_done is not None and self.scv_done <= self.t:
+            self.scvs += 1
+            self.scv_done = None
+        if self.scv_done is None and self.scvs < self.scv_target and self.m >= 50:
+            self.m -= 50
+            self.scv_done = self.t + UNIT_DATA[U.SCV][2]
+        self.m += max(0, self.scvs - self.gas_workers) * MINERALS_PER_WORKER_S
+        self.g += self.gas_workers * GAS_PER_WORKER_S
+        self.t += 1.0
+
+    def _ready(self, reqs: List[U]) -> bool:
+        return all(any(d <= self.t for d in self.done.get(r, ())) for r in reqs)
+
+    def _try(self, step: PlanStep, min_t: float) -> Optional[float]:
+        """Start the step now if it can; returns when it's done."""
+        m, g, secs = UNIT_DATA[step.unit]
+        reqs = [step.parent] if step.kind == "addon" else requirements(step.unit)
+        if self.t < min_t or self.m < m or self.g < g or not self._ready(reqs):
+            return None
+        self.m -= m
+        self.g -= g
+        done = self.t + secs
+        self.done.setdefault(step.unit, []).append(done)
+        if step.unit == U.REFINERY:
+            self._gas_at.append(done)
+        return done
+
+    def run(self, dags: List[PlanDAG]) -> Dict[Tuple[str, int], Tuple[float, float]]:
+        """(plan, step index) -> (start, done) for every step placed before the horizon."""
+        placed: Dict[Tuple[str, int], Tuple[float, float]] = {}
+        pending = [(dag.kind, s) for dag in dags for s in dag.steps if s.kind != "none" and s.unit in UNIT_DATA]
+        waits = {(kind, s.index) for kind, s in pending}  # producers we can't time don't hold anyone back
+        while pending and self.t < self.HORIZON_S:
+            for item in list(pending):
+                kind, s = item
+                if any((kind, d) in waits and (kind, d) not in placed for d in s.deps):
+                    continue
+                done = self._try(s, s.cond.min_loop / LOOPS_PER_SEC)
+                if done is not None:
+                    placed[(kind, s.index)] = (self.t, done)
+                    pending.remove(item)
+            self._tick()
+        return placed
+
+
+def _estimate(data: Dict[str, Any], dags: List[PlanDAG], rep: Report) -> None:
+    econ = data.get("economy") if isinstance(data.get("economy"), dict) else {}
+    try:
+        target = max(12, int(econ.get("scv_target", 20)))
+    except (TypeError, ValueError):
+        target = 20
+    placed = _Sim(target).run(dags)
+    for dag in dags:
+        for s in dag.steps:
+            if s.unit is None or s.kind == "none":
+                continue
+            start, done = placed.get((dag.kind, s.index), (None, None))
+            rep.timings.append(StepTiming(dag.kind, s.index, s.unit, start, done))
+            if start is None:
+                rep.warnings.append(f"{dag.kind}[{s.index}]: {s.unit.name} not reachable in {_Sim.HORIZON_S}s (estimate)")
+
+
+def check_strategy(
+    data: Any,
+    build_dag: Optional[PlanDAG] = None,
+    production_dag: Optional[PlanDAG] = None,
+    *,
+    timings: bool = True,
+) -> Report:
+    """Schema, unit names / conditions (plan compile), tech prerequisites and a timing estimate."""
+    rep = Report()
+    _check_schema(data, rep)
+    if not isinstance(data, dict):
+        return rep
+    if build_dag is None and isinstance(data.get("build"), list):
+        build_dag = compile_plan(data["build"], "build")
+    if production_dag is None and isinstance(data.get("production"), list):
+        production_dag = compile_plan(data["production"], "production")
+    dags = [d for d in (build_dag, production_dag) if d is not None]
+    for d in dags:
+        rep.errors.extend(d.errors)
+    _check_prereqs(data, dags, rep)
+    if timings and not rep.errors:
+        _estimate(data, dags, rep)
+    return rep
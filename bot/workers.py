@@ -0,0 +1,225 @@
+#workers.py
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from sc2.ids.unit_typeid import UnitTypeId as U
+
+from .api import BotAPI
+from .utils import game_loop
+
+TOWNHALLS = (U.COMMANDCENTER, U.ORBITALCOMMAND, U.PLANETARYFORTRESS)
+
+MINERAL_SLOTS = 2
+MINERAL_OVERSAT = 3  # only used once every mineral field already has 2
+GAS_SLOTS = 3
+
+
+class WorkerAllocator:
+    """
+    Substitui bot.distribute_workers().
+    - só roda quando muda o conjunto de workers/townhalls/refinarias, ou a
+      cada `every` loops
+    - mantém quem já está num recurso com vaga; o resto (idle, excedente,
+      recurso sumiu) é atribuído por matriz de distâncias numpy (greedy por
+      menor custo, respeitando a capacidade de cada recurso)
+    - só emite ordens para quem mudou de recurso (delta), via BotAPI
+    """
+
+    def __init__(
+        self,
+        bot: Any,
+        api: Optional[BotAPI] = None,
+        every: int = 112,
+        min_mineral_workers: int = 8,
+        reserved: Optional[set] = None,
+    ):
+        self.bot = bot
+        # SCVs other modules own for now (Builder pre-moves): never reassigned
+        self.reserved: set = reserved if reserved is not None else set()
+        self.api = api or BotAPI(bot)
+        self.world = self.api.world
+        self.every = every
+        # gas only takes workers beyond this many on minerals
+        self.min_mineral_workers = min_mineral_workers
+
+        self.assigned: Dict[int, int] = {}  # worker tag -> resource tag
+        self._sig: Optional[tuple] = None
+        self._next = 0
+        self.runs = 0
+        self.orders = 0
+
+    # ---------------------------
+    # When to run
+    # ---------------------------
+    def _signature(self, workers, townhalls, refineries) -> tuple:
+        idle = sum(1 for w in workers if getattr(w, "is_idle", False))
+        return (
+            self.api.amount(workers),
+            idle,
+            tuple(sorted(t.tag for t in townhalls)),
+            tuple(sorted(r.tag for r in refineries)),
+        )
+
+    # ---------------------------
+    # Targets
+    # ---------------------------
+    def _targets(self, townhalls, refineries, n_workers: int) -> Tuple[List[Any], np.ndarray, np.ndarray]:
+        """Resource units at our bases + their capacities (gas first, up to the gas budget)."""
+        th_xy = np.array([(t.position.x, t.position.y) for t in townhalls], dtype=np.float64).reshape(-1, 2)
+
+        minerals = list(getattr(self.bot, "mineral_field", None) or [])
+        if minerals and len(th_xy):
+            m_xy = np.array([(m.position.x, m.position.y) for m in minerals], dtype=np.float64)
+            d2 = ((m_xy[:, None, :] - th_xy[None, :, :]) ** 2).sum(axis=2).min(axis=1)
+            minerals = [m for m, near in zip(minerals, (d2 <= 100.0).tolist()) if near]
+
+        gas = []
+        for r in refineries:
+            if getattr(r, "vespene_contents", 1) == 0:
+                continue
+            if len(th_xy) and ((th_xy - (r.position.x, r.position.y)) ** 2).sum(axis=1).min() > 100.0:
+                continue  # refinery without a townhall next to it
+            gas.append(r)
+
+        gas_budget = min(GAS_SLOTS * len(gas), max(0, n_workers - self.min_mineral_workers))
+        gas_cap = []
+        for _ in gas:
+            c = min(GAS_SLOTS, gas_budget)
+            gas_cap.append(c)
+            gas_budget -= c
+
+        m_slot = MINERAL_OVERSAT if n_workers - sum(gas_cap) > MINERAL_SLOTS * len(minerals) else MINERAL_SLOTS
+        units = gas + minerals
+        cap = np.array(gas_cap + [m_slot] * len(minerals), dtype=np.int32)
+        xy = np.array([(u.position.x, u.position.y) for u in units], dtype=np.float64).reshape(-1, 2)
+        return units, xy, cap
+
+    # ---------------------------
+    # Current state of a worker
+    # ---------------------------
+    @staticmethod
+    def _order_target(w) -> Optional[int]:
+        t = getattr(w, "order_target", None)
+        return t if isinstance(t, int) else None
+
+    def _current(self, w, resource_idx: Dict[int, int], townhall_tags: set) -> Tuple[Optional[int], bool]:
+        """(index of the resource the worker works, busy returning cargo)."""
+        t = self._order_target(w)
+        if t is not None and t in resource_idx:
+            self.assigned[w.tag] = t  # the engine may have moved it to a free patch
+            return resource_idx[t], False
+        returning = t is not None and t in townhall_tags
+        prev = self.assigned.get(w.tag)
+        if prev is not None and (returning or getattr(w, "is_gathering", False)):
+            return resource_idx.get(prev), returning
+        return None, returning
+
+    # ---------------------------
+    # Solve
+    # ---------------------------
+    def _solve(self, workers: List[Any], cur: np.ndarray, locked: np.ndarray, xy: np.ndarray, cap: np.ndarray) -> np.ndarray:
+        """
+        new[i] = resource index for worker i (-1: leave alone).
+        Keep: workers already on a resource with room, closest first.
+        Move: everyone else, greedy min-distance over the free capacity.
+        """
+        n = len(workers)
+        new = np.full(n, -1, dtype=np.int64)
+        left = cap.copy()
+        w_xy = np.array([(w.position.x, w.position.y) for w in workers], dtype=np.float64).reshape(-1, 2)
+
+        on = np.nonzero(cur >= 0)[0]
+        if len(on):
+            d_on = ((w_xy[on] - xy[cur[on]]) ** 2).sum(axis=1)
+            for i in on[np.argsort(d_on, kind="stable")]:
+                r = cur[i]
+                if left[r] > 0 or locked[i]:
+                    new[i] = r
+                    left[r] -= 1
+
+        free = np.nonzero((new < 0) & ~locked)[0]
+        if len(free) == 0 or left.clip(min=0).sum() == 0:
+            return new
+
+        d = np.sqrt(((w_xy[free][:, None, :] - xy[None, :, :]) ** 2).sum(axis=2))
+        d[:, left <= 0] = np.inf
+        for _ in range(min(len(free), int(left.clip(min=0).sum()))):
+            k = int(np.argmin(d))
+            i, r = divmod(k, d.shape[1])
+            if not np.isfinite(d[i, r]):
+                break
+            new[free[i]] = r
+            d[i, :] = np.inf
+            left[r] -= 1
+            if left[r] <= 0:
+                d[:, r] = np.inf
+        return new
+
+    async def step(self, force: bool = False) -> int:
+        """Returns how many gather orders were issued (0 on the frames it skips)."""
+        workers = getattr(self.bot, "workers", None)
+        if workers is None or not hasattr(self.bot, "mineral_field"):
+            await self.api.distribute_workers()
+            return 0
+
+        townhalls = [t for ut in TOWNHALLS for t in self.world.ready(ut)]
+        refineries = list(self.world.ready(U.REFINERY))
+        now = game_loop(self.bot)
+        sig = self._signature(workers, townhalls, refineries)
+        if not force and sig == self._sig and now < self._next:
+            return 0
+        self._sig = sig
+        self._next = now + self.every
+        self.runs += 1
+
+        pool = [
+            w for w in workers
+            if w.tag not in self.reserved
+            and (getattr(w, "is_idle", False) or getattr(w, "is_gathering", False) or getattr(w, "is_returning", False))
+        ]
+        if not pool or not townhalls:
+            return 0
+
+        units, xy, cap = self._targets(townhalls, refineries, len(pool))
+        if not units:
+            return 0
+        resource_idx = {u.tag: i for i, u in enumerate(units)}
+        th_tags = {t.tag for t in townhalls}
+
+        cur = np.full(len(pool), -1, dtype=np.int64)
+        locked = np.zeros(len(pool), dtype=bool)
+        for i, w in enumerate(pool):
+            r, returning = self._current(w, resource_idx, th_tags)
+            if r is not None:
+                cur[i] = r
+            # don't make a worker drop its cargo: it stays where it is this round
+            locked[i] = returning
+
+        # workers inside a refinery aren't in bot.workers, but the refinery still counts them
+        seen = np.bincount(cur[cur >= 0], minlength=len(units))
+        for r, u in enumerate(units):
+            inside = getattr(u, "assigned_harvesters", None)
+            if inside is not None:
+                cap[r] = max(0, cap[r] - max(0, int(inside) - int(seen[r])))
+
+        new = self._solve(pool, cur, locked, xy, cap)
+
+        issued = 0
+        for i, w in enumerate(pool):
+            r = int(new[i])
+            if r < 0 or r == cur[i]:
+                continue
+            target = units[r]
+            await self.api.do(w.gather(target))
+            self.assigned[w.tag] = target.tag
+            issued += 1
+
+        # forget workers that died / left the pool
+        alive = {w.tag for w in workers}
+        for tag in [t for t in self.assigned if t not in alive]:
+            del self.assigned[tag]
+
+        self.orders += issued
+        return issued
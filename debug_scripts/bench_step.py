@@ -0,0 +1,106 @@
+"""
+Headless benchmark for Orchestrator.step() over the FakeBot harness.
+
+    python debug_scripts/bench_step.py                 # every strategy, 3000 steps
+    python debug_scripts/bench_step.py --strat default --steps 10000
+    python debug_scripts/bench_step.py --json          # machine-readable
+
+Reports steps/s and engine round-trips per step for each strategy found in
+bot/strats/ and strats/, plus a few end-state numbers as a regression check.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+from time import perf_counter
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from sc2.ids.unit_typeid import UnitTypeId as U  # noqa: E402
+
+from bot.orchestrator import Orchestrator  # noqa: E402
+from bot.strategy import load_strategy  # noqa: E402
+from fakebot import FakeBot  # noqa: E402
+
+STRAT_DIRS = (ROOT / "bot" / "strats", ROOT / "strats")
+
+
+def _strategies(only: str | None):
+    for d in STRAT_DIRS:
+        for p in sorted(d.glob("*.json")):
+            if only and p.stem != only:
+                continue
+            yield p
+
+
+def _label(path: Path) -> str:
+    return str(path.relative_to(ROOT).with_suffix("")).replace("\\", "/")
+
+
+async def run_one(path: Path, steps: int, game_step: int) -> dict:
+    try:
+        strat = load_strategy(path.stem, base_dir=path.parent)
+    except Exception as e:
+        return {"strat": _label(path), "error": f"{type(e).__name__}: {e}"}
+
+    bot = FakeBot(game_step=game_step)
+    orch = Orchestrator(bot, debug=False, strat=strat)
+    orch.on_start()
+
+    t0 = perf_counter()
+    for _ in range(steps):
+        await orch.step()
+        bot.advance()
+    dt = perf_counter() - t0
+
+    rpcs = bot.rpc_count + bot._client.rpc_count
+    count = lambda t: sum(1 for u in bot.world.units if u.type_id == t)  # noqa: E731
+    return {
+        "strat": _label(path),
+        "steps": steps,
+        "game_time_s": round(bot.time, 1),
+        "steps_per_s": round(steps / dt, 1) if dt > 0 else None,
+        "ms_per_step": round(dt * 1000 / steps, 3),
+        "rpcs_per_step": round(rpcs / steps, 3),
+        "supply": f"{bot.supply_used}/{bot.supply_cap}",
+        "scv": count(U.SCV),
+        "marine": count(U.MARINE),
+        "depot": count(U.SUPPLYDEPOT),
+        "rax": count(U.BARRACKS),
+        "factory": count(U.FACTORY),
+        "starport": count(U.STARPORT),
+        "medivac": count(U.MEDIVAC),
+    }
+
+
+async def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--strat", default=None, help="only run this strategy name")
+    ap.add_argument("--steps", type=int, default=3000)
+    ap.add_argument("--game-step", type=int, default=8, help="game loops per step (python-sc2 default: 8)")
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args()
+
+    rows = [await run_one(p, args.steps, args.game_step) for p in _strategies(args.strat)]
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return 0
+
+    cols = ("strat", "steps_per_s", "ms_per_step", "rpcs_per_step", "game_time_s", "supply",
+            "scv", "marine", "depot", "rax", "factory", "starport", "medivac")
+    print(" | ".join(cols))
+    for r in rows:
+        if "error" in r:
+            print(f"{r['strat']} | ERROR {r['error']}")
+            continue
+        print(" | ".join(str(r.get(c, "")) for c in cols))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(asyncio.run(main()))
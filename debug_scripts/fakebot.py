@@ -0,0 +1,627 @@
+"""
+Offline stand-in for a python-sc2 BotAI: no SC2 client needed.
+
+Deterministic toy simulation, just enough for Orchestrator.step() to run:
+- fake Units collections (ready/idle/gathering/closest_to/...)
+- game_info with a 128x128 map (main plateau, natural, enemy main)
+- resource ticking from gathering workers, supply, build/train timers
+- simulated query_building_placement against a footprint occupancy check
+- static enemy units at the enemy main so drop/micro code paths run
+
+It is NOT a game simulator: no combat, no pathing, workers teleport-walk.
+Used by bench_step.py to benchmark and regression-test the hot path.
+"""
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+from sc2.data import ActionResult
+from sc2.ids.ability_id import AbilityId as A
+from sc2.ids.unit_typeid import UnitTypeId as U
+from sc2.position import Point2
+
+LOOPS_PER_SEC = 22.4
+
+# (minerals, vespene, build seconds, supply)
+COSTS: Dict[U, tuple] = {
+    U.SCV: (50, 0, 12, 1),
+    U.MARINE: (50, 0, 18, 1),
+    U.MEDIVAC: (100, 100, 30, 2),
+    U.SUPPLYDEPOT: (100, 0, 21, 0),
+    U.BARRACKS: (150, 0, 46, 0),
+    U.REFINERY: (75, 0, 21, 0),
+    U.FACTORY: (150, 100, 43, 0),
+    U.STARPORT: (150, 100, 36, 0),
+    U.COMMANDCENTER: (400, 0, 71, 0),
+    U.ENGINEERINGBAY: (125, 0, 25, 0),
+    U.BUNKER: (100, 0, 29, 0),
+    U.BARRACKSTECHLAB: (50, 25, 18, 0),
+    U.BARRACKSREACTOR: (50, 50, 36, 0),
+    U.FACTORYTECHLAB: (50, 25, 18, 0),
+    U.FACTORYREACTOR: (50, 50, 36, 0),
+    U.STARPORTTECHLAB: (50, 25, 18, 0),
+    U.STARPORTREACTOR: (50, 50, 36, 0),
+}
+
+FOOTPRINT: Dict[U, int] = {
+    U.COMMANDCENTER: 5,
+    U.SUPPLYDEPOT: 2,
+    U.REFINERY: 3,
+    U.BARRACKS: 3,
+    U.FACTORY: 3,
+    U.STARPORT: 3,
+    U.ENGINEERINGBAY: 3,
+    U.BUNKER: 3,
+    U.BARRACKSTECHLAB: 2,
+    U.BARRACKSREACTOR: 2,
+    U.FACTORYTECHLAB: 2,
+    U.FACTORYREACTOR: 2,
+    U.STARPORTTECHLAB: 2,
+    U.STARPORTREACTOR: 2,
+    U.MINERALFIELD: 2,
+    U.VESPENEGEYSER: 3,
+}
+
+BUILD_ABILITY: Dict[A, U] = {
+    A.TERRANBUILD_COMMANDCENTER: U.COMMANDCENTER,
+    A.TERRANBUILD_SUPPLYDEPOT: U.SUPPLYDEPOT,
+    A.TERRANBUILD_REFINERY: U.REFINERY,
+    A.TERRANBUILD_BARRACKS: U.BARRACKS,
+    A.TERRANBUILD_ENGINEERINGBAY: U.ENGINEERINGBAY,
+    A.TERRANBUILD_BUNKER: U.BUNKER,
+    A.TERRANBUILD_FACTORY: U.FACTORY,
+    A.TERRANBUILD_STARPORT: U.STARPORT,
+}
+
+SPEED = {U.SCV: 2.8, U.MARINE: 3.15, U.MEDIVAC: 3.5}
+MINERALS_PER_LOOP = 0.0446  # ~60/min per worker (faster)
+GAS_PER_LOOP = 0.0455
+
+
+def _pt(x: Any) -> Point2:
+    if isinstance(x, FakeUnit):
+        return x.position
+    return Point2((float(x[0]), float(x[1])))
+
+
+@dataclass
+class FakeCommand:
+    unit: "FakeUnit"
+    ability: Any
+    target: Any = None
+    queue: bool = False
+    unit_type: Optional[U] = None
+
+
+@dataclass
+class FakeOrder:
+    kind: str  # train | build | addon | move | attack | gather
+    unit_type: Optional[U] = None
+    target: Any = None
+    remaining: float = 0.0
+
+
+class FakeUnit:
+    def __init__(self, world: "FakeWorld", type_id: U, pos: Point2, *, owner: int = 1, ready: bool = True):
+        self.world = world
+        self.tag = world.next_tag()
+        self.type_id = type_id
+        self.position = Point2((float(pos[0]), float(pos[1])))
+        self.owner_id = owner
+        self.build_progress = 1.0 if ready else 0.0
+        self.orders: List[FakeOrder] = []
+        self.cargo: List[FakeUnit] = []
+        self.health = 45.0
+        self.health_max = 45.0
+        self.weapon_cooldown = 0.0
+        self.vespene_contents = 2250 if type_id == U.VESPENEGEYSER else 0
+        self.mineral_contents = 1800 if type_id == U.MINERALFIELD else 0
+        self.is_structure = type_id in FOOTPRINT
+        self.is_flying = type_id == U.MEDIVAC
+        self.is_gathering = type_id == U.SCV
+        self.gather_tag: Optional[int] = None
+
+    # -- python-sc2 Unit surface ---------------------------------------------------
+    @property
+    def name(self) -> str:
+        return self.type_id.name.title().replace("_", "")
+
+    @property
+    def is_ready(self) -> bool:
+        return self.build_progress >= 1.0
+
+    @property
+    def is_idle(self) -> bool:
+        return not self.orders and not (self.type_id == U.SCV and self.is_gathering)
+
+    @property
+    def order_target(self) -> Optional[int]:
+        # python-sc2: tag (or Point2) of the first order's target; gathering is the only order we keep around
+        if self.orders:
+            return getattr(self.orders[0].target, "tag", None)
+        return self.gather_tag if self.is_gathering else None
+
+    @property
+    def cargo_used(self) -> int:
+        return len(self.cargo)
+
+    @property
+    def footprint_radius(self) -> Optional[float]:
+        s = FOOTPRINT.get(self.type_id)
+        return s / 2 if s else None
+
+    def distance_to(self, p: Any) -> float:
+        return self.position.distance_to(_pt(p))
+
+    def has_ability(self, ab: A) -> bool:
+        return False
+
+    def has_buff(self, buff: Any) -> bool:
+        return False
+
+    def train(self, unit_type: U, queue: bool = False) -> FakeCommand:
+        return FakeCommand(self, f"train:{unit_type.name}", None, queue, unit_type)
+
+    def build(self, unit_type: U, target: Any = None, queue: bool = False) -> FakeCommand:
+        return FakeCommand(self, f"build:{unit_type.name}", target, queue, unit_type)
+
+    def move(self, target: Any, queue: bool = False) -> FakeCommand:
+        return FakeCommand(self, A.MOVE, target, queue)
+
+    def attack(self, target: Any, queue: bool = False) -> FakeCommand:
+        return FakeCommand(self, A.ATTACK, target, queue)
+
+    def gather(self, target: Any, queue: bool = False) -> FakeCommand:
+        return FakeCommand(self, A.HARVEST_GATHER, target, queue)
+
+    def __call__(self, ability: A, target: Any = None, queue: bool = False) -> FakeCommand:
+        return FakeCommand(self, ability, target, queue)
+
+    def __repr__(self) -> str:
+        return f"FakeUnit({self.type_id.name}, tag={self.tag}, pos={self.position})"
+
+
+class FakeUnits(list):
+    """list subclass with the Units helpers the bot uses."""
+
+    @property
+    def exists(self) -> bool:
+        return len(self) > 0
+
+    @property
+    def amount(self) -> int:
+        return len(self)
+
+    @property
+    def first(self) -> Optional[FakeUnit]:
+        return self[0] if self else None
+
+    @property
+    def ready(self) -> "FakeUnits":
+        return FakeUnits(u for u in self if u.is_ready)
+
+    @property
+    def not_ready(self) -> "FakeUnits":
+        return FakeUnits(u for u in self if not u.is_ready)
+
+    @property
+    def idle(self) -> "FakeUnits":
+        return FakeUnits(u for u in self if u.is_idle)
+
+    @property
+    def gathering(self) -> "FakeUnits":
+        return FakeUnits(u for u in self if getattr(u, "is_gathering", False) and not u.orders)
+
+    @property
+    def tags(self) -> set:
+        return {u.tag for u in self}
+
+    def of_type(self, types: Any) -> "FakeUnits":
+        if not isinstance(types, (set, list, tuple, frozenset)):
+            types = {types}
+        return FakeUnits(u for u in self if u.type_id in types)
+
+    def __call__(self, types: Any) -> "FakeUnits":
+        return self.of_type(types)
+
+    def filter(self, pred) -> "FakeUnits":
+        return FakeUnits(u for u in self if pred(u))
+
+    def find_by_tag(self, tag: int) -> Optional[FakeUnit]:
+        return next((u for u in self if u.tag == tag), None)
+
+    def tags_not_in(self, tags: Iterable[int]) -> "FakeUnits":
+        tags = set(tags)
+        return FakeUnits(u for u in self if u.tag not in tags)
+
+    def tags_in(self, tags: Iterable[int]) -> "FakeUnits":
+        tags = set(tags)
+        return FakeUnits(u for u in self if u.tag in tags)
+
+    def closest_to(self, p: Any) -> FakeUnit:
+        p = _pt(p)
+        return min(self, key=lambda u: u.position.distance_to(p))
+
+    def closer_than(self, d: float, p: Any) -> "FakeUnits":
+        p = _pt(p)
+        return FakeUnits(u for u in self if u.position.distance_to(p) < d)
+
+    def sorted_by_distance_to(self, p: Any) -> "FakeUnits":
+        p = _pt(p)
+        return FakeUnits(sorted(self, key=lambda u: u.position.distance_to(p)))
+
+
+class FakeClient:
+    def __init__(self, world: "FakeWorld"):
+        self.world = world
+        self.rpc_count = 0
+
+    async def query_building_placement(self, ability: Any, positions: List[Point2], ignore_resources: bool = True):
+        self.rpc_count += 1
+        ab = getattr(ability, "id", ability)
+        ut = BUILD_ABILITY.get(ab)
+        if ut is None:
+            return [ActionResult.Error for _ in positions]
+        return [
+            ActionResult.Success if self.world.can_place(ut, _pt(p)) else ActionResult.CantBuildLocationInvalid
+            for p in positions
+        ]
+
+    async def actions(self, cmds: List[FakeCommand], return_successes: bool = False):
+        self.rpc_count += 1
+        for c in cmds:
+            self.world.apply(c)
+        return []
+
+
+class FakeWorld:
+    """Map + units + timers. Deterministic: same inputs, same game."""
+
+    SIZE = 128
+
+    def __init__(self, *, with_enemies: bool = True):
+        self._tag = 0x100000000
+        n = self.SIZE
+        self.height = np.full((n, n), 4, dtype=np.uint8)
+        self.placement = np.zeros((n, n), dtype=np.uint8)
+        self.placement[8:120, 8:120] = 1
+        # main plateau (higher) with a ramp towards the centre
+        self.height[14:50, 14:50] = 12
+        self.placement[48:50, 44:50] = 0
+        self.height[47:52, 44:50] = 8
+        self.pathing = self.placement.copy()
+        self.pathing[47:52, 44:50] = 1
+
+        self.start = Point2((30.5, 30.5))
+        self.enemy_start = Point2((97.5, 97.5))
+        self.units: List[FakeUnit] = []
+        self.neutral: List[FakeUnit] = []
+        self.enemies: List[FakeUnit] = []
+
+        self.add(U.COMMANDCENTER, self.start)
+        for i in range(12):
+            self.add(U.SCV, (self.start.x - 3 + (i % 6), self.start.y - 4 - (i // 6)))
+        for base in (self.start, Point2((self.SIZE - 30.5, 30.5)), self.enemy_start):
+            for i in range(8):
+                m = FakeUnit(self, U.MINERALFIELD, (base.x - 7 + 2 * (i % 4) + 0.0, base.y - 8.5 - (i // 4)), owner=16)
+                self.neutral.append(m)
+            for dx in (-7.5, 7.5):
+                self.neutral.append(FakeUnit(self, U.VESPENEGEYSER, (base.x + dx, base.y - 3.5), owner=16))
+        if with_enemies:
+            hatch = FakeUnit(self, U.HATCHERY, self.enemy_start, owner=2)
+            self.enemies.append(hatch)
+            for i in range(6):
+                z = FakeUnit(self, U.ZERGLING, (self.enemy_start.x - 4 + i, self.enemy_start.y - 6), owner=2)
+                z.health = z.health_max = 35.0
+                self.enemies.append(z)
+            q = FakeUnit(self, U.QUEEN, (self.enemy_start.x + 3, self.enemy_start.y - 3), owner=2)
+            q.health = q.health_max = 175.0
+            self.enemies.append(q)
+
+        self.minerals = 50.0
+        self.vespene = 0.0
+
+    def next_tag(self) -> int:
+        self._tag += 1
+        return self._tag
+
+    def add(self, unit_type: U, pos: Any, *, ready: bool = True) -> FakeUnit:
+        u = FakeUnit(self, unit_type, _pt(pos), ready=ready)
+        self.units.append(u)
+        return u
+
+    # -- supply ------------------------------------------------------------------------
+    @property
+    def supply_cap(self) -> int:
+        cap = 0
+        for u in self.units:
+            if not u.is_ready:
+                continue
+            if u.type_id == U.COMMANDCENTER:
+                cap += 15
+            elif u.type_id == U.SUPPLYDEPOT:
+                cap += 8
+        return min(200, cap)
+
+    @property
+    def supply_used(self) -> int:
+        used = 0
+        for u in self.units:
+            if u.type_id in COSTS and not u.is_structure:
+                used += COSTS[u.type_id][3]
+            for o in u.orders:
+                if o.kind == "train":
+                    used += COSTS[o.unit_type][3]
+            for c in u.cargo:
+                used += COSTS.get(c.type_id, (0, 0, 0, 1))[3]
+        return used
+
+    # -- placement ---------------------------------------------------------------------
+    def _rect(self, unit_type: U, c: Point2) -> tuple:
+        s = FOOTPRINT.get(unit_type, 1)
+        ox = int(math.floor(c.x - s / 2 + 0.5))
+        oy = int(math.floor(c.y - s / 2 + 0.5))
+        if unit_type == U.MINERALFIELD:
+            return ox, int(math.floor(c.y)), 2, 1
+        return ox, oy, s, s
+
+    def can_place(self, unit_type: U, c: Point2) -> bool:
+        if unit_type == U.REFINERY:
+            taken = any(u.type_id == U.REFINERY and u.position.distance_to(c) < 1 for u in self.units)
+            return not taken and any(
+                g.type_id == U.VESPENEGEYSER and g.position.distance_to(c) < 1 for g in self.neutral
+            )
+        ox, oy, w, h = self._rect(unit_type, c)
+        n = self.SIZE
+        if ox < 0 or oy < 0 or ox + w > n or oy + h > n:
+            return False
+        if not self.placement[oy:oy + h, ox:ox + w].all():
+            return False
+        for u in self.units + self.neutral:
+            if not u.is_structure and u.type_id not in (U.MINERALFIELD, U.VESPENEGEYSER):
+                continue
+            bx, by, bw, bh = self._rect(u.type_id, u.position)
+            if ox < bx + bw and bx < ox + w and oy < by + bh and by < oy + h:
+                return False
+        return True
+
+    # -- commands ----------------------------------------------------------------------
+    def _pay(self, unit_type: U) -> bool:
+        m, g = COSTS.get(unit_type, (0, 0, 0, 0))[:2]
+        if self.minerals < m or self.vespene < g:
+            return False
+        self.minerals -= m
+        self.vespene -= g
+        return True
+
+    def apply(self, c: FakeCommand) -> bool:
+        u = c.unit
+        if u not in self.units:
+            return False
+        ab = c.ability
+        if isinstance(ab, str) and ab.startswith("train:"):
+            if COSTS[c.unit_type][3] > self.supply_cap - self.supply_used or not self._pay(c.unit_type):
+                return False
+            u.orders.append(FakeOrder("train", c.unit_type, remaining=COSTS[c.unit_type][2] * LOOPS_PER_SEC))
+            return True
+        if isinstance(ab, str) and ab.startswith("build:"):
+            ut = c.unit_type
+            if u.is_structure:
+                # addon
+                if not self._pay(ut):
+                    return False
+                u.orders.append(FakeOrder("addon", ut, remaining=COSTS[ut][2] * LOOPS_PER_SEC))
+                return True
+            target = _pt(c.target) if c.target is not None else None
+            if target is None or not self.can_place(ut, target) or not self._pay(ut):
+                return False
+            dist = u.position.distance_to(target)
+            u.orders = [FakeOrder("build", ut, target, remaining=dist / SPEED[U.SCV] * LOOPS_PER_SEC)]
+            u.is_gathering = False
+            return True
+        if ab in (A.MOVE, A.ATTACK, A.HARVEST_GATHER):
+            kind = {A.MOVE: "move", A.ATTACK: "attack", A.HARVEST_GATHER: "gather"}[ab]
+            u.orders = [FakeOrder(kind, target=c.target)]
+            u.gather_tag = getattr(c.target, "tag", None) if kind == "gather" else None
+            return True
+        if ab == A.LOAD and c.target in self.units and u.distance_to(c.target) < 10:
+            if len(u.cargo) < 8:
+                self.units.remove(c.target)
+                c.target.orders = []
+                u.cargo.append(c.target)
+            return True
+        if ab == A.UNLOADALLAT_MEDIVAC:
+            for m in u.cargo:
+                m.position = u.position
+                self.units.append(m)
+            u.cargo = []
+            return True
+        return True
+
+    # -- time --------------------------------------------------------------------------
+    def _walk(self, u: FakeUnit, target: Point2, loops: int) -> bool:
+        step = SPEED.get(u.type_id, 3.0) / LOOPS_PER_SEC * loops
+        d = u.position.distance_to(target)
+        if d <= step:
+            u.position = target
+            return True
+        u.position = u.position.towards(target, step)
+        return False
+
+    def tick(self, loops: int) -> None:
+        gatherers = sum(1 for u in self.units if u.type_id == U.SCV and u.is_gathering and not u.orders)
+        refineries = sum(1 for u in self.units if u.type_id == U.REFINERY and u.is_ready)
+        gas_workers = min(3 * refineries, gatherers // 4)
+        mineral_workers = min(16, gatherers - gas_workers)
+        self.minerals += mineral_workers * MINERALS_PER_LOOP * loops
+        self.vespene += gas_workers * GAS_PER_LOOP * loops
+
+        for u in list(self.units):
+            if not u.is_ready:
+                total = COSTS[u.type_id][2] * LOOPS_PER_SEC
+                u.build_progress = min(1.0, u.build_progress + loops / total)
+                continue
+            if not u.orders:
+                continue
+            o = u.orders[0]
+            if o.kind in ("train", "addon"):
+                o.remaining -= loops
+                if o.remaining <= 0:
+                    u.orders.pop(0)
+                    if o.kind == "train":
+                        self.add(o.unit_type, (u.position.x, u.position.y - 3))
+                    else:
+                        self.add(o.unit_type, (u.position.x + 2.5, u.position.y - 0.5))
+            elif o.kind == "build":
+                if self._walk(u, _pt(o.target), loops):
+                    u.orders = []
+                    u.is_gathering = True
+                    if self.can_place(o.unit_type, _pt(o.target)):
+                        self.add(o.unit_type, _pt(o.target), ready=False)
+            elif o.kind in ("move", "attack"):
+                if self._walk(u, _pt(o.target), loops):
+                    u.orders = []
+                for c in u.cargo:
+                    c.position = u.position
+            elif o.kind == "gather":
+                u.orders = []
+                u.is_gathering = True
+
+
+class FakeBot:
+    """The attributes/methods Orchestrator & friends read from a BotAI."""
+
+    def __init__(self, *, game_step: int = 8, with_enemies: bool = True):
+        self.world = FakeWorld(with_enemies=with_enemies)
+        self.game_step = int(game_step)
+        self.iteration = 0
+        self.state = SimpleNamespace(game_loop=0)
+        self._client = FakeClient(self.world)
+        self.dbg = None
+        self.rpc_count = 0
+        self.actions: List[FakeCommand] = []
+
+        n = FakeWorld.SIZE
+        w = self.world
+        self.game_info = SimpleNamespace(
+            map_name="FakeMap",
+            map_center=Point2((n / 2, n / 2)),
+            map_size=SimpleNamespace(width=n, height=n),
+            placement_grid=SimpleNamespace(data_numpy=w.placement),
+            pathing_grid=SimpleNamespace(data_numpy=w.pathing),
+            terrain_height=SimpleNamespace(data_numpy=w.height),
+            start_locations=[w.enemy_start],
+        )
+        self.start_location = w.start
+        self.enemy_start_locations = [w.enemy_start]
+        self.main_base_ramp = None
+        self.expansion_locations_list = [w.start, Point2((n - 30.5, 30.5)), w.enemy_start]
+
+    # -- clock ---------------------------------------------------------------------------
+    @property
+    def time(self) -> float:
+        return self.state.game_loop / LOOPS_PER_SEC
+
+    def advance(self) -> None:
+        """Apply this frame's actions (one batch), then tick the world one game_step."""
+        if self.actions:
+            self.rpc_count += 1
+            for c in self.actions:
+                self.world.apply(c)
+            self.actions = []
+        self.world.tick(self.game_step)
+        self.state.game_loop += self.game_step
+        self.iteration += 1
+
+    # -- resources -----------------------------------------------------------------------
+    @property
+    def minerals(self) -> int:
+        return int(self.world.minerals)
+
+    @property
+    def vespene(self) -> int:
+        return int(self.world.vespene)
+
+    @property
+    def supply_cap(self) -> int:
+        return self.world.supply_cap
+
+    @property
+    def supply_used(self) -> int:
+        return self.world.supply_used
+
+    @property
+    def supply_left(self) -> int:
+        return self.supply_cap - self.supply_used
+
+    def calculate_cost(self, unit_type: U):
+        m, g = COSTS.get(unit_type, (0, 0, 0, 0))[:2]
+        return SimpleNamespace(minerals=m, vespene=g)
+
+    def can_afford(self, unit_type: U) -> bool:
+        c = self.calculate_cost(unit_type)
+        return self.minerals >= c.minerals and self.vespene >= c.vespene
+
+    def already_pending(self, unit_type: U) -> int:
+        n = 0
+        for u in self.world.units:
+            if u.type_id == unit_type and not u.is_ready:
+                n += 1
+            for o in u.orders:
+                if o.unit_type == unit_type and o.kind in ("train", "build", "addon"):
+                    n += 1
+        return n
+
+    # -- units ---------------------------------------------------------------------------
+    @property
+    def units(self) -> FakeUnits:
+        # this fork's bot.units(...) also sees structures
+        return FakeUnits(self.world.units)
+
+    @property
+    def structures(self) -> FakeUnits:
+        return FakeUnits(u for u in self.world.units if u.is_structure)
+
+    @property
+    def townhalls(self) -> FakeUnits:
+        return FakeUnits(u for u in self.world.units if u.type_id == U.COMMANDCENTER)
+
+    @property
+    def workers(self) -> FakeUnits:
+        return FakeUnits(u for u in self.world.units if u.type_id == U.SCV)
+
+    @property
+    def mineral_field(self) -> FakeUnits:
+        return FakeUnits(u for u in self.world.neutral if u.type_id == U.MINERALFIELD)
+
+    @property
+    def vespene_geyser(self) -> FakeUnits:
+        return FakeUnits(u for u in self.world.neutral if u.type_id == U.VESPENEGEYSER)
+
+    @property
+    def enemy_units(self) -> FakeUnits:
+        return FakeUnits(u for u in self.world.enemies if not u.is_structure and u.type_id != U.HATCHERY)
+
+    @property
+    def enemy_structures(self) -> FakeUnits:
+        return FakeUnits(u for u in self.world.enemies if u.type_id == U.HATCHERY)
+
+    @property
+    def all_units(self) -> FakeUnits:
+        return FakeUnits(self.world.units + self.world.neutral + self.world.enemies)
+
+    # -- commands ------------------------------------------------------------------------
+    def do(self, cmd: FakeCommand, *args: Any, **kwargs: Any) -> bool:
+        # like python-sc2: sync, queued, sent as one batch at the end of the step
+        self.actions.append(cmd)
+        return True
+
+    async def distribute_workers(self, *args: Any, **kwargs: Any) -> None:
+        self.rpc_count += 1
+        for u in self.world.units:
+            if u.type_id == U.SCV and not u.orders:
+                u.is_gathering = True
@@ -0,0 +1,314 @@
+"""
+Indexed catalog of debug_runs/ (SQLite) with per-run summaries.
+
+    python debug_scripts/runs_catalog.py index                  # (re)index new/changed runs
+    python debug_scripts/runs_catalog.py list                   # one line per run
+    python debug_scripts/runs_catalog.py failures               # failed builds per unit, all runs
+    python debug_scripts/runs_catalog.py query "SELECT ..."     # anything else
+
+Each debug.jsonl / debug.bin is streamed record by record (never loaded whole).
+Files whose size and mtime match the catalog are skipped, so re-indexing
+hundreds of runs only costs a stat() per run.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from bot.binlog import iter_binlog  # noqa: E402
+
+DEFAULT_RUNS = ROOT / "debug_runs"
+
+# unit string in the logs -> summary column
+# state.flags (orchestrator) -> same columns, for runs where the build log was rle'd/incomplete
+FLAG_COLUMNS = {
+    "depot_started": "first_depot_t",
+    "rax_started": "first_rax_t",
+    "ref_started": "first_refinery_t",
+    "factory_started": "first_factory_t",
+    "starport_started": "first_starport_t",
+}
+
+FIRST_COLUMNS = {
+    "UnitTypeId.SUPPLYDEPOT": "first_depot_t",
+    "UnitTypeId.BARRACKS": "first_rax_t",
+    "UnitTypeId.REFINERY": "first_refinery_t",
+    "UnitTypeId.FACTORY": "first_factory_t",
+    "UnitTypeId.STARPORT": "first_starport_t",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    indexed_at REAL NOT NULL,
+    map TEXT,
+    opponent TEXT,
+    result TEXT,
+    records INTEGER,
+    last_t REAL,
+    last_it INTEGER,
+    first_depot_t REAL,
+    first_rax_t REAL,
+    first_refinery_t REAL,
+    first_factory_t REAL,
+    first_starport_t REAL,
+    supply_block_s REAL,
+    failed_builds INTEGER,
+    drops INTEGER
+);
+CREATE TABLE IF NOT EXISTS failed_builds (
+    run TEXT NOT NULL,
+    unit TEXT NOT NULL,
+    n INTEGER NOT NULL,
+    PRIMARY KEY (run, unit)
+);
+CREATE TABLE IF NOT EXISTS drop_timeline (
+    run TEXT NOT NULL,
+    t REAL,
+    it INTEGER,
+    event TEXT NOT NULL,
+    detail TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_drop_run ON drop_timeline(run);
+CREATE INDEX IF NOT EXISTS idx_failed_unit ON failed_builds(unit);
+CREATE INDEX IF NOT EXISTS idx_runs_map ON runs(map);
+"""
+
+
+# -------------------------
+# Streaming
+# -------------------------
+def _log_file(run_dir: Path) -> Optional[Path]:
+    for name in ("debug.bin", "debug.jsonl"):
+        p = run_dir / name
+        if p.exists():
+            return p
+    return None
+
+
+def iter_records(path: Path) -> Iterator[Dict[str, Any]]:
+    if path.suffix == ".bin":
+        yield from iter_binlog(path)
+        return
+    with path.open("r", encoding="utf-8", errors="replace") as fp:
+        for line in fp:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue  # torn last line of a killed run
+            if isinstance(rec, dict):
+                yield rec
+
+
+# -------------------------
+# Summary
+# -------------------------
+class RunSummary:
+    def __init__(self, run: str):
+        self.run = run
+        self.row: Dict[str, Any] = {
+            "map": None,
+            "opponent": None,
+            "result": None,
+            "records": 0,
+            "last_t": None,
+            "last_it": None,
+            "supply_block_s": 0.0,
+            "failed_builds": 0,
+            "drops": 0,
+        }
+        for col in FIRST_COLUMNS.values():
+            self.row[col] = None
+        self.failed: Dict[str, int] = {}
+        self.timeline: list[tuple] = []
+        self._blocked_since: Optional[float] = None
+
+    def _fail(self, unit: Any, n: int = 1) -> None:
+        unit = str(unit or "?")
+        self.failed[unit] = self.failed.get(unit, 0) + n
+        self.row["failed_builds"] += n
+
+    def feed(self, rec: Dict[str, Any]) -> None:
+        row = self.row
+        row["records"] += 1
+        ev = rec.get("event")
+        t = rec.get("t")
+        if isinstance(t, (int, float)):
+            row["last_t"] = t
+        it = rec.get("it")
+        if isinstance(it, int):
+            row["last_it"] = it
+
+        if ev == "run_start":
+            row["map"] = rec.get("map")
+            row["opponent"] = rec.get("opponent")
+        elif ev == "run_end":
+            row["result"] = rec.get("result")
+        elif ev == "state":
+            self._supply(rec)
+            flags = rec.get("flags")
+            if isinstance(flags, dict) and isinstance(t, (int, float)):
+                for flag, col in FLAG_COLUMNS.items():
+                    if flags.get(flag) and row[col] is None:
+                        row[col] = t
+        elif ev in ("build_result", "build_issued"):
+            unit = rec.get("unit")
+            if rec.get("ok"):
+                col = FIRST_COLUMNS.get(str(unit))
+                if col and row[col] is None and isinstance(t, (int, float)):
+                    row[col] = t
+            elif ev == "build_result":
+                self._fail(unit)
+        elif ev == "repeat":
+            # run-length encoded records (DebugLogger LogRule.rle)
+            payload = rec.get("payload") or {}
+            if rec.get("of") == "build_result" and not payload.get("ok", True):
+                self._fail(payload.get("unit"), int(rec.get("count") or 0))
+        elif isinstance(ev, str) and ev.startswith("drop"):
+            if ev == "drop_start":
+                row["drops"] += 1
+            detail = {k: v for k, v in rec.items() if k not in ("event", "t", "it", "channel")}
+            self.timeline.append((self.run, t, it, ev, json.dumps(detail, separators=(",", ":"))))
+
+    def _supply(self, rec: Dict[str, Any]) -> None:
+        t = rec.get("t")
+        if not isinstance(t, (int, float)):
+            return
+        left = rec.get("supply_left")
+        cap = rec.get("supply_cap") or 0
+        blocked = isinstance(left, int) and left <= 0 and cap < 200
+        if blocked and self._blocked_since is None:
+            self._blocked_since = t
+        elif not blocked and self._blocked_since is not None:
+            self.row["supply_block_s"] += t - self._blocked_since
+            self._blocked_since = None
+
+    def finish(self) -> None:
+        if self._blocked_since is not None and self.row["last_t"] is not None:
+            self.row["supply_block_s"] += self.row["last_t"] - self._blocked_since
+            self._blocked_since = None
+        self.row["supply_block_s"] = round(self.row["supply_block_s"], 2)
+
+
+# -------------------------
+# Catalog
+# -------------------------
+class Catalog:
+    def __init__(self, db_path: Path):
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(db_path))
+        self.db.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.db.close()
+
+    def _is_current(self, run: str, size: int, mtime_ns: int) -> bool:
+        cur = self.db.execute("SELECT size, mtime_ns FROM runs WHERE run = ?", (run,)).fetchone()
+        return cur is not None and cur[0] == size and cur[1] == mtime_ns
+
+    def index(self, runs_dir: Path, *, force: bool = False) -> tuple[int, int]:
+        done = skipped = 0
+        for run_dir in sorted(p for p in runs_dir.iterdir() if p.is_dir()):
+            path = _log_file(run_dir)
+            if path is None:
+                continue
+            st = path.stat()
+            run = run_dir.name
+            if not force and self._is_current(run, st.st_size, st.st_mtime_ns):
+                skipped += 1
+                continue
+
+            summary = RunSummary(run)
+            try:
+                for rec in iter_records(path):
+                    summary.feed(rec)
+            except Exception as e:
+                print(f"[catalog] {run}: stopped early ({type(e).__name__}: {e})", file=sys.stderr)
+            summary.finish()
+            self._store(run, path, st, summary)
+            done += 1
+        self.db.commit()
+        return done, skipped
+
+    def _store(self, run: str, path: Path, st, summary: RunSummary) -> None:
+        row = dict(summary.row)
+        row.update(run=run, path=str(path), size=st.st_size, mtime_ns=st.st_mtime_ns, indexed_at=time.time())
+        cols = ", ".join(row)
+        marks = ", ".join("?" for _ in row)
+        self.db.execute(f"INSERT OR REPLACE INTO runs ({cols}) VALUES ({marks})", tuple(row.values()))
+        self.db.execute("DELETE FROM failed_builds WHERE run = ?", (run,))
+        self.db.executemany(
+            "INSERT INTO failed_builds (run, unit, n) VALUES (?, ?, ?)",
+            [(run, u, n) for u, n in summary.failed.items()],
+        )
+        self.db.execute("DELETE FROM drop_timeline WHERE run = ?", (run,))
+        self.db.executemany("INSERT INTO drop_timeline (run, t, it, event, detail) VALUES (?, ?, ?, ?, ?)", summary.timeline)
+
+    def query(self, sql: str, params: tuple = ()) -> tuple[list[str], list[tuple]]:
+        cur = self.db.execute(sql, params)
+        cols = [d[0] for d in cur.description or ()]
+        return cols, cur.fetchall()
+
+
+def _print(cols: list[str], rows: list[tuple]) -> None:
+    print(" | ".join(cols))
+    for r in rows:
+        print(" | ".join("" if v is None else (f"{v:.1f}" if isinstance(v, float) else str(v)) for v in r))
+
+
+QUERIES = {
+    "list": (
+        "SELECT run, map, result, records, last_t, first_depot_t, first_rax_t, first_factory_t, "
+        "first_starport_t, supply_block_s, failed_builds, drops FROM runs ORDER BY run"
+    ),
+    "failures": "SELECT unit, SUM(n) AS failed, COUNT(*) AS runs FROM failed_builds GROUP BY unit ORDER BY failed DESC",
+}
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=Path, default=DEFAULT_RUNS)
+    ap.add_argument("--db", type=Path, default=None, help="default: <runs>/catalog.sqlite")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p_idx = sub.add_parser("index")
+    p_idx.add_argument("--force", action="store_true", help="re-index even unchanged runs")
+    sub.add_parser("list")
+    sub.add_parser("failures")
+    p_q = sub.add_parser("query")
+    p_q.add_argument("sql")
+    args = ap.parse_args()
+
+    cat = Catalog(args.db or args.runs / "catalog.sqlite")
+    try:
+        if args.cmd == "index":
+            t0 = time.perf_counter()
+            done, skipped = cat.index(args.runs, force=args.force)
+            print(f"indexed {done}, unchanged {skipped} ({(time.perf_counter() - t0) * 1000:.0f} ms)")
+            return 0
+        sql = QUERIES.get(args.cmd) or args.sql
+        t0 = time.perf_counter()
+        cols, rows = cat.query(sql)
+        _print(cols, rows)
+        print(f"-- {len(rows)} rows, {(time.perf_counter() - t0) * 1000:.1f} ms", file=sys.stderr)
+        return 0
+    finally:
+        cat.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
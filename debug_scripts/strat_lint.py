@@ -0,0 +1,70 @@
+"""
+Validate strategy JSONs before spending a game on them.
+
+    python debug_scripts/strat_lint.py                    # every bot/strats/*.json and strats/*.json
+    python debug_scripts/strat_lint.py strats/greedy.json # specific files
+    python debug_scripts/strat_lint.py --no-timings
+
+Checks the schema (known sections, knob types), unit names and conditions
+(the plan compiler), tech prerequisites (e.g. STARPORT needs FACTORY) and
+prints an estimate of the earliest time each plan step can start.
+Exit code 1 when any file has errors.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from bot.strategy import STRAT_DIRS  # noqa: E402
+from bot.strategy_check import check_strategy  # noqa: E402
+
+
+def _fmt_t(s) -> str:
+    if s is None:
+        return "  never"
+    return f"{int(s) // 60:3d}:{int(s) % 60:02d}"
+
+
+def lint(path: Path, timings: bool) -> bool:
+    try:
+        rel = path.resolve().relative_to(ROOT)
+    except ValueError:
+        rel = path
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except ValueError as e:
+        print(f"{rel}: ERROR invalid JSON: {e}")
+        return False
+
+    rep = check_strategy(data, timings=timings)
+    print(f"{rel}: {'ok' if rep.ok else 'FAILED'}")
+    for e in rep.errors:
+        print(f"  error: {e}")
+    for w in rep.warnings:
+        print(f"  warning: {w}")
+    for t in rep.timings:
+        print(f"  {t.plan:>10}[{t.index}] {t.unit.name:<16} start {_fmt_t(t.start_s)}  done {_fmt_t(t.done_s)}")
+    return rep.ok
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("files", nargs="*", type=Path)
+    ap.add_argument("--no-timings", action="store_true", help="skip the build-order timing estimate")
+    args = ap.parse_args()
+
+    files = args.files or [p for d in STRAT_DIRS for p in sorted(d.glob("*.json"))]
+    ok = True
+    for p in files:
+        ok &= lint(p, timings=not args.no_timings)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -16,6 +16,7 @@ from bot.strategy import load_strategy
 def _parse_args():
     p = argparse.ArgumentParser()
     p.add_argument("--strat", default=None, help="Name of strategy JSON in strats/<name>.json")
+    p.add_argument("--watch", action="store_true", help="Hot reload the strategy JSON when it changes")
     return p.parse_args()
 
 
@@ -27,20 +28,27 @@ class TerranBotV1(BotAI):
     def __init__(self, debug: bool = True):
         super().__init__()
         self.debug = debug
-        self.dbg = DebugLogger(base_dir="debug_runs", enabled=debug)
+        self.dbg = DebugLogger(base_dir="debug_runs", enabled=debug, background=True)
         self.orch: Orchestrator | None = None
         self._strat = STRAT
+        self._watch = ARGS.watch
 
     # IMPORTANT: this fork calls on_start() without await -> must be sync
     # IMPORTANT: this fork calls on_start() without await -> must be sync
     def on_start(self):
         map_name = getattr(self.game_info, "map_name", "unknown_map")
         self.dbg.start_run(map_name=map_name, opponent="Computer")
+        try:
+            self.orch = Orchestrator(self, debug=self.debug, strat=self._strat, watch=self._watch)
+            self.orch.on_start()
+        except Exception:
+            # on_step still creates it lazily
+            self.orch = None
 
     async def on_step(self, iteration: int):
         self.iteration = iteration  # Essential: cooldown logic depends on this
         if self.orch is None:
-            self.orch = Orchestrator(self, debug=self.debug, strat=self._strat)
+            self.orch = Orchestrator(self, debug=self.debug, strat=self._strat, watch=self._watch)
         await self.orch.step()
 
     # IMPORTANT: this fork calls on_end() without await -> must be sync